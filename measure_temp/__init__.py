@@ -3,4 +3,14 @@ from . import _version
 __version__ = _version.get_versions()["version"]
 
 from ._attrdict import AttrDict
-from .read_sensors import enumerate_all_sensors, read_sensor, report_all_readings
+from .profiling import profile
+from .read_sensors import (
+    FeatureType,
+    enumerate_all_sensors,
+    find_sensors,
+    read_many,
+    read_sensor,
+    report_all_readings,
+    sensor_type,
+)
+from .readings import Readings
@@ -0,0 +1,138 @@
+"""Long-running agent that streams readings to a collector"""
+import json
+import os
+import socket
+import sys
+from typing import IO, Any, Iterable, Mapping, Optional, Union
+
+from . import wire
+from .daemon import remove_stale_socket
+from .read_sensors import Sensor
+from .readings import Readings
+from .sampler import sample
+
+
+def encode_record(timestamp: float, readings: Mapping[Sensor, Optional[float]]) -> str:
+    """Serialize a sample as a single line of JSON
+
+    Parameters
+    ----------
+    timestamp : float
+        The (Unix) time of the sample
+    readings : dict of Sensor to float
+        The readings. Unreadable sensors (value of None) are encoded as nulls.
+
+    Returns
+    -------
+    str
+        The JSON record, of the form {"time": ..., "readings": {"chip.feature": value, ...}}, terminated by a newline
+    """
+    return (
+        json.dumps(
+            {
+                "time": timestamp,
+                "readings": readings.by_name()
+                if isinstance(readings, Readings)
+                else {str(sensor): value for sensor, value in readings.items()},
+            }
+        )
+        + "\n"
+    )
+
+
+def run_agent(
+    sensors_to_read: Iterable[Union[str, Sensor]],
+    interval: float = 1.0,
+    count: Optional[int] = None,
+    stream: Optional[IO[Any]] = None,
+    binary: bool = False,
+) -> None:
+    """Stream readings until the reader hangs up
+
+    Parameters
+    ----------
+    sensors_to_read : iterable of Sensor tuples or strings
+        The sensors to read. See `read_sensor` for the accepted formats.
+    interval : float, optional
+        The number of seconds between samples. Default is 1.
+    count : int, optional
+        The number of samples to send. Default is to keep going forever.
+    stream : file-like, optional
+        Where to write the readings (a binary stream if `binary` is True, otherwise a text stream). Default is stdout.
+    binary : bool, optional
+        If True, use the binary protocol from the `wire` module. Otherwise, the readings are sent as newline-delimited
+        JSON (see `encode_record`). Default is False.
+    """
+    samples = sample(sensors_to_read, interval, count)
+    try:
+        if binary:
+            binary_stream: IO[bytes] = sys.stdout.buffer if stream is None else stream
+            packer: Optional[wire.FramePacker] = None
+            for timestamp, readings in samples:
+                if packer is None:
+                    binary_stream.write(wire.pack_handshake(list(readings)))
+                    packer = wire.FramePacker(len(readings))
+                binary_stream.write(packer.pack(timestamp, readings.data))
+                binary_stream.flush()
+        else:
+            text_stream: IO[str] = sys.stdout if stream is None else stream
+            for timestamp, readings in samples:
+                text_stream.write(encode_record(timestamp, readings))
+                text_stream.flush()
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+
+
+def serve_agent(
+    path: str,
+    sensors_to_read: Iterable[Union[str, Sensor]],
+    interval: float = 1.0,
+    binary: bool = True,
+    max_clients: Optional[int] = None,
+) -> None:
+    """Stream readings to whoever connects to a Unix domain socket
+
+    Clients are served one at a time: each one gets its own stream (starting with a fresh handshake, if using the
+    binary protocol) which runs until the client disconnects.
+
+    Parameters
+    ----------
+    path : str
+        The path of the socket. A stale socket left at this path by an agent that didn't shut down cleanly will be
+        replaced.
+    sensors_to_read : iterable of Sensor tuples or strings
+        The sensors to read. See `read_sensor` for the accepted formats.
+    interval : float, optional
+        The number of seconds between samples. Default is 1.
+    binary : bool, optional
+        If True (default), use the binary protocol from the `wire` module. Otherwise, send newline-delimited JSON.
+    max_clients : int, optional
+        Stop after serving this many clients. Default is to keep going forever.
+
+    Raises
+    ------
+    OSError
+        If something is already listening at `path`, or there's something other than a socket there
+    """
+    sensors_to_read = list(sensors_to_read)
+    remove_stale_socket(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+    except OSError:
+        server.close()
+        raise
+    try:
+        server.listen(1)
+        served = 0
+        while max_clients is None or served < max_clients:
+            connection, _ = server.accept()
+            try:
+                with connection, connection.makefile("wb" if binary else "w") as stream:
+                    run_agent(sensors_to_read, interval, stream=stream, binary=binary)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # whatever was left in the buffer when the client hung up
+            served += 1
+    finally:
+        server.close()
+        os.unlink(path)
@@ -0,0 +1,154 @@
+"""Choose where sensor readings come from
+
+By default readings come from libsensors (via pysensors), plus the thermal zones and CPU frequencies in sysfs. A
+backend can stand in for all of that, so that everything built on `read_sensors` (the sampler, the daemon, the CLI,
+dashboards, alert rules...) can be run against recorded or generated data on any machine.
+
+A backend is anything that looks like the parts of the pysensors module this package uses: `init()`, `cleanup()`
+and `iter_detected_chips()`, yielding chips with `prefix` (bytes) and `addr` attributes that iterate over features
+with a `name` and a `get_value()` (which raises `sensors.SensorsError` when the feature can't be read). A backend can
+also provide:
+- `virtual = True` to hide the machine's own thermal zones and CPU pseudo-sensors (and to keep its chips out of the
+  persisted chip map--see `chip_map`)
+- `time()`, giving the timestamp to record samples at (see `timestamp`), for backends that replay time faster than
+  real time
+- a `num` attribute on each chip, to fix its number suffix (e.g. to the one it was recorded with) instead of having
+  one handed out
+
+Set the MEASURE_TEMP_BACKEND environment variable to pick a backend by spec (see `load_backend`), or call
+`set_backend`.
+"""
+import os
+import time
+from typing import Any, Optional
+
+import sensors
+
+BACKEND_ENV_VAR = "MEASURE_TEMP_BACKEND"
+
+_active: Optional[Any] = None
+
+
+def load_backend(spec: Optional[str] = None) -> Any:
+    """Create a backend from a short description
+
+    Parameters
+    ----------
+    spec : str, optional
+        One of:
+        - "libsensors" (or empty) for the real hardware
+        - "replay:PATH[,speed=N][,loop=1][,start=T]" to play back a history database (see `replay.ReplayBackend`)
+        - "synthetic[:chips=N,features=N,waveform=W,period=S,latency=S,errors=F,seed=N]" for generated sensors
+          (see `synthetic.SyntheticBackend`; every setting is optional)
+        Default is the libsensors backend.
+
+    Returns
+    -------
+    backend
+        The backend (the pysensors module itself, for libsensors)
+
+    Raises
+    ------
+    ValueError
+        If the spec isn't recognized
+    """
+    if not spec or spec == "libsensors":
+        return sensors
+    kind, _, arguments = spec.partition(":")
+    positional, options = _parse_arguments(arguments)
+    if kind == "replay":
+        from .replay import ReplayBackend
+
+        if len(positional) != 1:
+            raise ValueError(f"Expected replay:PATH, got {spec}")
+        unknown = set(options) - {"speed", "loop", "start"}
+        if unknown:
+            raise ValueError(f"Unknown replay backend settings: {sorted(unknown)}")
+        return ReplayBackend(
+            positional[0],
+            speed=float(options.get("speed", 1.0)),
+            loop=options.get("loop", "0") not in ("0", "false", "no"),
+            start=float(options["start"]) if "start" in options else None,
+        )
+    if kind == "synthetic":
+        from .synthetic import SyntheticBackend
+
+        if positional:
+            raise ValueError(f"Expected synthetic:key=value,..., got {spec}")
+        settings = {
+            "chips": int,
+            "features": int,
+            "waveform": str,
+            "period": float,
+            "latency": float,
+            "errors": float,
+            "seed": int,
+        }
+        unknown = set(options) - set(settings)
+        if unknown:
+            raise ValueError(f"Unknown synthetic backend settings: {sorted(unknown)}")
+        kwargs = {key: settings[key](value) for key, value in options.items()}
+        if "errors" in kwargs:
+            kwargs["error_rate"] = kwargs.pop("errors")
+        return SyntheticBackend(**kwargs)
+    raise ValueError(f"Unknown backend: {spec}")
+
+
+def _parse_arguments(arguments: str):
+    """Split "a,b,key=value" into (["a", "b"], {"key": "value"})"""
+    positional = []
+    options = {}
+    for argument in filter(None, arguments.split(",")):
+        key, equals, value = argument.partition("=")
+        if equals:
+            options[key] = value
+        else:
+            positional.append(argument)
+    return positional, options
+
+
+def get_backend() -> Any:
+    """Get the active backend
+
+    Returns
+    -------
+    backend
+        The backend set with `set_backend` or, failing that, the one given by the MEASURE_TEMP_BACKEND environment
+        variable (loaded on first use)
+    """
+    global _active
+    if _active is None:
+        _active = load_backend(os.environ.get(BACKEND_ENV_VAR))
+    return _active
+
+
+def set_backend(backend: Any) -> Any:
+    """Switch backends
+
+    Parameters
+    ----------
+    backend : backend or None
+        The backend to use from now on. None means going back to the one given by the environment.
+
+    Returns
+    -------
+    backend or None
+        The backend that was active before (None if none had been loaded yet), so that it can be restored
+
+    Notes
+    -----
+    Don't switch backends while a sensors session is open.
+    """
+    global _active
+    previous, _active = _active, backend
+    return previous
+
+
+def is_virtual() -> bool:
+    """Check whether the active backend replaces the machine's own sysfs sensors too"""
+    return getattr(get_backend(), "virtual", False)
+
+
+def timestamp() -> float:
+    """Get the (Unix) time to record a sample at: the backend's notion of the time if it has one, else the clock"""
+    return getattr(get_backend(), "time", time.time)()
@@ -0,0 +1,139 @@
+"""Remember which chip each number suffix was given to, across runs
+
+The map is stored as JSON of the form {"chip label": {"device": {"num": num, "seen": time}, ...}, ...}, so that
+"fluxcapacitor1.year" keeps referring to the same chip after a reboot (or after chips come and go), no matter what
+order they get detected in. "seen" is the (Unix) time the device was last around when the map was written; devices
+that haven't been seen for MAX_AGE seconds are forgotten, so that a stream of short-lived (e.g. USB) devices doesn't
+grow the map forever. Devices are identified by where they sit rather than by address alone (many chips sit at address 0),
+with a tag saying where the chip comes from:
+- "sensors:TYPE:NR:ADDR" for a libsensors chip on bus number NR of bus type TYPE
+- "thermal:PATH" for a thermal zone, PATH being the zone's device in sysfs (zone numbers depend on probe order)
+- "cpu:N" for CPU N's pseudo-sensors
+
+Maps written by older versions (keyed by bare addresses) are ignored, so the suffixes are handed out afresh once.
+
+Only the command-line interface writes the map by default (see `read_sensors.persist_chip_map`).
+"""
+import json
+import os
+import tempfile
+import time
+from typing import Collection, Dict, Optional, Tuple
+
+CHIP_MAP_ENV_VAR = "MEASURE_TEMP_CHIP_MAP"
+
+# how long a device that's gone keeps its suffix for (90 days)
+MAX_AGE = 90 * 24 * 3600.0
+
+ChipNums = Dict[Tuple[str, str], int]
+
+
+def default_chip_map_path() -> Optional[str]:
+    """Figure out where the chip map lives
+
+    Returns
+    -------
+    str or None
+        The value of the MEASURE_TEMP_CHIP_MAP environment variable if set (with an empty value meaning that the map
+        shouldn't be persisted at all, in which case this returns None), otherwise chips.json in a per-user cache
+        directory ($XDG_CACHE_HOME/measure_temp, or ~/.cache/measure_temp if that isn't set)
+    """
+    path = os.environ.get(CHIP_MAP_ENV_VAR)
+    if path is not None:
+        return path or None
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache, "measure_temp", "chips.json")
+
+
+def load_chip_map(path: str) -> ChipNums:
+    """Read a chip map
+
+    Parameters
+    ----------
+    path : str
+        The file to read
+
+    Returns
+    -------
+    dict of (str, str) to int
+        The number suffix of each chip, keyed by chip label and device. If the file doesn't exist or can't be
+        parsed, the dict will be empty.
+    """
+    return {key: num for key, (num, _) in _read_chip_map(path).items()}
+
+
+def _read_chip_map(path: str) -> Dict[Tuple[str, str], Tuple[int, Optional[float]]]:
+    """Read a chip map's suffixes along with when each device was last seen (None for maps that didn't say)"""
+    try:
+        with open(path) as map_file:
+            contents = json.load(map_file)
+        entries: Dict[Tuple[str, str], Tuple[int, Optional[float]]] = {}
+        for label, nums in contents.items():
+            for device, entry in nums.items():
+                if ":" not in device:
+                    continue
+                if isinstance(entry, dict):
+                    entries[label, device] = int(entry["num"]), float(entry["seen"])
+                else:
+                    entries[label, device] = int(entry), None
+        return entries
+    except (OSError, ValueError, AttributeError, TypeError, KeyError):
+        return {}
+
+
+def save_chip_map(
+    path: str,
+    chip_nums: ChipNums,
+    seen: Optional[Collection[Tuple[str, str]]] = None,
+    max_age: float = MAX_AGE,
+) -> bool:
+    """Write a chip map (atomically, so that concurrent readers never see a partial file)
+
+    Parameters
+    ----------
+    path : str
+        The file to write. Missing parent directories will be created.
+    chip_nums : dict of (str, str) to int
+        The number suffix of each chip, keyed by chip label and device
+    seen : collection of (str, str), optional
+        The (label, device) keys of the chips that are around now. The others keep the time they were last seen at
+        according to the map already at `path`, and are left out if that's more than `max_age` seconds ago. Default
+        is all of `chip_nums`.
+    max_age : float, optional
+        How many seconds to remember devices that are gone for. Default is MAX_AGE.
+
+    Returns
+    -------
+    bool
+        Whether the map could be written
+    """
+    now = time.time()
+    last_seen = (
+        {}
+        if seen is None
+        else {key: when for key, (_, when) in _read_chip_map(path).items()}
+    )
+    contents: Dict[str, Dict[str, dict]] = {}
+    for (label, device), num in sorted(chip_nums.items()):
+        when = now
+        if seen is not None and (label, device) not in seen:
+            when = last_seen.get((label, device)) or now
+            if when < now - max_age:
+                continue  # long gone
+        contents.setdefault(label, {})[device] = {"num": num, "seen": when}
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w") as map_file:
+                json.dump(contents, map_file, indent=2)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,351 @@
+"""Command-line interface"""
+import asyncio
+import json
+import sys
+from typing import Dict, Optional, Sequence
+
+import click
+
+from .daemon import query_daemon
+from .read_sensors import (
+    find_sensors,
+    format_reading,
+    persist_chip_map,
+    read_many,
+    report_all_readings,
+)
+
+
+@click.group(invoke_without_command=True)
+@click.pass_context
+def main(ctx: click.Context) -> None:
+    """Report sensor readings. Run without a command to display all readings.
+
+    If a daemon is running (see `measure_temp daemon`), readings come from it instead of from the sensors directly.
+    """
+    persist_chip_map()
+    if ctx.invoked_subcommand is None:
+        try:
+            from_daemon = query_daemon()
+        except ValueError:
+            from_daemon = None  # e.g. the daemon hasn't taken its first sample yet
+        if from_daemon is None:
+            report_all_readings()
+            return
+        for name, value in from_daemon[1].items():
+            click.echo(format_reading(name, value))
+
+
+@main.command()
+@click.argument("names", nargs=-1)
+def read(names: Sequence[str]) -> None:
+    """Print the current value of each of the sensors given by NAMES (default is all readable sensors)."""
+    readings: Optional[Dict[str, Optional[float]]] = None
+    try:
+        from_daemon = query_daemon(names)
+        if from_daemon is not None:
+            readings = from_daemon[1]
+    except ValueError:
+        pass  # the daemon isn't sampling one of these sensors
+    if readings is None:
+        try:
+            readings = {
+                str(sensor): value
+                for sensor, value in read_many(names or find_sensors()).items()
+            }
+        except ValueError as oops:
+            raise click.BadParameter(str(oops), param_hint="NAMES")
+    for name, value in readings.items():
+        click.echo(f"{name}={value}")
+
+
+@main.command()
+@click.option("--stdio", is_flag=True, help="Stream readings over stdout.")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Stream readings to clients of a Unix domain socket at this path.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["ndjson", "binary"]),
+    help="Wire format. Default is ndjson over stdio and binary over a socket.",
+)
+@click.option(
+    "-s",
+    "--sensors",
+    "patterns",
+    multiple=True,
+    help="Glob pattern for the sensors to read (can be repeated). Default is all readable sensors.",
+)
+@click.option(
+    "-i",
+    "--interval",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Seconds between samples.",
+)
+@click.option(
+    "-n", "--count", type=int, help="Stop after this many samples (stdio only)."
+)
+def agent(
+    stdio: bool,
+    socket_path: Optional[str],
+    output_format: Optional[str],
+    patterns: Sequence[str],
+    interval: float,
+    count: Optional[int],
+) -> None:
+    """Stream readings for a collector."""
+    from .agent import run_agent, serve_agent
+
+    if stdio == bool(socket_path):
+        raise click.UsageError("Specify exactly one transport: --stdio or --socket")
+    sensors_to_read = find_sensors(*patterns)
+    if stdio:
+        run_agent(
+            sensors_to_read,
+            interval=interval,
+            count=count,
+            binary=output_format == "binary",
+        )
+    else:
+        assert socket_path is not None
+        serve_agent(
+            socket_path,
+            sensors_to_read,
+            interval=interval,
+            binary=output_format != "ndjson",
+        )
+
+
+@main.command()
+@click.argument("hosts", nargs=-1, required=True)
+@click.option(
+    "--local",
+    is_flag=True,
+    help="Launch the agents as local subprocesses instead of over SSH (the hosts are then just labels).",
+)
+@click.option(
+    "-s",
+    "--sensors",
+    "patterns",
+    multiple=True,
+    help="Glob pattern for the sensors to read (can be repeated). Default is all readable sensors.",
+)
+@click.option(
+    "-i",
+    "--interval",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Seconds between samples.",
+)
+@click.option(
+    "--binary",
+    is_flag=True,
+    help="Have the agents use the compact binary protocol instead of JSON.",
+)
+@click.option(
+    "--agent-command",
+    default="measure_temp",
+    show_default=True,
+    help="The measure_temp executable on the remote hosts.",
+)
+def collect(
+    hosts: Sequence[str],
+    local: bool,
+    patterns: Sequence[str],
+    interval: float,
+    binary: bool,
+    agent_command: str,
+) -> None:
+    """Stream readings from agents on HOSTS as a single newline-delimited JSON stream."""
+    from .collector import Collector, agent_arguments, local_command, ssh_command
+
+    arguments = agent_arguments(patterns, interval, binary=binary)
+    commands = {
+        host: local_command(arguments)
+        if local
+        else ssh_command(host, arguments, executable=agent_command)
+        for host in hosts
+    }
+
+    async def _collect() -> None:
+        async with Collector(commands, binary=binary) as collector:
+            async for record in collector.records():
+                sys.stdout.write(json.dumps(record) + "\n")
+                sys.stdout.flush()
+
+    try:
+        asyncio.run(_collect())
+    except KeyboardInterrupt:
+        pass
+
+
+@main.command()
+@click.option(
+    "-s",
+    "--sensors",
+    "patterns",
+    multiple=True,
+    help="Glob pattern for the sensors to sample (can be repeated). Default is all readable sensors.",
+)
+@click.option(
+    "-i",
+    "--interval",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Seconds between samples.",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Path of the socket to listen on. Default is $MEASURE_TEMP_SOCKET, or a per-user path in $XDG_RUNTIME_DIR.",
+)
+@click.option(
+    "--shared-memory",
+    "shared_memory_name",
+    is_flag=False,
+    flag_value="measure_temp",
+    help="Also publish the latest readings to a shared memory segment (named measure_temp unless a name is given).",
+)
+@click.option(
+    "--deadline",
+    type=float,
+    help="Read the sensors from a separate process, giving up on (and backing off from) any read that takes longer "
+    "than this many seconds.",
+)
+@click.option(
+    "--history",
+    "history_path",
+    type=click.Path(dir_okay=False),
+    help="Also record every sample to this SQLite database.",
+)
+@click.option(
+    "--keep-raw",
+    type=float,
+    help="Drop raw readings from the history once they're this many seconds old, keeping only the per-minute and "
+    "per-hour aggregates.",
+)
+def daemon(
+    patterns: Sequence[str],
+    interval: float,
+    socket_path: Optional[str],
+    shared_memory_name: Optional[str],
+    deadline: Optional[float],
+    history_path: Optional[str],
+    keep_raw: Optional[float],
+) -> None:
+    """Sample sensors in the background and share the readings with local clients."""
+    from .daemon import run_daemon
+
+    try:
+        run_daemon(
+            find_sensors(*patterns),
+            interval=interval,
+            path=socket_path,
+            shared_memory_name=shared_memory_name,
+            deadline=deadline,
+            history_path=history_path,
+            keep_raw=keep_raw,
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+@main.command(context_settings={"ignore_unknown_options": True})
+@click.argument("command", nargs=-1, required=True, type=click.UNPROCESSED)
+@click.option(
+    "-s",
+    "--sensors",
+    "patterns",
+    multiple=True,
+    help="Glob pattern for the sensors to sample (can be repeated). Default is all readable sensors.",
+)
+@click.option(
+    "-i",
+    "--interval",
+    type=float,
+    default=0.1,
+    show_default=True,
+    help="Seconds between samples.",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    help="Report time spent above this reading. Default is each sensor's high limit.",
+)
+@click.pass_context
+def run(
+    ctx: click.Context,
+    command: Sequence[str],
+    patterns: Sequence[str],
+    interval: float,
+    threshold: Optional[float],
+) -> None:
+    """Run COMMAND, sampling sensors while it runs, then print a thermal report (to stderr).
+
+    Put the command after a "--", e.g. `measure_temp run -s 'coretemp.*' -- make -j32`. Exits with the command's
+    exit code.
+    """
+    import subprocess
+
+    from .profiling import profile
+
+    with profile(find_sensors(*patterns), interval, threshold) as thermal_profile:
+        try:
+            returncode = subprocess.call(list(command))
+        except FileNotFoundError:
+            raise click.UsageError(f"Command not found: {command[0]}")
+        except KeyboardInterrupt:
+            returncode = 130
+    click.echo(
+        f"\n{' '.join(command)} exited with {returncode} after "
+        f"{thermal_profile.duration:.2f}s ({len(thermal_profile.timestamps)} samples)",
+        err=True,
+    )
+    click.echo(thermal_profile.report(), err=True)
+    ctx.exit(returncode)
+
+
+@main.command()
+@click.argument("database", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output", type=click.Path(dir_okay=False))
+@click.option(
+    "--start", type=float, help="Only export readings from this Unix time on."
+)
+@click.option(
+    "--end", type=float, help="Only export readings from before this Unix time."
+)
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["parquet", "arrow"]),
+    help="Default is to go by the extension of OUTPUT (.arrow / .feather / .ipc for Arrow, otherwise Parquet).",
+)
+@click.option(
+    "--row-group-size",
+    type=int,
+    default=1 << 16,
+    show_default=True,
+    help="Readings per row group (which bounds the memory the export takes).",
+)
+def export(
+    database: str,
+    output: str,
+    start: Optional[float],
+    end: Optional[float],
+    file_format: Optional[str],
+    row_group_size: int,
+) -> None:
+    """Export the readings recorded in DATABASE (see `measure_temp daemon --history`) to a Parquet or Arrow file."""
+    from .export import export_history
+
+    rows = export_history(database, output, start, end, row_group_size, file_format)
+    click.echo(f"Exported {rows} readings to {output}", err=True)
@@ -0,0 +1,300 @@
+"""Collect readings from agents running on many hosts over persistent connections"""
+import asyncio
+import json
+import logging
+import shlex
+import sys
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence
+
+from . import wire
+
+Record = Dict[str, Any]
+
+LOGGER = logging.getLogger(__name__)
+
+# stream lines can get long on boxes with a lot of sensors
+_LINE_LIMIT = 2**20
+# how much of what an agent wrote to stderr to log when it fails
+_STDERR_TAIL = 2048
+_STDERR_TIMEOUT = 1.0
+_MAX_RECONNECT_DELAY = 60.0
+
+
+def agent_arguments(
+    patterns: Sequence[str] = (), interval: float = 1.0, binary: bool = False
+) -> List[str]:
+    """Build the command-line arguments for launching a stdio agent
+
+    Parameters
+    ----------
+    patterns : list of str, optional
+        Glob patterns for the sensors the agent should read. Default is all readable sensors.
+    interval : float, optional
+        The number of seconds between samples. Default is 1.
+    binary : bool, optional
+        If True, have the agent use the binary protocol instead of newline-delimited JSON. Default is False.
+
+    Returns
+    -------
+    list of str
+        The arguments to pass after the "measure_temp" executable
+    """
+    arguments = ["agent", "--stdio", "--interval", str(interval)]
+    if binary:
+        arguments.extend(("--format", "binary"))
+    for pattern in patterns:
+        arguments.extend(("--sensors", pattern))
+    return arguments
+
+
+def ssh_command(
+    host: str, arguments: Sequence[str], executable: str = "measure_temp"
+) -> List[str]:
+    """Build the command for launching an agent on a remote host via SSH
+
+    Parameters
+    ----------
+    host : str
+        The host to connect to (anything ssh understands, including aliases from your ssh config)
+    arguments : list of str
+        The arguments for the agent (see `agent_arguments`)
+    executable : str, optional
+        The command to run on the remote host. Default is "measure_temp".
+
+    Returns
+    -------
+    list of str
+        The command
+
+    Notes
+    -----
+    ssh hands the remote command to the remote user's shell as a single string, so the executable and each argument
+    are shell-quoted (otherwise a pattern like "coretemp.*" would be glob-expanded on the other end).
+    """
+    return [
+        "ssh",
+        "-T",
+        "-o",
+        "BatchMode=yes",
+        "-o",
+        "ServerAliveInterval=15",
+        host,
+        shlex.quote(executable),
+        *(shlex.quote(argument) for argument in arguments),
+    ]
+
+
+def local_command(arguments: Sequence[str]) -> List[str]:
+    """Build the command for launching an agent as a local subprocess
+
+    Parameters
+    ----------
+    arguments : list of str
+        The arguments for the agent (see `agent_arguments`)
+
+    Returns
+    -------
+    list of str
+        The command
+    """
+    return [sys.executable, "-m", "measure_temp", *arguments]
+
+
+class Collector:
+    """Fan-in of the record streams of many agents
+
+    Each agent is launched once and kept running for as long as the collector is open, so that the cost of
+    connecting (and of starting up Python on the other end) is only paid once per host instead of once per reading.
+
+    Parameters
+    ----------
+    commands : dict of str to list of str
+        The command for launching each host's agent, keyed by host name
+    reconnect_delay : float, optional
+        The number of seconds to wait before relaunching an agent that exited (or couldn't be launched). The delay
+        doubles with each attempt in a row that doesn't get a single record through (up to a minute). If None,
+        agents are not relaunched, and the stream of records ends once every agent has exited. Default is 1.
+    binary : bool, optional
+        If True, the agents speak the binary protocol from the `wire` module (launch them with
+        `agent_arguments(binary=True)`). Otherwise, they're expected to send newline-delimited JSON. Either way,
+        the collected records are dicts. Default is False.
+    max_failures : int, optional
+        Give up on a host after this many attempts in a row that don't get a single record through. If None, keep
+        trying forever. Default is 5.
+
+    Notes
+    -----
+    Failed launches get logged, and so do agents exiting with a non-zero status (along with the end of what they
+    wrote to stderr).
+
+    Examples
+    --------
+    >>> async def print_records(hosts):
+    ...     commands = {host: ssh_command(host, agent_arguments()) for host in hosts}
+    ...     async with Collector(commands) as collector:
+    ...         async for record in collector.records():
+    ...             print(record)
+    """
+
+    def __init__(
+        self,
+        commands: Mapping[str, Sequence[str]],
+        reconnect_delay: Optional[float] = 1.0,
+        binary: bool = False,
+        max_failures: Optional[int] = 5,
+    ):
+        self.commands = dict(commands)
+        self.reconnect_delay = reconnect_delay
+        self.binary = binary
+        self.max_failures = max_failures
+        self._tasks: List["asyncio.Future[None]"] = []
+
+    async def __aenter__(self) -> "Collector":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def records(self) -> AsyncIterator[Record]:
+        """Stream records from all agents as they arrive
+
+        Yields
+        ------
+        dict
+            The agent's record with an additional "host" field
+        """
+        queue: "asyncio.Queue[Optional[Record]]" = asyncio.Queue()
+        self._tasks = [
+            asyncio.ensure_future(self._follow(host, command, queue))
+            for host, command in self.commands.items()
+        ]
+        running = len(self._tasks)
+        while running:
+            record = await queue.get()
+            if record is None:
+                running -= 1
+                continue
+            yield record
+
+    async def close(self) -> None:
+        """Shut down all agents"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _follow(
+        self,
+        host: str,
+        command: Sequence[str],
+        queue: "asyncio.Queue[Optional[Record]]",
+    ) -> None:
+        failures = 0
+        try:
+            while True:
+                if await self._run_agent(host, command, queue):
+                    failures = 0
+                else:
+                    failures += 1
+                if self.reconnect_delay is None:
+                    break
+                if self.max_failures is not None and failures >= self.max_failures:
+                    LOGGER.error(
+                        "Giving up on %s after %d failed attempts in a row",
+                        host,
+                        failures,
+                    )
+                    break
+                delay = self.reconnect_delay * 2 ** max(failures - 1, 0)
+                await asyncio.sleep(
+                    min(delay, max(self.reconnect_delay, _MAX_RECONNECT_DELAY))
+                )
+        finally:
+            queue.put_nowait(None)
+
+    async def _run_agent(
+        self,
+        host: str,
+        command: Sequence[str],
+        queue: "asyncio.Queue[Optional[Record]]",
+    ) -> bool:
+        """Launch an agent and forward its records until it exits, returning whether any came through"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=_LINE_LIMIT,
+            )
+        except OSError:
+            LOGGER.exception("Could not launch the agent for %s", host)
+            return False
+        stderr_tail = bytearray()
+        assert process.stderr is not None
+        draining = asyncio.ensure_future(_drain(process.stderr, stderr_tail))
+        read_records = _read_frames if self.binary else _read_lines
+        received = garbled = False
+        try:
+            try:
+                async for record in read_records(process.stdout):  # type: ignore[arg-type]
+                    record["host"] = host
+                    received = True
+                    await queue.put(record)
+            except (ValueError, asyncio.IncompleteReadError):
+                garbled = True  # relaunch the agent
+                if process.returncode is None:
+                    process.terminate()
+            await process.wait()
+            # whatever the agent passed its stderr on to (e.g. an SSH control master) may keep it open
+            await asyncio.wait({draining}, timeout=_STDERR_TIMEOUT)
+        finally:
+            if process.returncode is None:
+                process.terminate()
+                await process.wait()
+            draining.cancel()
+        if process.returncode and not garbled:
+            LOGGER.warning(
+                "The agent for %s exited with status %d%s",
+                host,
+                process.returncode,
+                f":\n{stderr_tail.decode(errors='replace').strip()}"
+                if stderr_tail.strip()
+                else "",
+            )
+        return received
+
+
+async def _drain(reader: asyncio.StreamReader, tail: bytearray) -> None:
+    """Read a stream to the end, keeping only the last _STDERR_TAIL bytes"""
+    while True:
+        chunk = await reader.read(1 << 16)
+        if not chunk:
+            return
+        tail += chunk
+        del tail[:-_STDERR_TAIL]
+
+
+async def _read_lines(reader: asyncio.StreamReader) -> AsyncIterator[Record]:
+    async for line in reader:
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+async def _read_frames(reader: asyncio.StreamReader) -> AsyncIterator[Record]:
+    unpacker: Optional[wire.FrameUnpacker] = None
+    while True:
+        message = await wire.read_message_async(reader)
+        if message is None:
+            return
+        kind, body = message
+        if kind == wire.HANDSHAKE:
+            unpacker = wire.FrameUnpacker(wire.unpack_handshake(body))
+        elif kind == wire.READINGS and unpacker is not None:
+            timestamp, readings = unpacker.unpack(body)
+            yield {
+                "time": timestamp,
+                "readings": readings.by_name(),
+            }
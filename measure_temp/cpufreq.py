@@ -0,0 +1,138 @@
+"""Get CPU frequencies and thermal throttling counters, so that they can be sampled alongside temperatures
+
+Each CPU shows up as a pseudo-chip labelled "cpuN" (with N as its address) with up to three features:
+"freq" (the current frequency, in MHz, from cpufreq) and "core_throttle_count" / "package_throttle_count" (the number
+of times the core / package has been throttled for running hot, from thermal_throttle--Intel only).
+"""
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+import sensors
+
+CPU_ROOT = "/sys/devices/system/cpu"
+FREQUENCY = "freq"
+CORE_THROTTLE_COUNT = "core_throttle_count"
+PACKAGE_THROTTLE_COUNT = "package_throttle_count"
+
+# where each feature lives within a cpuN directory, and what to multiply the raw value by
+_FEATURE_FILES = {
+    FREQUENCY: (os.path.join("cpufreq", "scaling_cur_freq"), 0.001),
+    CORE_THROTTLE_COUNT: (os.path.join("thermal_throttle", CORE_THROTTLE_COUNT), 1),
+    PACKAGE_THROTTLE_COUNT: (
+        os.path.join("thermal_throttle", PACKAGE_THROTTLE_COUNT),
+        1,
+    ),
+}
+
+_CPU_DIRECTORY = re.compile(r"^cpu(\d+)$")
+
+# open file descriptors for each feature's file, keyed by path, so that repeated reads only cost a single pread
+_fds: Dict[str, int] = {}
+
+
+class CpuFeature(NamedTuple):
+    """A CPU pseudo-sensor exposed via sysfs
+
+    Attributes
+    ----------
+    cpu : int
+        The CPU number
+    feature : str
+        One of FREQUENCY, CORE_THROTTLE_COUNT or PACKAGE_THROTTLE_COUNT
+    path : str
+        The file the value is read from
+    """
+
+    cpu: int
+    feature: str
+    path: str
+
+
+def chip_label(cpu: int) -> str:
+    """The chip label used for a CPU's pseudo-sensors"""
+    return f"cpu{cpu}"
+
+
+def list_cpu_features(root: Optional[str] = None) -> List[CpuFeature]:
+    """List the frequency and throttle counters of every CPU
+
+    Parameters
+    ----------
+    root : str, optional
+        The directory to look for CPUs in. Default is CPU_ROOT
+
+    Returns
+    -------
+    list of CpuFeature
+        The available features, sorted by CPU number. If the directory doesn't exist, the list will be empty.
+    """
+    root = root or CPU_ROOT
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return []
+
+    features: List[CpuFeature] = []
+    for entry in entries:
+        match = _CPU_DIRECTORY.match(entry)
+        if match is None:
+            continue
+        for feature, (relative_path, _) in _FEATURE_FILES.items():
+            path = os.path.join(root, entry, relative_path)
+            if os.path.exists(path):
+                features.append(CpuFeature(int(match[1]), feature, path))
+    return sorted(features)
+
+
+def is_cpu_feature(chip: str, addr: int, feature: str) -> bool:
+    """Check whether a sensor specification refers to a CPU pseudo-sensor"""
+    return feature in _FEATURE_FILES and chip == chip_label(addr)
+
+
+def read_cpu_feature(cpu: int, feature: str, root: Optional[str] = None) -> float:
+    """Read a CPU's frequency or throttle count
+
+    Parameters
+    ----------
+    cpu : int
+        The CPU number
+    feature : str
+        One of FREQUENCY, CORE_THROTTLE_COUNT or PACKAGE_THROTTLE_COUNT
+    root : str, optional
+        The directory to look for CPUs in. Default is CPU_ROOT
+
+    Returns
+    -------
+    float
+        The frequency in MHz, or the throttle count
+
+    Raises
+    ------
+    SensorsError
+        If the value cannot be read
+
+    Notes
+    -----
+    As with thermal zones, the file descriptor is kept open after the first read, and every subsequent read is a
+    single pread.
+    """
+    relative_path, scale = _FEATURE_FILES[feature]
+    path = os.path.join(root or CPU_ROOT, chip_label(cpu), relative_path)
+    try:
+        fd = _fds.get(path)
+        if fd is None:
+            fd = _fds[path] = os.open(path, os.O_RDONLY)
+        return int(os.pread(fd, 32, 0)) * scale
+    except (OSError, ValueError) as oops:
+        fd = _fds.pop(path, None)
+        if fd is not None:
+            os.close(fd)
+        raise sensors.SensorsError(f"Could not read {path}: {oops}")
+
+
+def close_cpu_features() -> None:
+    """Close all cached file descriptors"""
+    while _fds:
+        _, fd = _fds.popitem()
+        os.close(fd)
@@ -0,0 +1,243 @@
+"""Daemon that holds a single sensors session and answers queries over a Unix domain socket
+
+The protocol is one line of JSON per request and one line of JSON per response. A request is an object with a "read"
+key giving a list of sensor names (an empty list means all sampled sensors), and the response is either
+{"time": ..., "readings": {"chip.feature": value, ...}} or {"error": "..."}.
+"""
+import errno
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+from contextlib import ExitStack
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from .read_sensors import Sensor
+from .sampler import Sampler
+
+SOCKET_PATH_ENV_VAR = "MEASURE_TEMP_SOCKET"
+
+DaemonReadings = Tuple[float, Dict[str, Optional[float]]]
+
+
+def default_socket_path() -> str:
+    """Figure out where the daemon's socket lives
+
+    Returns
+    -------
+    str
+        The value of the MEASURE_TEMP_SOCKET environment variable if set, otherwise a per-user path in
+        $XDG_RUNTIME_DIR (or the temp directory, if that isn't set)
+    """
+    if os.environ.get(SOCKET_PATH_ENV_VAR):
+        return os.environ[SOCKET_PATH_ENV_VAR]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "measure_temp.sock")
+    return os.path.join(tempfile.gettempdir(), f"measure_temp-{os.getuid()}.sock")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                names = json.loads(line)["read"]
+                response = self.server.respond(names)
+            except (ValueError, KeyError, TypeError) as oops:
+                response = {"error": str(oops)}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Socket server answering queries from the latest sample of a background sampler
+
+    Parameters
+    ----------
+    path : str
+        The path of the socket. A stale socket left at this path by a daemon that didn't shut down cleanly will be
+        replaced.
+    sampler : Sampler
+        The (running) sampler whose readings to serve
+
+    Raises
+    ------
+    OSError
+        If another daemon is already listening at `path`, or there's something other than a socket there
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, sampler: Sampler):
+        remove_stale_socket(path)
+        self.sampler = sampler
+        self._bound = False
+        super().__init__(path, _RequestHandler)
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        self._bound = True
+
+    def respond(self, names: Sequence[str]) -> dict:
+        latest = self.sampler.latest
+        if latest is None:
+            raise ValueError("No readings yet")
+        timestamp, readings = latest
+        by_name = readings.by_name()
+        if not names:
+            return {"time": timestamp, "readings": by_name}
+        try:
+            return {
+                "time": timestamp,
+                "readings": {name: by_name[name] for name in names},
+            }
+        except KeyError as missing:
+            raise ValueError(
+                f"Could not find a sensor matching descriptor {missing.args[0]}"
+            )
+
+    def server_close(self) -> None:
+        super().server_close()
+        # only remove the socket if it's ours (binding fails if someone else's is there)
+        if self._bound and os.path.exists(self.server_address):  # type: ignore[arg-type]
+            os.unlink(self.server_address)  # type: ignore[arg-type]
+            self._bound = False
+
+
+def remove_stale_socket(path: str) -> None:
+    """Remove the socket at `path` if nothing is listening on it anymore
+
+    Anything other than a socket is left in place (so binding to `path` will fail rather than clobber it).
+
+    Raises
+    ------
+    OSError
+        If something is listening on the socket
+    """
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise OSError(errno.EADDRINUSE, f"Something is already listening on {path}")
+
+
+def run_daemon(
+    sensors_to_read: Iterable[Union[str, Sensor]],
+    interval: float = 1.0,
+    path: Optional[str] = None,
+    shared_memory_name: Optional[str] = None,
+    deadline: Optional[float] = None,
+    history_path: Optional[str] = None,
+    keep_raw: Optional[float] = None,
+) -> None:
+    """Sample sensors in the background and serve the readings until interrupted (by Ctrl+C or SIGTERM)
+
+    Parameters
+    ----------
+    sensors_to_read : iterable of Sensor tuples or strings
+        The sensors to sample. See `read_sensor` for the accepted formats.
+    interval : float, optional
+        The number of seconds between samples. Default is 1.
+    path : str, optional
+        The path of the socket. Default is given by `default_socket_path`.
+    shared_memory_name : str, optional
+        If provided, the latest readings will also be published to a shared memory segment with this name (see the
+        `shm` module).
+    deadline : float, optional
+        If provided, the sensors are read from a separate process, giving up on any that take longer than this many
+        seconds (see `Sampler`).
+    history_path : str, optional
+        If provided, every sample will also be recorded to a SQLite database at this path (see `HistoryWriter`).
+    keep_raw : float, optional
+        If provided, raw readings older than this many seconds are dropped from the history (the per-minute and
+        per-hour aggregates are kept).
+
+    Raises
+    ------
+    KeyboardInterrupt
+        Once interrupted, after shutting everything down (SIGTERM is turned into a KeyboardInterrupt when running in
+        the main thread, so that it gets the same cleanup)
+    """
+    with ExitStack() as stack:
+        if threading.current_thread() is threading.main_thread():
+            previous = signal.signal(signal.SIGTERM, _interrupt)
+            stack.callback(signal.signal, signal.SIGTERM, previous)
+        sampler = stack.enter_context(Sampler(sensors_to_read, interval, deadline))
+        if shared_memory_name:
+            from .shm import SharedReadingsWriter
+
+            writer = stack.enter_context(
+                SharedReadingsWriter(sampler.sensors, shared_memory_name)
+            )
+            sampler.subscribe(writer.publish)
+            stack.callback(sampler.unsubscribe, writer.publish)
+        if history_path:
+            from .history import HistoryWriter
+
+            history = stack.enter_context(
+                HistoryWriter(history_path, raw_retention=keep_raw)
+            )
+            sampler.subscribe(history.record)
+            stack.callback(sampler.unsubscribe, history.record)
+        server = stack.enter_context(
+            DaemonServer(path or default_socket_path(), sampler)
+        )
+        server.serve_forever()
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt(f"Received signal {signum}")
+
+
+def query_daemon(
+    names: Sequence[str] = (), path: Optional[str] = None, timeout: float = 1.0
+) -> Optional[DaemonReadings]:
+    """Get the latest readings from a running daemon
+
+    Parameters
+    ----------
+    names : list of str, optional
+        The sensors to read, given by their string representations. Default is all sensors sampled by the daemon.
+    path : str, optional
+        The path of the daemon's socket. Default is given by `default_socket_path`.
+    timeout : float, optional
+        The number of seconds to wait for a response. Default is 1.
+
+    Returns
+    -------
+    tuple of (float, dict) or None
+        The time of the daemon's latest sample and the readings, keyed by sensor name (unreadable sensors will have a
+        value of None), or None if no daemon is running
+
+    Raises
+    ------
+    ValueError
+        If the daemon doesn't know about one of the requested sensors
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(path or default_socket_path())
+            client.sendall((json.dumps({"read": list(names)}) + "\n").encode())
+            with client.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError:  # no socket, stale socket or unresponsive daemon
+        return None
+    if not line:
+        return None
+    response = json.loads(line)
+    if "error" in response:
+        raise ValueError(response["error"])
+    return response["time"], response["readings"]
@@ -0,0 +1,167 @@
+"""Live-updating table of sensor readings for Jupyter notebooks
+
+Requires IPython.
+"""
+import html
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Union
+
+from .read_sensors import Sensor, find_sensors
+from .readings import Readings
+from .sampler import Sampler
+
+_SPARKLINE_WIDTH = 120
+_SPARKLINE_HEIGHT = 20
+
+
+def _sparkline(history: Iterable[float]) -> str:
+    """Draw a series of values as a tiny inline SVG (skipping unreadable values)"""
+    points = [(i, value) for i, value in enumerate(history) if value == value]
+    if len(points) < 2:
+        return ""
+    low = min(value for _, value in points)
+    span = max(value for _, value in points) - low or 1.0
+    step = _SPARKLINE_WIDTH / max(points[-1][0], 1)
+    coordinates = " ".join(
+        f"{i * step:.1f},{_SPARKLINE_HEIGHT - (value - low) / span * _SPARKLINE_HEIGHT:.1f}"
+        for i, value in points
+    )
+    return (
+        f'<svg width="{_SPARKLINE_WIDTH}" height="{_SPARKLINE_HEIGHT}">'
+        f'<polyline points="{coordinates}" fill="none" stroke="currentColor"/></svg>'
+    )
+
+
+class Dashboard:
+    """Show the readings of a set of sensors in a notebook, updating a single output in place
+
+    The sensors are sampled on a background thread (see `Sampler`), so the kernel stays free while the dashboard is
+    running. Redraws are throttled to a maximum frame rate no matter how fast the sampling is.
+
+    Parameters
+    ----------
+    sensors_to_read : iterable of Sensor tuples or strings, optional
+        The sensors to show. See `read_sensor` for the accepted formats. Default is all readable sensors.
+    interval : float, optional
+        The number of seconds between samples. Default is 1.
+    max_fps : float, optional
+        The maximum number of redraws per second. Default is 2.
+    history : int, optional
+        The number of samples to keep for each sensor's sparkline (and min / max). Default is 60.
+
+    Examples
+    --------
+    >>> dashboard = Dashboard(find_sensors("coretemp.*"), interval=0.5).start()
+    >>> run_benchmark()
+    >>> dashboard.stop()
+    """
+
+    def __init__(
+        self,
+        sensors_to_read: Optional[Iterable[Union[str, Sensor]]] = None,
+        interval: float = 1.0,
+        max_fps: float = 2.0,
+        history: int = 60,
+    ):
+        self.sampler = Sampler(
+            find_sensors() if sensors_to_read is None else sensors_to_read, interval
+        )
+        self.min_frame_time = 1.0 / max_fps
+        self.history_length = history
+        self._history: Dict[Sensor, Deque[float]] = {}
+        self._latest: Optional[Readings] = None
+        self._last_frame = -math.inf
+        self._handle = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.sampler.running
+
+    def start(self) -> "Dashboard":
+        """Display the dashboard and start sampling"""
+        from IPython.display import HTML, display
+
+        if self.running:
+            return self
+        if self._handle is None:
+            self._handle = display(HTML(self.render()), display_id=True)
+        self.sampler.subscribe(self._on_sample)
+        self.sampler.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop sampling, leaving the final readings on display"""
+        self.sampler.stop()
+        self.sampler.unsubscribe(self._on_sample)
+        self._redraw()
+
+    def __enter__(self) -> "Dashboard":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _on_sample(self, timestamp: float, readings: Readings) -> None:
+        with self._lock:
+            self._latest = readings
+            for sensor, value in zip(readings.table, readings.data):
+                history = self._history.get(sensor)
+                if history is None:
+                    history = self._history[sensor] = deque(maxlen=self.history_length)
+                history.append(value)
+        if time.monotonic() - self._last_frame >= self.min_frame_time:
+            self._redraw()
+
+    def _redraw(self) -> None:
+        from IPython.display import HTML
+
+        self._last_frame = time.monotonic()
+        if self._handle is not None:
+            self._handle.update(HTML(self.render()))
+
+    def render(self) -> str:
+        """Draw the dashboard
+
+        Returns
+        -------
+        str
+            An HTML table with the latest reading, the min and max over the history and a sparkline for each sensor.
+            Readings at or above a sensor's high limit are shown in bold, and at or above its critical limit in red.
+        """
+        with self._lock:
+            readings = self._latest
+            rows: List[str] = []
+            if readings is not None:
+                table = readings.table
+                for i, (name, value, unit) in enumerate(
+                    zip(table.names, readings.data, table.units)
+                ):
+                    history = [
+                        reading
+                        for reading in self._history.get(table[i], ())
+                        if reading == reading
+                    ]
+                    style = ""
+                    if value >= table.critical[i]:
+                        style = ' style="color: red; font-weight: bold"'
+                    elif value >= table.high[i]:
+                        style = ' style="font-weight: bold"'
+                    rows.append(
+                        f"<tr><td>{html.escape(name)}</td>"
+                        f"<td{style}>{_format(value, unit)}</td>"
+                        f"<td>{_format(min(history, default=math.nan), unit)}</td>"
+                        f"<td>{_format(max(history, default=math.nan), unit)}</td>"
+                        f"<td>{_sparkline(self._history.get(table[i], ()))}</td></tr>"
+                    )
+        return (
+            "<table><thead><tr><th>Sensor</th><th>Now</th><th>Min</th><th>Max</th><th></th></tr></thead>"
+            f"<tbody>{''.join(rows)}</tbody></table>"
+        )
+
+
+def _format(value: float, unit: str) -> str:
+    return "&mdash;" if value != value else html.escape(f"{value:g}{unit}")
@@ -35,15 +35,27 @@
 # CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import functools
+import os
 
+FRONTEND_ENV_VAR = "MEASURE_TEMP_FRONTEND"
 
+
+@functools.lru_cache(maxsize=None)
 def in_ipython_frontend() -> bool:
     """
     Check if we're inside an IPython zmq frontend.
+
+    The answer is worked out once per process. Set the MEASURE_TEMP_FRONTEND environment variable to "notebook" or
+    "terminal" to skip the detection altogether.
+
     Returns
     -------
     bool
     """
+    override = os.environ.get(FRONTEND_ENV_VAR, "").lower()
+    if override in ("notebook", "terminal"):
+        return override == "notebook"
     try:
         # error: Name 'get_ipython' is not defined
         ip = get_ipython()  # type: ignore[name-defined]
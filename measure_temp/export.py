@@ -0,0 +1,208 @@
+"""Export recorded history (see the `history` module) as Arrow / Parquet files for pandas, Polars and friends
+
+Requires PyArrow.
+
+Each row is one reading, with the sensor split into its parts. "chip" and "feature" are dictionary-encoded (against
+a dictionary of every chip / feature in the database), so they cost a few bytes per row and load as categoricals.
+The readings are streamed out one row group (or record batch) at a time, so exports take a bounded amount of memory
+no matter how big the history is.
+
+Examples
+--------
+>>> export_history("history.db", "history.parquet")
+>>> pandas.read_parquet("history.parquet")
+"""
+import math
+import os
+import sqlite3
+from typing import Iterator, Optional, Union
+
+from .history import connect
+
+DEFAULT_ROW_GROUP_SIZE = 1 << 16
+
+
+def history_schema():
+    """The schema of exported history
+
+    Returns
+    -------
+    pyarrow.Schema
+        time (seconds since the epoch), chip, addr, feature, num, value
+    """
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("time", pa.float64()),
+            ("chip", pa.dictionary(pa.int32(), pa.string())),
+            ("addr", pa.int64()),
+            ("feature", pa.dictionary(pa.int32(), pa.string())),
+            ("num", pa.int64()),
+            ("value", pa.float64()),
+        ]
+    )
+
+
+def iter_history_batches(
+    database: Union[str, sqlite3.Connection],
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    batch_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> Iterator:
+    """Read the raw readings out of a history database in record batches
+
+    Parameters
+    ----------
+    database : str or Connection
+        The database file (or an open connection to it)
+    start, end : float, optional
+        The (Unix) time range to export. Default is everything.
+    batch_size : int, optional
+        The maximum number of rows in each batch
+
+    Yields
+    ------
+    pyarrow.RecordBatch
+        Batches in `history_schema`, ordered by time
+
+    Raises
+    ------
+    FileNotFoundError
+        If there's no database at `database`
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    schema = history_schema()
+    connection = (
+        connect(database, read_only=True) if isinstance(database, str) else database
+    )
+    try:
+        sensor_rows = connection.execute(
+            "SELECT id, chip, addr, feature, num FROM sensors ORDER BY id"
+        ).fetchall()
+        if not sensor_rows:
+            return
+        chips = sorted({row[1] for row in sensor_rows})
+        features = sorted({row[3] for row in sensor_rows})
+        chip_dictionary = pa.array(chips, pa.string())
+        feature_dictionary = pa.array(features, pa.string())
+
+        # per-sensor lookup tables, indexed by sensor id, so each batch is converted with a handful of vector takes
+        size = sensor_rows[-1][0] + 1
+        chip_codes = np.zeros(size, dtype=np.int32)
+        feature_codes = np.zeros(size, dtype=np.int32)
+        addrs = np.zeros(size, dtype=np.int64)
+        nums = np.zeros(size, dtype=np.int64)
+        chip_index = {chip: i for i, chip in enumerate(chips)}
+        feature_index = {feature: i for i, feature in enumerate(features)}
+        for sensor_id, chip, addr, feature, num in sensor_rows:
+            chip_codes[sensor_id] = chip_index[chip]
+            feature_codes[sensor_id] = feature_index[feature]
+            addrs[sensor_id] = addr
+            nums[sensor_id] = num
+
+        cursor = connection.execute(
+            "SELECT time, sensor_id, value FROM readings"
+            " WHERE time >= ? AND time < ? ORDER BY time",
+            (
+                -math.inf if start is None else start,
+                math.inf if end is None else end,
+            ),
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            block = np.array(
+                rows, dtype=[("time", "f8"), ("sensor_id", "i8"), ("value", "f8")]
+            )
+            ids = block["sensor_id"]
+            yield pa.RecordBatch.from_arrays(
+                [
+                    pa.array(block["time"]),
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(chip_codes[ids]), chip_dictionary
+                    ),
+                    pa.array(addrs[ids]),
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(feature_codes[ids]), feature_dictionary
+                    ),
+                    pa.array(nums[ids]),
+                    pa.array(block["value"]),
+                ],
+                schema=schema,
+            )
+    finally:
+        if isinstance(database, str):
+            connection.close()
+
+
+def export_history(
+    database: Union[str, sqlite3.Connection],
+    path: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    file_format: Optional[str] = None,
+) -> int:
+    """Write the raw readings from a history database to a Parquet or Arrow file
+
+    Parameters
+    ----------
+    database : str or Connection
+        The database file (or an open connection to it)
+    path : str
+        The file to write
+    start, end : float, optional
+        The (Unix) time range to export. Default is everything.
+    row_group_size : int, optional
+        The number of rows to read, convert and write at a time (one Parquet row group / Arrow record batch each)
+    file_format : str, optional
+        "parquet" or "arrow" (the Arrow IPC file format, a.k.a. Feather v2). Default is to go by the file extension,
+        treating anything other than ".arrow", ".feather" or ".ipc" as Parquet.
+
+    Returns
+    -------
+    int
+        The number of readings written
+
+    Raises
+    ------
+    ValueError
+        If the file format isn't recognized
+    FileNotFoundError
+        If there's no database at `database` (in which case nothing is written)
+    """
+    import pyarrow as pa
+
+    if isinstance(database, str):
+        # open it before creating the output file
+        connection = connect(database, read_only=True)
+        try:
+            return export_history(
+                connection, path, start, end, row_group_size, file_format
+            )
+        finally:
+            connection.close()
+    if file_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        file_format = (
+            "arrow" if extension in (".arrow", ".feather", ".ipc") else "parquet"
+        )
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(path, history_schema())
+    elif file_format == "arrow":
+        writer = pa.ipc.new_file(path, history_schema())
+    else:
+        raise ValueError(f"Unknown file format: {file_format}")
+
+    rows = 0
+    with writer:
+        for batch in iter_history_batches(database, start, end, row_group_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
@@ -0,0 +1,154 @@
+"""Keep track of which sensors are failing so that polling doesn't keep paying for them
+
+Every time a sensor fails to read (or times out), it gets quarantined: it's skipped until a retry time that doubles
+with each consecutive failure (up to a cap), at which point it gets probed again. A single successful read makes it
+healthy again.
+"""
+import enum
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from .read_sensors import Sensor
+
+
+class SensorState(enum.Enum):
+    """Whether a sensor is being read"""
+
+    HEALTHY = "healthy"
+    QUARANTINED = "quarantined"
+    PROBING = "probing"  # quarantined, but due for another try
+
+
+class SensorHealth(NamedTuple):
+    """The health of a single sensor
+
+    Attributes
+    ----------
+    state : SensorState
+        Whether the sensor is being read
+    failures : int
+        The number of consecutive failed reads
+    retry_at : float
+        The (monotonic) time the sensor will next be tried (0 if it's healthy)
+    error : str
+        The most recent error (empty if the sensor is healthy)
+    """
+
+    state: SensorState
+    failures: int = 0
+    retry_at: float = 0.0
+    error: str = ""
+
+
+HEALTHY = SensorHealth(SensorState.HEALTHY)
+
+
+class HealthTracker:
+    """Per-sensor quarantine with exponential backoff
+
+    Parameters
+    ----------
+    backoff : float, optional
+        The number of seconds to skip a sensor for after its first failure. This doubles with each consecutive
+        failure. Default is 1.
+    max_backoff : float, optional
+        The longest a sensor will be skipped for before being probed again. Default is 300 (five minutes).
+    clock : function of () -> float, optional
+        The clock to use. Default is `time.monotonic`.
+    """
+
+    def __init__(
+        self,
+        backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self._failing: Dict["Sensor", SensorHealth] = {}
+        self._lock = threading.Lock()
+
+    def should_read(self, sensor: "Sensor") -> bool:
+        """Check whether a sensor is healthy or due to be probed again
+
+        Parameters
+        ----------
+        sensor : Sensor
+            The sensor
+
+        Returns
+        -------
+        bool
+            False if the sensor is quarantined and should be skipped
+        """
+        health = self._failing.get(sensor)
+        return health is None or health.retry_at <= self.clock()
+
+    def succeeded(self, sensor: "Sensor") -> None:
+        """Record a successful read, bringing the sensor out of quarantine"""
+        if sensor in self._failing:
+            with self._lock:
+                self._failing.pop(sensor, None)
+
+    def failed(self, sensor: "Sensor", error: Optional[BaseException] = None) -> None:
+        """Record a failed read, (re-)quarantining the sensor
+
+        Parameters
+        ----------
+        sensor : Sensor
+            The sensor
+        error : Exception, optional
+            What went wrong
+        """
+        with self._lock:
+            failures = self._failing.get(sensor, HEALTHY).failures + 1
+            delay = min(self.backoff * 2 ** (failures - 1), self.max_backoff)
+            self._failing[sensor] = SensorHealth(
+                SensorState.QUARANTINED,
+                failures,
+                self.clock() + delay,
+                "" if error is None else str(error) or type(error).__name__,
+            )
+
+    def health(self, sensor: "Sensor") -> SensorHealth:
+        """Look up the health of a sensor
+
+        Parameters
+        ----------
+        sensor : Sensor
+            The sensor
+
+        Returns
+        -------
+        SensorHealth
+            The sensor's state, number of consecutive failures, next retry time and latest error
+        """
+        health = self._failing.get(sensor, HEALTHY)
+        if health.state is SensorState.QUARANTINED and health.retry_at <= self.clock():
+            return health._replace(state=SensorState.PROBING)
+        return health
+
+    def unhealthy(self) -> Dict["Sensor", SensorHealth]:
+        """Look up the health of every sensor that's currently failing
+
+        Returns
+        -------
+        dict of Sensor to SensorHealth
+            The health of each sensor that's quarantined or due to be probed
+        """
+        return {sensor: self.health(sensor) for sensor in list(self._failing)}
+
+    def reset(self, sensor: Optional["Sensor"] = None) -> None:
+        """Forget the failures of one sensor (or, by default, of all of them)"""
+        with self._lock:
+            if sensor is None:
+                self._failing.clear()
+            else:
+                self._failing.pop(sensor, None)
+
+
+# shared by everything that reads sensors, so that a sensor that's broken for one is skipped by all
+DEFAULT_TRACKER = HealthTracker()
@@ -0,0 +1,472 @@
+"""Record readings to a SQLite database
+
+The database holds a normalized "sensors" table (one row per Sensor, along with its name, type and unit), a raw
+"readings" table (time, sensor id, value) and, for each bucket size, a "readings_<seconds>" table of per-bucket
+count / min / max / sum, so that long ranges can be queried without touching the raw data. The aggregates are rolled
+up as each batch is written, so the raw readings can be dropped once they're older than a configured age (and the
+aggregates once they're older than theirs). The database is put in WAL mode so that it can be queried while it's being
+written to.
+
+Examples
+--------
+>>> with Sampler(find_sensors("coretemp.*")) as sampler, HistoryWriter("history.db") as writer:
+...     sampler.subscribe(writer.record)
+...     time.sleep(3600)
+>>> query_history("history.db", "coretemp.temp1", bucket=60)
+
+or, letting the database pick the coarsest tier that's fine enough
+
+>>> query_history("history.db", "coretemp.temp1", resolution=900)
+"""
+import errno
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from urllib.request import pathname2url
+
+from .read_sensors import FeatureType, Sensor
+from .readings import Readings
+from .sensor_table import SensorTable
+
+DEFAULT_BUCKETS = (60, 3600)
+
+_BUCKET_TABLE = re.compile(r"^readings_(\d+)$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sensors (
+    id INTEGER PRIMARY KEY,
+    chip TEXT NOT NULL,
+    addr INTEGER NOT NULL,
+    feature TEXT NOT NULL,
+    num INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    UNIQUE (chip, addr, feature, num)
+);
+CREATE INDEX IF NOT EXISTS sensors_by_name ON sensors (name);
+CREATE TABLE IF NOT EXISTS readings (
+    time REAL NOT NULL,
+    sensor_id INTEGER NOT NULL REFERENCES sensors (id),
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS readings_by_sensor ON readings (sensor_id, time);
+CREATE INDEX IF NOT EXISTS readings_by_time ON readings (time);
+"""
+
+_BUCKET_SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings_{seconds} (
+    sensor_id INTEGER NOT NULL REFERENCES sensors (id),
+    bucket REAL NOT NULL,
+    count INTEGER NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    sum REAL NOT NULL,
+    PRIMARY KEY (sensor_id, bucket)
+);
+"""
+
+_UPSERT_BUCKET = """
+INSERT INTO readings_{seconds} (sensor_id, bucket, count, min, max, sum) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (sensor_id, bucket) DO UPDATE SET
+    count = count + excluded.count,
+    min = MIN(min, excluded.min),
+    max = MAX(max, excluded.max),
+    sum = sum + excluded.sum
+"""
+
+
+def connect(path: str, read_only: bool = False) -> sqlite3.Connection:
+    """Open a history database, creating it (and the tables) if needed
+
+    Parameters
+    ----------
+    path : str
+        The database file
+    read_only : bool, optional
+        If True, open an existing database for reading only, leaving the file exactly as it is. Default is False.
+
+    Returns
+    -------
+    Connection
+        The connection, in WAL mode unless read-only
+
+    Raises
+    ------
+    FileNotFoundError
+        If opening read-only and there's no database at `path`
+    """
+    if read_only:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(
+                errno.ENOENT, "No history database recorded here", path
+            )
+        return sqlite3.connect(
+            f"file:{pathname2url(os.path.abspath(path))}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+class HistoryWriter:
+    """Batch readings up and write them to a history database
+
+    Parameters
+    ----------
+    path : str
+        The database file (created if it doesn't exist)
+    flush_interval : float, optional
+        The number of seconds to buffer readings for before writing them out in a single transaction. Default is 5.
+    buckets : list of int, optional
+        The bucket sizes (in seconds) to keep aggregates for. Default is one minute and one hour.
+    raw_retention : float, optional
+        If provided, raw readings older than this many seconds are deleted. Default is to keep them forever.
+    bucket_retention : dict of int to float, optional
+        The number of seconds to keep the aggregates of each bucket size for. Default is to keep them forever.
+
+    Notes
+    -----
+    Unreadable sensors aren't recorded.
+
+    Ages are measured from the newest timestamp written rather than from the current time, so that recording old
+    samples (or replaying them) doesn't immediately delete them. Old rows are deleted after each flush.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 5.0,
+        buckets: Sequence[int] = DEFAULT_BUCKETS,
+        raw_retention: Optional[float] = None,
+        bucket_retention: Optional[Mapping[int, float]] = None,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.buckets = tuple(buckets)
+        self.raw_retention = raw_retention
+        self.bucket_retention = dict(bucket_retention or {})
+        unknown = set(self.bucket_retention) - set(self.buckets)
+        if unknown:
+            raise ValueError(f"Not keeping buckets of {sorted(unknown)} seconds")
+        self.newest = -math.inf
+        self.connection = connect(path)
+        for seconds in self.buckets:
+            self.connection.execute(_BUCKET_SCHEMA.format(seconds=seconds))
+        self._ids: Dict[SensorTable, "array[int]"] = {}
+        self._pending: List[Tuple[float, int, float]] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def sensor_ids(self, table: SensorTable) -> "array[int]":
+        """Look up (registering if needed) the database id of each sensor in a table
+
+        Parameters
+        ----------
+        table : SensorTable
+            The sensors
+
+        Returns
+        -------
+        array of int
+            The id of each sensor, in table order (cached per table)
+        """
+        ids = self._ids.get(table)
+        if ids is None:
+            with self._lock, self.connection:
+                ids = self._ids[table] = array(
+                    "q",
+                    (
+                        _register(self.connection, sensor, name, feature_type)
+                        for sensor, name, feature_type in zip(
+                            table, table.names, table.types
+                        )
+                    ),
+                )
+        return ids
+
+    def record(self, timestamp: float, readings: Readings) -> None:
+        """Buffer a sample, writing out the buffer if it's due (meant to be subscribed to a `Sampler`)
+
+        Parameters
+        ----------
+        timestamp : float
+            The (Unix) time of the sample
+        readings : Readings
+            The sample
+        """
+        ids = self.sensor_ids(readings.table)
+        with self._lock:
+            self._pending.extend(
+                (timestamp, sensor_id, value)
+                for sensor_id, value in zip(ids, readings.data)
+                if value == value
+            )
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out everything that's been buffered, in a single transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not pending:
+                return
+            self.newest = max(self.newest, max(row[0] for row in pending))
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO readings (time, sensor_id, value) VALUES (?, ?, ?)",
+                    pending,
+                )
+                for seconds in self.buckets:
+                    self.connection.executemany(
+                        _UPSERT_BUCKET.format(seconds=seconds),
+                        _aggregate(pending, seconds),
+                    )
+                self._prune()
+
+    def _prune(self) -> None:
+        """Delete whatever has outlived its retention (must be called inside a transaction)"""
+        if self.raw_retention is None and not self.bucket_retention:
+            return
+        # deleting one sensor at a time lets each delete use the (sensor_id, ...) index
+        sensor_ids = [
+            row[0] for row in self.connection.execute("SELECT id FROM sensors")
+        ]
+        if self.raw_retention is not None:
+            cutoff = self.newest - self.raw_retention
+            self.connection.executemany(
+                "DELETE FROM readings WHERE sensor_id = ? AND time < ?",
+                ((sensor_id, cutoff) for sensor_id in sensor_ids),
+            )
+        for seconds, retention in self.bucket_retention.items():
+            # a bucket is only dropped once all of it is too old
+            cutoff = self.newest - retention - seconds
+            self.connection.executemany(
+                f"DELETE FROM readings_{seconds} WHERE sensor_id = ? AND bucket < ?",
+                ((sensor_id, cutoff) for sensor_id in sensor_ids),
+            )
+
+    def close(self) -> None:
+        """Write out anything that's been buffered and close the database"""
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> "HistoryWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def _register(
+    connection: sqlite3.Connection, sensor: Sensor, name: str, feature_type: FeatureType
+) -> int:
+    connection.execute(
+        "INSERT OR IGNORE INTO sensors (chip, addr, feature, num, name, type, unit)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (*sensor, name, feature_type.value, feature_type.unit),
+    )
+    (sensor_id,) = connection.execute(
+        "SELECT id FROM sensors WHERE chip = ? AND addr = ? AND feature = ? AND num = ?",
+        tuple(sensor),
+    ).fetchone()
+    return sensor_id
+
+
+def _aggregate(
+    rows: List[Tuple[float, int, float]], seconds: int
+) -> List[Tuple[int, float, int, float, float, float]]:
+    """Roll rows of (time, sensor id, value) up into (sensor id, bucket, count, min, max, sum)"""
+    buckets: Dict[Tuple[int, float], List[float]] = {}
+    for timestamp, sensor_id, value in rows:
+        key = (sensor_id, math.floor(timestamp / seconds) * seconds)
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [1, value, value, value]
+        else:
+            bucket[0] += 1
+            if value < bucket[1]:
+                bucket[1] = value
+            if value > bucket[2]:
+                bucket[2] = value
+            bucket[3] += value
+    return [
+        (sensor_id, start, int(count), low, high, total)
+        for (sensor_id, start), (count, low, high, total) in buckets.items()
+    ]
+
+
+def history_tiers(connection: sqlite3.Connection) -> List[int]:
+    """List the bucket sizes a history database keeps aggregates for
+
+    Parameters
+    ----------
+    connection : Connection
+        The database
+
+    Returns
+    -------
+    list of int
+        The bucket sizes in seconds, smallest first
+    """
+    names = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    ).fetchall()
+    return sorted(
+        int(match[1])
+        for match in (_BUCKET_TABLE.match(name) for (name,) in names)
+        if match is not None
+    )
+
+
+def query_history(
+    database: Union[str, sqlite3.Connection],
+    sensor: Union[str, Sensor],
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    bucket: Optional[int] = None,
+    resolution: Optional[float] = None,
+):
+    """Get the recorded readings of a sensor as a NumPy array (requires NumPy)
+
+    Parameters
+    ----------
+    database : str or Connection
+        The database file (or an open connection to it)
+    sensor : Sensor tuple or a string of the form "chip_prefix.feature_name"
+        The sensor
+    start, end : float, optional
+        The (Unix) time range to return. Default is everything.
+    bucket : int, optional
+        If provided, return the aggregates for this bucket size (which must be one the writer was keeping) instead
+        of the raw readings.
+    resolution : float, optional
+        If provided (instead of `bucket`), return the aggregates for the largest bucket size that's no bigger than
+        this many seconds, or the raw readings if every bucket size is bigger--as long as what's kept at that
+        resolution goes back to `start` (to the oldest recorded reading, if no start is given). If it doesn't
+        (e.g. because the raw readings or the smaller buckets have been dropped, see `HistoryWriter`), the
+        smallest bucket size that does go back that far is used instead, or if none does, whichever goes back the
+        furthest.
+
+    Returns
+    -------
+    structured ndarray
+        With fields "time" and "value" for raw readings, or "time" (the start of each bucket), "min", "mean" and
+        "max" for aggregates (of every bucket that overlaps the range), sorted by time. When a resolution is given,
+        the aggregate fields are always returned; if the raw readings were chosen, "min", "mean" and "max" all hold
+        the reading.
+
+    Raises
+    ------
+    ValueError
+        If the sensor has never been recorded
+    FileNotFoundError
+        If there's no database at `database`
+    """
+    import numpy as np
+
+    aggregate_dtype = [("time", "f8"), ("min", "f8"), ("mean", "f8"), ("max", "f8")]
+    connection = (
+        connect(database, read_only=True) if isinstance(database, str) else database
+    )
+    try:
+        sensor_id = _lookup(connection, sensor)
+        bounds = (
+            -math.inf if start is None else start,
+            math.inf if end is None else end,
+        )
+        if resolution is not None:
+            bucket = _pick_tier(connection, sensor_id, resolution, start)
+            if bucket == 0:
+                rows = connection.execute(
+                    "SELECT time, value, value, value FROM readings"
+                    " WHERE sensor_id = ? AND time >= ? AND time < ? ORDER BY time",
+                    (sensor_id, *bounds),
+                ).fetchall()
+                return np.array(rows, dtype=aggregate_dtype)
+        if bucket is None:
+            rows = connection.execute(
+                "SELECT time, value FROM readings"
+                " WHERE sensor_id = ? AND time >= ? AND time < ? ORDER BY time",
+                (sensor_id, *bounds),
+            ).fetchall()
+            return np.array(rows, dtype=[("time", "f8"), ("value", "f8")])
+        rows = connection.execute(
+            f"SELECT bucket, min, sum / count, max FROM readings_{int(bucket)}"
+            " WHERE sensor_id = ? AND bucket > ? AND bucket < ? ORDER BY bucket",
+            # include the bucket that the start of the range falls in
+            (sensor_id, bounds[0] - bucket, bounds[1]),
+        ).fetchall()
+        return np.array(rows, dtype=aggregate_dtype)
+    finally:
+        if isinstance(database, str):
+            connection.close()
+
+
+def _pick_tier(
+    connection: sqlite3.Connection,
+    sensor_id: int,
+    resolution: float,
+    start: Optional[float],
+) -> int:
+    """Choose the bucket size to answer a query at a resolution with (0 meaning the raw readings)"""
+    tiers = [0, *history_tiers(connection)]
+    fine_enough = [seconds for seconds in tiers if seconds <= resolution]
+    too_coarse = [seconds for seconds in tiers if seconds > resolution]
+    # in order of preference
+    candidates = fine_enough[::-1] + too_coarse
+    earliest: Dict[int, float] = {}
+    for seconds in candidates:
+        if seconds == 0:
+            query = "SELECT MIN(time) FROM readings WHERE sensor_id = ?"
+        else:
+            query = f"SELECT MIN(bucket) FROM readings_{seconds} WHERE sensor_id = ?"
+        (oldest,) = connection.execute(query, (sensor_id,)).fetchone()
+        if oldest is not None:
+            earliest[seconds] = oldest
+    if not earliest:
+        return candidates[0]
+    # asking for more than was recorded is the same as asking for everything, which starts at the oldest sample: the
+    # first raw reading, unless a bucket size kept aggregates of readings from before then (only the start of its
+    # first bucket is known, which would otherwise always make the coarsest bucket size look like the only one
+    # that goes back far enough)
+    raw_start = earliest.get(0)
+    data_start = min(
+        oldest
+        for seconds, oldest in earliest.items()
+        if raw_start is None or seconds == 0 or oldest + seconds <= raw_start
+    )
+    start = data_start if start is None else max(start, data_start)
+    for seconds in candidates:
+        # a bucket size goes back far enough if the start falls in (or after) its first bucket
+        if earliest.get(seconds, math.inf) <= start:
+            return seconds
+    return min(
+        (seconds for seconds in candidates if seconds in earliest),
+        key=earliest.__getitem__,
+    )
+
+
+def _lookup(connection: sqlite3.Connection, sensor: Union[str, Sensor]) -> int:
+    if isinstance(sensor, str):
+        row = connection.execute(
+            "SELECT id FROM sensors WHERE name = ?", (sensor,)
+        ).fetchone()
+    else:
+        row = connection.execute(
+            "SELECT id FROM sensors WHERE chip = ? AND addr = ? AND feature = ? AND num = ?",
+            tuple(sensor),
+        ).fetchone()
+    if row is None:
+        raise ValueError(f"No history for {sensor}")
+    return row[0]
@@ -0,0 +1,145 @@
+"""Pick up chips (USB devices, hot-swapped drives, GPUs...) that are plugged in or removed while running
+
+Every hwmon device shows up as a symlink under /sys/class/hwmon, so listing that directory and resolving the links
+is a cheap fingerprint of what's plugged in. Sensors only get re-enumerated when that fingerprint changes--but
+then it's from scratch: libsensors is re-initialized and every chip is enumerated again, not just the ones that
+changed.
+"""
+import os
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from .read_sensors import Sensor, enumerate_all_sensors, rescan
+from .thermal_zones import HWMON_ROOT
+
+
+def hwmon_fingerprint(root: Optional[str] = None) -> Dict[str, str]:
+    """Take a snapshot of which hwmon devices are present
+
+    Parameters
+    ----------
+    root : str, optional
+        The directory to look for hwmon devices in. Default is HWMON_ROOT
+
+    Returns
+    -------
+    dict of str to str
+        The device each hwmon entry points to, keyed by entry name (e.g. "hwmon3"). If the directory doesn't exist,
+        the dict will be empty.
+    """
+    root = root or HWMON_ROOT
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return {}
+
+    fingerprint: Dict[str, str] = {}
+    for entry in entries:
+        try:
+            fingerprint[entry] = os.readlink(os.path.join(root, entry))
+        except OSError:
+            fingerprint[entry] = ""
+    return fingerprint
+
+
+class SensorChanges(NamedTuple):
+    """The sensors that appeared or disappeared between two polls
+
+    Attributes
+    ----------
+    added : list of Sensor
+        The new sensors, in enumeration order
+    removed : list of Sensor
+        The sensors that are gone, in the order they were previously enumerated
+    """
+
+    added: List[Sensor]
+    removed: List[Sensor]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+class HotplugWatcher:
+    """Keep an up-to-date list of the available sensors
+
+    Parameters
+    ----------
+    readable_only : bool, optional
+        If True, only keep track of the sensors that are actually readable. Default is False.
+    root : str, optional
+        The directory to look for hwmon devices in. Default is HWMON_ROOT
+
+    Attributes
+    ----------
+    sensors : list of Sensor
+        The sensors that were available as of the last poll
+
+    Notes
+    -----
+    Sensors that stay put keep their number suffixes (see `enumerate_all_sensors`), so names and saved sensor lists
+    stay valid while other chips come and go.
+
+    Examples
+    --------
+    >>> watcher = HotplugWatcher()
+    >>> for changes in watcher.watch(interval=5):
+    ...     print("plugged in:", changes.added, "unplugged:", changes.removed)
+    """
+
+    def __init__(self, readable_only: bool = False, root: Optional[str] = None):
+        self.readable_only = readable_only
+        self.root = root
+        self._fingerprint = hwmon_fingerprint(root)
+        self.sensors: List[Sensor] = enumerate_all_sensors(readable_only=readable_only)
+
+    def poll(self) -> SensorChanges:
+        """Check whether any hwmon devices have come or gone, and if so, re-enumerate
+
+        Returns
+        -------
+        SensorChanges
+            The sensors that were added and removed since the last poll (which is falsy if nothing changed)
+
+        Notes
+        -----
+        Polls where nothing changed only list /sys/class/hwmon. Otherwise the whole sensor list is rebuilt: `rescan`
+        re-initializes libsensors (holding up reads from other threads meanwhile), and then every sensor is
+        enumerated again (and, with `readable_only`, read), so a change costs as much as starting up.
+        """
+        fingerprint = hwmon_fingerprint(self.root)
+        if fingerprint == self._fingerprint:
+            return SensorChanges([], [])
+        self._fingerprint = fingerprint
+        rescan()
+        previous = self.sensors
+        self.sensors = enumerate_all_sensors(readable_only=self.readable_only)
+        still_there = set(self.sensors)
+        were_there = set(previous)
+        return SensorChanges(
+            [sensor for sensor in self.sensors if sensor not in were_there],
+            [sensor for sensor in previous if sensor not in still_there],
+        )
+
+    def watch(
+        self, interval: float = 1.0, stop: Optional[threading.Event] = None
+    ) -> Iterator[SensorChanges]:
+        """Poll at regular intervals, yielding whenever something changes
+
+        Parameters
+        ----------
+        interval : float, optional
+            The number of seconds between polls. Default is 1.
+        stop : Event, optional
+            If provided, watching will end once this event is set.
+
+        Yields
+        ------
+        SensorChanges
+            The sensors that were added and removed
+        """
+        stop = stop or threading.Event()
+        while not stop.wait(interval):
+            changes = self.poll()
+            if changes:
+                yield changes
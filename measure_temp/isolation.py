@@ -0,0 +1,188 @@
+"""Read sensors from a supervised worker process, so that a driver that hangs can't take the caller down with it
+
+The worker reads the requested sensors one at a time and sends each value back as soon as it has it. If a value
+doesn't arrive within the deadline, the worker is killed and replaced, and the sensor it was stuck on is quarantined
+(see `health.HealthTracker`) while the rest of the sensors keep getting read.
+
+Requires the "fork" start method (i.e. Linux) to inherit the parent's sensors setup. Workers are forked while holding
+the sensors session lock, so that a child never inherits libsensors partway through a call from another thread (or
+the lock held by a thread that doesn't exist in the child, which would hang it); starting a worker therefore waits
+for reads in progress in other threads to finish.
+"""
+import math
+import multiprocessing
+import struct
+from array import array
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Union
+
+import sensors
+
+from . import health
+from .health import HealthTracker
+from .read_sensors import Sensor, _resolve, _session_lock, sensors_session
+
+if TYPE_CHECKING:
+    from .readings import Readings
+    from .sensor_table import SensorTable
+
+_RESULT = struct.Struct("=Id")
+
+
+def _serve(connection: Connection, sensors_to_read: List[Sensor]) -> None:
+    """Worker loop: read the sensors at the requested positions, replying to each one as soon as it's read"""
+    with sensors_session():
+        _, getters = _resolve(list(sensors_to_read), missing_ok=True)
+        while True:
+            try:
+                request = connection.recv_bytes()
+            except (EOFError, OSError):
+                return
+            for i in array("I", request):
+                try:
+                    value = getters[i]()
+                except sensors.SensorsError:
+                    value = math.nan
+                connection.send_bytes(_RESULT.pack(i, value))
+
+
+class IsolatedReader:
+    """Repeatedly read a fixed set of sensors from a worker process, giving up on any read that takes too long
+
+    This is a drop-in replacement for `BatchReader`.
+
+    Parameters
+    ----------
+    sensors_to_read : iterable of Sensor tuples or strings
+        The sensors to read. See `read_sensor` for the accepted formats.
+    deadline : float, optional
+        The number of seconds to wait for each individual read. Default is 1.
+    tracker : HealthTracker, optional
+        Where to record failed and timed-out reads, and so which sensors to skip. Default is the tracker shared by
+        all readers (`health.DEFAULT_TRACKER`).
+
+    Raises
+    ------
+    ValueError
+        (upon opening) If any of the sensors cannot be found
+    """
+
+    def __init__(
+        self,
+        sensors_to_read: Iterable[Union[str, Sensor]],
+        deadline: float = 1.0,
+        tracker: Optional[HealthTracker] = None,
+    ):
+        self._requested = list(sensors_to_read)
+        self.deadline = deadline
+        self.sensors: List[Sensor] = []
+        self.table: Optional["SensorTable"] = None
+        self._tracker = tracker
+        self._context = multiprocessing.get_context("fork")
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._connection: Optional[Connection] = None
+        self._dead: List[multiprocessing.process.BaseProcess] = []
+        self._unread: "array[float]" = array("d")
+        self._opened = False
+
+    @property
+    def tracker(self) -> HealthTracker:
+        """The health tracker in use"""
+        return self._tracker or health.DEFAULT_TRACKER
+
+    def open(self) -> "IsolatedReader":
+        """Look up all the sensors and start the worker"""
+        from .readings import Readings
+        from .sensor_table import SensorTable
+
+        if self._opened:
+            return self
+        with sensors_session():
+            self.sensors, _ = _resolve(self._requested)
+        self.table = SensorTable.of(self.sensors)
+        self._readings_class = Readings
+        self._unread = array("d", (math.nan,) * len(self.sensors))
+        self._opened = True
+        self._start_worker()
+        return self
+
+    def close(self) -> None:
+        """Stop the worker"""
+        if self._opened:
+            self._stop_worker()
+            self._opened = False
+
+    def __enter__(self) -> "IsolatedReader":
+        return self.open()
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def read(self) -> "Readings":
+        """Read all sensors (other than the ones in quarantine)
+
+        Returns
+        -------
+        Readings
+            The sensor values, which can be used like a dict of Sensor to float. Sensors that could not be read,
+            timed out or are in quarantine will have a value of None.
+        """
+        if not self._opened:
+            raise RuntimeError("IsolatedReader must be opened before reading")
+        table = self.table
+        assert table is not None
+        values = array("d", self._unread)
+        tracker = self.tracker
+        pending = [
+            i for i, sensor in enumerate(self.sensors) if tracker.should_read(sensor)
+        ]
+        while pending:
+            pending = self._read_until_stuck(pending, values)
+        return self._readings_class(table, values)
+
+    def _read_until_stuck(
+        self, positions: Sequence[int], values: "array[float]"
+    ) -> List[int]:
+        """Read the given sensors, returning the ones that were left over if the worker got stuck or died"""
+        if self._connection is None:
+            self._start_worker()
+        connection = self._connection
+        assert connection is not None
+        tracker = self.tracker
+        connection.send_bytes(array("I", positions).tobytes())
+        for done, expected in enumerate(positions):
+            try:
+                if not connection.poll(self.deadline):
+                    raise TimeoutError(f"No reading within {self.deadline}s")
+                i, value = _RESULT.unpack(connection.recv_bytes())
+            except (TimeoutError, EOFError, OSError) as oops:
+                tracker.failed(self.sensors[expected], oops)
+                self._stop_worker()
+                return list(positions[done + 1 :])
+            values[i] = value
+            if value == value:
+                tracker.succeeded(self.sensors[i])
+            else:
+                tracker.failed(self.sensors[i])
+        return []
+
+    def _start_worker(self) -> None:
+        parent, child = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_serve, args=(child, self.sensors), daemon=True
+        )
+        with _session_lock:
+            self._process.start()
+        child.close()
+        self._connection = parent
+
+    def _stop_worker(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._process is not None:
+            # a worker that's stuck in the kernel may not die right away, so don't wait around for it
+            self._process.kill()
+            self._dead.append(self._process)
+            self._process = None
+        self._dead = [process for process in self._dead if process.is_alive()]
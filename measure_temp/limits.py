@@ -0,0 +1,73 @@
+"""Check batches of readings against the limits configured on each chip"""
+import enum
+from typing import Dict
+
+from .read_sensors import Sensor
+from .readings import Readings
+
+
+class LimitStatus(enum.IntEnum):
+    """How a reading compares to its sensor's limits (in increasing order of severity)"""
+
+    OK = 0
+    LOW = 1
+    HIGH = 2
+    CRITICAL = 3
+
+
+def check_limits(readings: Readings, margin: float = 0.0) -> Dict[Sensor, LimitStatus]:
+    """Flag every reading in a batch that is outside its sensor's limits
+
+    Parameters
+    ----------
+    readings : Readings
+        The readings to check
+    margin : float, optional
+        How close (in the sensor's units) a reading has to get to a limit before it's flagged, e.g. pass 5 to flag
+        temperatures within 5 degrees of their max / crit limits. Default is 0.
+
+    Returns
+    -------
+    dict of Sensor to LimitStatus
+        The status of each sensor that's not OK (the most severe status, if several apply). Sensors that couldn't be
+        read or that don't have limits are never flagged.
+
+    Notes
+    -----
+    The limits are read when the sensors are enumerated and stored on the sensor table, so checking them doesn't
+    require touching the hardware. If NumPy is installed, the whole batch is checked with a handful of array
+    operations.
+
+    The chips' own alarm flags (e.g. "temp1_alarm", "fan1_alarm") are deliberately not consulted. Unlike limits,
+    they change from one reading to the next, so using them would mean an extra read per sensor per batch, and
+    on many chips they latch until read (so they can report an excursion that's already over) or clear on read (so
+    checking them here would hide them from anything else watching). Comparing the readings against the limits
+    gives the same answer for the batch being checked.
+    """
+    table = readings.table
+    try:
+        import numpy as np
+    except ImportError:
+        flagged: Dict[Sensor, LimitStatus] = {}
+        for sensor, value, low, high, critical in zip(
+            table.sensors, readings.data, table.low, table.high, table.critical
+        ):
+            if value >= critical - margin:
+                flagged[sensor] = LimitStatus.CRITICAL
+            elif value >= high - margin:
+                flagged[sensor] = LimitStatus.HIGH
+            elif value <= low + margin:
+                flagged[sensor] = LimitStatus.LOW
+        return flagged
+
+    values = readings.to_numpy()
+    statuses = np.zeros(len(values), dtype=np.int8)
+    with np.errstate(invalid="ignore"):
+        statuses[values <= np.frombuffer(table.low) + margin] = LimitStatus.LOW
+        statuses[values >= np.frombuffer(table.high) - margin] = LimitStatus.HIGH
+        statuses[
+            values >= np.frombuffer(table.critical) - margin
+        ] = LimitStatus.CRITICAL
+    return {
+        table.sensors[i]: LimitStatus(statuses[i]) for i in np.flatnonzero(statuses)
+    }
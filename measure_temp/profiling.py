@@ -0,0 +1,261 @@
+"""Measure how hot a block of code makes the machine"""
+import contextlib
+import math
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from . import backends
+from .read_sensors import Sensor, find_sensors, read_many
+from .readings import Readings, stack_readings
+from .sampler import Sampler
+
+
+class SensorSummary(NamedTuple):
+    """Statistics for one sensor over a profiled block
+
+    Attributes
+    ----------
+    peak : float
+        The highest reading
+    mean : float
+        The average reading
+    time_above : float
+        The number of seconds spent above the threshold (NaN if there was no threshold)
+    area : float
+        The area under the curve, i.e. the integral of the readings over time (in the sensor's unit times seconds)
+    threshold : float
+        The threshold used for time_above (NaN if there was none)
+
+    Notes
+    -----
+    Unreadable samples are skipped. If a sensor couldn't be read at all, every statistic will be NaN.
+    """
+
+    peak: float
+    mean: float
+    time_above: float
+    area: float
+    threshold: float
+
+
+class ThermalProfile:
+    """The readings taken over a profiled block
+
+    Attributes
+    ----------
+    timestamps : list of float
+        The (Unix) time of each sample
+    readings : list of Readings
+        The readings of each sample
+    start, end : float
+        The (Unix) times the block started and ended
+    summary : dict of Sensor to SensorSummary
+        The statistics for each sensor (empty until the block has finished)
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = threshold
+        self.timestamps: List[float] = []
+        self.readings: List[Readings] = []
+        self.start = math.nan
+        self.end = math.nan
+        self.summary: Dict[Sensor, SensorSummary] = {}
+
+    @property
+    def duration(self) -> float:
+        """The number of seconds the block took"""
+        return self.end - self.start
+
+    def record(self, timestamp: float, readings: Readings) -> None:
+        """Add a sample (meant to be subscribed to a `Sampler`)"""
+        self.timestamps.append(timestamp)
+        self.readings.append(readings)
+
+    def series(self, sensor: Union[str, Sensor]) -> List[Optional[float]]:
+        """Get the readings of a single sensor
+
+        Parameters
+        ----------
+        sensor : Sensor tuple or a string of the form "chip_prefix.feature_name"
+            The sensor
+
+        Returns
+        -------
+        list of float
+            The sensor's reading at each sample (None where it couldn't be read)
+        """
+        return [readings[sensor] for readings in self.readings]
+
+    def to_frame(self):
+        """Convert the samples to a pandas DataFrame (requires pandas)
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per sample, indexed by time, and one column per sensor (see `stack_readings`)
+        """
+        return stack_readings(self.readings, self.timestamps)
+
+    def summarize(self) -> Dict[Sensor, SensorSummary]:
+        """Compute the statistics for each sensor
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict of Sensor to SensorSummary
+            The statistics (also stored as `summary`)
+        """
+        self.summary = {}
+        if not self.readings:
+            return self.summary
+        table = self.readings[0].table
+        for i, sensor in enumerate(table):
+            if self.threshold is not None:
+                threshold = self.threshold
+            else:
+                threshold = table.high[i]
+            points = [
+                (timestamp, readings.data[i])
+                for timestamp, readings in zip(self.timestamps, self.readings)
+                if readings.data[i] == readings.data[i]
+            ]
+            self.summary[sensor] = _summarize(points, threshold)
+        return self.summary
+
+    def report(self) -> str:
+        """Format the summary as a table
+
+        Returns
+        -------
+        str
+            One line per sensor, giving its peak, mean, time above threshold and area under the curve
+        """
+        if not self.readings:
+            return "No samples were taken"
+        table = self.readings[0].table
+        lines = [f"{'sensor':<24} {'peak':>10} {'mean':>10} {'above':>10} {'area':>12}"]
+        for sensor, unit in zip(table, table.units):
+            summary = self.summary.get(sensor)
+            if summary is None:
+                continue
+            peak = _format(summary.peak, ".1f", unit)
+            mean = _format(summary.mean, ".1f", unit)
+            time_above = _format(summary.time_above, ".2f", "s")
+            area = _format(summary.area, ".1f")
+            lines.append(
+                f"{str(sensor):<24} {peak:>10} {mean:>10} {time_above:>10} {area:>12}"
+            )
+        return "\n".join(lines)
+
+
+def _format(value: float, spec: str, unit: str = "") -> str:
+    # NaN means there's nothing to report (no readings, or no threshold to compare them to)
+    return "n/a" if math.isnan(value) else f"{value:{spec}}{unit}"
+
+
+def _summarize(points: List[tuple], threshold: float) -> SensorSummary:
+    if not points:
+        return SensorSummary(math.nan, math.nan, math.nan, math.nan, threshold)
+    values = [value for _, value in points]
+    area = 0.0
+    time_above = 0.0
+    for (start, low), (end, high) in zip(points, points[1:]):
+        area += (low + high) / 2 * (end - start)
+        if low > threshold:
+            time_above += end - start
+    return SensorSummary(
+        max(values),
+        sum(values) / len(values),
+        time_above if threshold == threshold else math.nan,
+        area,
+        threshold,
+    )
+
+
+class profile(contextlib.ContextDecorator):
+    """Sample sensors in the background for the duration of a block of code
+
+    Parameters
+    ----------
+    sensors_to_read : iterable of Sensor tuples or strings, optional
+        The sensors to sample. See `read_sensor` for the accepted formats. Default is all readable sensors.
+    interval : float, optional
+        The number of seconds between samples. Default is 0.1.
+    threshold : float, optional
+        The reading above which to count time for `SensorSummary.time_above`. Default is each sensor's high limit
+        (see `sensor_limits`).
+
+    Attributes
+    ----------
+    last : ThermalProfile
+        The profile of the most recently started or finished block (or decorated call)
+
+    Notes
+    -----
+    The only work done on the profiled thread is starting and stopping the sampler (plus one final reading, so that
+    the samples cover the whole block). The statistics are computed once the block is over.
+
+    The same profiler can be entered again before it exits (e.g. by a recursive decorated function, or from several
+    threads), with each block getting its own sampler and profile.
+
+    Examples
+    --------
+    >>> with profile(["coretemp.temp1"], interval=0.1) as p:
+    ...     run_benchmark()
+    >>> p.summary
+    {Sensor(chip='coretemp', addr=0, feature='temp1', num=0): SensorSummary(peak=78.0, mean=71.2, ...)}
+
+    or, as a decorator
+
+    >>> profiler = profile(["coretemp.temp1"])
+    >>> @profiler
+    ... def run_benchmark():
+    ...     ...
+    >>> run_benchmark()
+    >>> profiler.last.summary
+    """
+
+    def __init__(
+        self,
+        sensors_to_read: Optional[Iterable[Union[str, Sensor]]] = None,
+        interval: float = 0.1,
+        threshold: Optional[float] = None,
+    ):
+        self.sensors_to_read = (
+            None if sensors_to_read is None else list(sensors_to_read)
+        )
+        self.interval = interval
+        self.threshold = threshold
+        self.last: Optional[ThermalProfile] = None
+        # the blocks each thread is in, innermost last
+        self._local = threading.local()
+
+    def _active(self) -> List[Tuple[ThermalProfile, Sampler]]:
+        active = getattr(self._local, "active", None)
+        if active is None:
+            active = self._local.active = []
+        return active
+
+    def __enter__(self) -> ThermalProfile:
+        sensors_to_read = (
+            find_sensors() if self.sensors_to_read is None else self.sensors_to_read
+        )
+        thermal_profile = self.last = ThermalProfile(self.threshold)
+        sampler = Sampler(sensors_to_read, self.interval)
+        sampler.subscribe(thermal_profile.record)
+        sampler.start()
+        thermal_profile.start = backends.timestamp()
+        self._active().append((thermal_profile, sampler))
+        return thermal_profile
+
+    def __exit__(self, *args) -> None:
+        thermal_profile, sampler = self._active().pop()
+        thermal_profile.end = backends.timestamp()
+        sampler.stop()
+        final = read_many(sampler.sensors)
+        thermal_profile.record(backends.timestamp(), final)
+        thermal_profile.summarize()
+        self.last = thermal_profile
@@ -1,48 +1,139 @@
 """Get readings from sensors"""
-from contextlib import contextmanager
-from typing import List, NamedTuple, Optional, Set, Tuple, Union
+import enum
+import fnmatch
+import functools
+import math
+import sys
+import threading
+from array import array
+from contextlib import ExitStack, contextmanager
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 import sensors
 
-from .detect_notebook import in_ipython_frontend
+from . import backends, chip_map, cpufreq, health, thermal_zones
+
+if TYPE_CHECKING:
+    from .isolation import IsolatedReader
+    from .readings import Readings
+    from .sensor_table import SensorTable
+    from .sinks import OutputSink
+
+_session_depth = 0
+_session_lock = threading.RLock()
+# bumped every time libsensors is re-initialized by `rescan`, which invalidates any chips and features looked up before
+_generation = 0
 
 
 @contextmanager
 def sensors_session():
+    """Initialize libsensors for the duration of the context
+
+    Sessions are reentrant: nested sessions (including ones opened from other threads) share the outermost session,
+    so that a long-lived session can be held open while calling any of the functions below.
+    """
+    global _session_depth
+    with _session_lock:
+        if _session_depth == 0:
+            backends.get_backend().init()
+        _session_depth += 1
     try:
-        sensors.init()
         yield
     finally:
-        sensors.cleanup()
+        with _session_lock:
+            _session_depth -= 1
+            if _session_depth == 0:
+                backends.get_backend().cleanup()
+
+
+def rescan() -> None:
+    """Have libsensors pick up chips that have been plugged in or removed since it was initialized
+
+    libsensors only scans for chips when it's initialized, so if a session is open, this re-initializes it (waiting
+    for any reads or enumerations in progress in other threads to finish first). Any open `BatchReader` will look
+    its sensors up again on its next read.
+    """
+    global _generation
+    with _session_lock:
+        if _session_depth > 0:
+            backends.get_backend().cleanup()
+            backends.get_backend().init()
+        _generation += 1
 
 
 @sensors_session()
-def report_all_readings():
+def report_all_readings(
+    deadline: Optional[float] = None, sink: Optional["OutputSink"] = None
+):
     """Display readings from all available sensors
 
     Parameters
     ----------
-    None
+    deadline : float, optional
+        If provided, the sensors are read from a separate process (see `isolation.IsolatedReader`), and any sensor
+        that takes longer than this many seconds to read is reported as None instead of holding everything up.
+    sink : OutputSink, optional
+        Where to send the report (see the `sinks` module). Default is stdout or, in a Jupyter notebook, the notebook.
 
     Returns
     -------
     None
-        The readings are displayed directly to stdout or a Jupyter notebook
+        The readings are sent to the sink
+
+    Notes
+    -----
+    Sensors that have been failing are reported as None without being read again until they're due for another
+    try (see `health.HealthTracker`).
     """
-    if in_ipython_frontend():
-        from IPython.display import Markdown, display
+    if sink is None:
+        from .sinks import default_sink
+
+        sink = default_sink()
 
-        report = lambda text: display(Markdown(text))
+    if deadline is None:
+        reader: Union[BatchReader, "IsolatedReader"] = BatchReader(
+            enumerate_all_sensors()
+        )
     else:
-        report = print
+        from .isolation import IsolatedReader
 
-    for chip in sensors.iter_detected_chips():
-        for feature in chip:
-            try:
-                value: Union[float, None] = feature.get_value()
-            except sensors.SensorsError:
-                value = None
-            report(f"- {chip.prefix.decode()}:{feature.name} : {value}")
+        reader = IsolatedReader(enumerate_all_sensors(), deadline=deadline)
+    with reader:
+        for sensor, value in reader.read().items():
+            sink.write(format_reading(sensor, value))
+
+
+def format_reading(sensor: Union[str, "Sensor"], value: Optional[float]) -> str:
+    """Format a reading the way `report_all_readings` displays it
+
+    Parameters
+    ----------
+    sensor : Sensor or str
+        The sensor, or its string representation
+    value : float or None
+        The reading
+
+    Returns
+    -------
+    str
+        A line like "- coretemp:temp1 : 62.0" (chips after the first with the same label get their number, as in
+        "- nvme1:temp1 : 40.0")
+    """
+    chip, _, feature = str(sensor).rpartition(".")
+    return f"- {chip}:{feature} : {value}"
 
 
 class Sensor(NamedTuple):
@@ -68,42 +159,541 @@ class Sensor(NamedTuple):
     num: int = 0
 
     def __str__(self):
+        entry = _interned.get(self)
+        if entry is not None:
+            return entry.name
         return f"{self.chip}{self.num if self.num else ''}.{self.feature}"
 
 
+class FeatureType(enum.Enum):
+    """The kind of quantity a sensor measures"""
+
+    TEMPERATURE = "temperature"
+    FAN = "fan"
+    VOLTAGE = "voltage"
+    POWER = "power"
+    CURRENT = "current"
+    ENERGY = "energy"
+    HUMIDITY = "humidity"
+    FREQUENCY = "frequency"
+    OTHER = "other"
+
+    @property
+    def unit(self) -> str:
+        """The unit this kind of reading is reported in (empty for OTHER)"""
+        return _UNITS[self]
+
+
+_UNITS = {
+    FeatureType.TEMPERATURE: "°C",
+    FeatureType.FAN: "RPM",
+    FeatureType.VOLTAGE: "V",
+    FeatureType.POWER: "W",
+    FeatureType.CURRENT: "A",
+    FeatureType.ENERGY: "J",
+    FeatureType.HUMIDITY: "%RH",
+    FeatureType.FREQUENCY: "MHz",
+    FeatureType.OTHER: "",
+}
+
+# values of libsensors' sensors_feature_type enum
+_LIBSENSORS_FEATURE_TYPES = {
+    0x00: FeatureType.VOLTAGE,
+    0x01: FeatureType.FAN,
+    0x02: FeatureType.TEMPERATURE,
+    0x03: FeatureType.POWER,
+    0x04: FeatureType.ENERGY,
+    0x05: FeatureType.CURRENT,
+    0x06: FeatureType.HUMIDITY,
+}
+
+# hwmon sysfs attribute prefixes, for when there's no type to go on
+_HWMON_PREFIXES = (
+    ("temp", FeatureType.TEMPERATURE),
+    ("fan", FeatureType.FAN),
+    ("in", FeatureType.VOLTAGE),
+    ("power", FeatureType.POWER),
+    ("curr", FeatureType.CURRENT),
+    ("energy", FeatureType.ENERGY),
+    ("humidity", FeatureType.HUMIDITY),
+)
+
+
+def _feature_type(feature) -> FeatureType:
+    feature_type = getattr(feature, "feature_type", None)
+    if feature_type is not None:
+        return FeatureType(feature_type)
+    libsensors_type = getattr(feature, "type", None)
+    if libsensors_type is not None:
+        return _LIBSENSORS_FEATURE_TYPES.get(libsensors_type, FeatureType.OTHER)
+    return _type_from_name(feature.name)
+
+
+def _type_from_name(feature_name: str) -> FeatureType:
+    for prefix, feature_type in _HWMON_PREFIXES:
+        if feature_name.startswith(prefix):
+            return feature_type
+    return FeatureType.OTHER
+
+
+class Limits(NamedTuple):
+    """The limits a chip has configured for a sensor (NaN for limits that aren't set)
+
+    Attributes
+    ----------
+    low : float
+        The minimum (e.g. "fan1_min")
+    high : float
+        The maximum (e.g. "temp1_max", or a thermal zone's first passive trip point)
+    critical : float
+        The critical limit (e.g. "temp1_crit", or a thermal zone's critical trip point)
+    """
+
+    low: float = math.nan
+    high: float = math.nan
+    critical: float = math.nan
+
+
+NO_LIMITS = Limits()
+
+# "*_alarm" subfeatures are left out on purpose: they're per-reading state, not limits (see `limits.check_limits`)
+_LIMIT_SUBFEATURES = {"min": "low", "max": "high", "crit": "critical"}
+_LIMIT_TRIP_POINTS = (("hot", "high"), ("passive", "high"), ("critical", "critical"))
+
+
+def _subfeatures(feature) -> Iterable:
+    if isinstance(feature, sensors.Feature):
+        return feature
+    return getattr(feature, "subfeatures", ())
+
+
+def _feature_limits(feature) -> Limits:
+    limits: Dict[str, float] = {}
+    prefix = feature.name + "_"
+    for subfeature in _subfeatures(feature):
+        limit = _LIMIT_SUBFEATURES.get(subfeature.name[len(prefix) :])
+        if limit is None or not subfeature.name.startswith(prefix):
+            continue
+        try:
+            limits[limit] = subfeature.get_value()
+        except sensors.SensorsError:
+            continue
+    return Limits(**limits)
+
+
+def _thermal_zone_limits(index: int) -> Limits:
+    trip_points = thermal_zones.read_trip_points(index)
+    return Limits(
+        **{
+            limit: trip_points[trip_type]
+            for trip_type, limit in _LIMIT_TRIP_POINTS
+            if trip_type in trip_points
+        }
+    )
+
+
+class _InternedSensor(NamedTuple):
+    sensor: Sensor
+    id: int
+    name: str
+    type: FeatureType
+    limits: Optional[Limits] = None
+
+
+# every sensor that comes out of enumeration gets registered here exactly once, along with a small-integer id and its
+# string form, so that enumerating again (or formatting the sensor as a label) doesn't allocate anything new
+_interned: Dict[Tuple, _InternedSensor] = {}
+_interned_by_id: List[Sensor] = []
+_interning_lock = threading.Lock()
+_chip_labels: Dict[bytes, str] = {}
+# the number suffix handed out to each chip (keyed by label and device--see `chip_map`), so that a chip keeps its
+# suffix when other chips with the same label come and go (and, via the chip map, across runs)
+_chip_nums: chip_map.ChipNums = {}
+_loaded_chip_map: Optional[str] = None
+_persist_chip_map = False
+
+
+def _intern(
+    chip: str,
+    addr: int,
+    feature: str,
+    num: int = 0,
+    feature_type: Optional[FeatureType] = None,
+) -> Sensor:
+    entry = _interned.get((chip, addr, feature, num))
+    if entry is not None and (feature_type is None or entry.type is feature_type):
+        return entry.sensor
+    with _interning_lock:
+        entry = _interned.get((chip, addr, feature, num))
+        if entry is None:
+            sensor = Sensor(sys.intern(chip), addr, sys.intern(feature), num)
+            entry = _InternedSensor(
+                sensor,
+                len(_interned_by_id),
+                str(sensor),
+                feature_type or _type_from_name(feature),
+            )
+            _interned_by_id.append(sensor)
+        elif feature_type is not None:
+            entry = entry._replace(type=feature_type)
+        _interned[entry.sensor] = entry
+    return entry.sensor
+
+
+def intern_sensor(sensor: Sensor) -> Sensor:
+    """Get the canonical instance of a sensor
+
+    Parameters
+    ----------
+    sensor : Sensor
+        The sensor
+
+    Returns
+    -------
+    Sensor
+        The one instance of this sensor shared by everything in this process (every sensor returned by
+        `enumerate_all_sensors` is already canonical)
+    """
+    entry = _interned.get(sensor)
+    if entry is not None:
+        return entry.sensor
+    return _intern(*sensor)
+
+
+def sensor_id(sensor: Sensor) -> int:
+    """Get the id of a sensor
+
+    Parameters
+    ----------
+    sensor : Sensor
+        The sensor
+
+    Returns
+    -------
+    int
+        A small integer that uniquely identifies this sensor for the lifetime of the process. Ids are handed out in
+        the order sensors are first seen, starting from zero.
+    """
+    entry = _interned.get(sensor)
+    if entry is None:
+        entry = _interned[_intern(*sensor)]
+    return entry.id
+
+
+def sensor_type(sensor: Sensor) -> FeatureType:
+    """Get the kind of quantity a sensor measures
+
+    Parameters
+    ----------
+    sensor : Sensor
+        The sensor
+
+    Returns
+    -------
+    FeatureType
+        The type, as reported by libsensors when the sensor was enumerated (or, for sensors that haven't been
+        enumerated, as guessed from the feature name). The unit is given by its `unit` attribute.
+    """
+    entry = _interned.get(sensor)
+    if entry is None:
+        entry = _interned[_intern(*sensor)]
+    return entry.type
+
+
+def sensor_limits(sensor: Sensor) -> Limits:
+    """Get the limits configured for a sensor
+
+    Parameters
+    ----------
+    sensor : Sensor
+        The sensor
+
+    Returns
+    -------
+    Limits
+        The limits, as read when the sensor was first enumerated (all NaN for sensors that haven't been enumerated)
+    """
+    entry = _interned.get(sensor)
+    if entry is None or entry.limits is None:
+        return NO_LIMITS
+    return entry.limits
+
+
+def _record_limits(sensor: Sensor, get_limits: Callable[[], Limits]) -> None:
+    entry = _interned[sensor]
+    if entry.limits is None:
+        _interned[sensor] = entry._replace(limits=get_limits())
+
+
+def sensor_from_id(sensor_id: int) -> Sensor:
+    """Look up a sensor from its id (see `sensor_id`)
+
+    Raises
+    ------
+    IndexError
+        If no sensor has been given that id
+    """
+    return _interned_by_id[sensor_id]
+
+
+def _chip_label(prefix: bytes) -> str:
+    label = _chip_labels.get(prefix)
+    if label is None:
+        label = _chip_labels[prefix] = sys.intern(prefix.decode())
+    return label
+
+
+def persist_chip_map(enabled: bool = True) -> None:
+    """Write the number suffixes handed out from now on back to the chip map (see `chip_map`)
+
+    The map is always read, so that names match the ones the command-line interface has been handing out, but only
+    written once this has been called (the command-line interface does, library users have to ask).
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Whether to write the map. Default is True.
+    """
+    global _persist_chip_map
+    _persist_chip_map = enabled
+
+
+def _load_chip_nums() -> Optional[str]:
+    """Pull in the persisted chip map (if it hasn't been already), returning its path"""
+    global _loaded_chip_map
+    if backends.is_virtual():
+        return None
+    path = chip_map.default_chip_map_path()
+    if path is not None and path != _loaded_chip_map:
+        for key, num in chip_map.load_chip_map(path).items():
+            _chip_nums.setdefault(key, num)
+        _loaded_chip_map = path
+    return path
+
+
+def _chip_sort_key(chip, label: str) -> Tuple[str, int, int, int]:
+    """Order chips by where they sit rather than by the order they were detected in"""
+    bus = getattr(chip, "bus", None)
+    return label, getattr(bus, "type", 0), getattr(bus, "nr", 0), chip.addr
+
+
+def _chip_device(chip) -> str:
+    """Identify a libsensors chip by bus and address (see `chip_map`)"""
+    bus = getattr(chip, "bus", None)
+    return f"sensors:{getattr(bus, 'type', 0)}:{getattr(bus, 'nr', 0)}:{chip.addr}"
+
+
+def _chip_num(label: str, device: str, taken: Set[Tuple[str, int]]) -> int:
+    """Pick the number suffix for a chip, reusing the one it was given before wherever possible
+
+    Suffixes that belong to other devices with the same label are never handed out, even if those devices are
+    gone, and a device's suffix is never changed once given.
+    """
+    num = _chip_nums.get((label, device))
+    if num is None or (label, num) in taken:
+        reserved = {
+            other_num
+            for (other_label, other_device), other_num in _chip_nums.items()
+            if other_label == label and other_device != device
+        }
+        if num is not None:
+            # only possible when two chips claim to be the same device, in which case the second one makes do with
+            # a suffix that isn't remembered
+            reserved.add(num)
+        num = 0
+        while (label, num) in taken or num in reserved:
+            num += 1
+        _chip_nums.setdefault((label, device), num)
+    taken.add((label, num))
+    return num
+
+
+def _number_chips(taken: Set[Tuple[str, int]]) -> List[Tuple[Any, str, int]]:
+    """Detect the libsensors chips and work out each one's label and number suffix
+
+    Must be called from within a session. The chips are returned in detection order, and the suffixes handed out are
+    added to `taken`. Chips that come with a `num` of their own (e.g. replayed ones) keep it.
+    """
+    chips = [
+        (chip, _chip_label(chip.prefix))
+        for chip in backends.get_backend().iter_detected_chips()
+    ]
+    nums: Dict[int, int] = {}
+    for i, (chip, chip_label) in enumerate(chips):
+        num = getattr(chip, "num", None)
+        if num is not None:
+            nums[i] = num
+            taken.add((chip_label, num))
+    for i in sorted(range(len(chips)), key=lambda i: _chip_sort_key(*chips[i])):
+        if i in nums:
+            continue
+        chip, chip_label = chips[i]
+        nums[i] = _chip_num(chip_label, _chip_device(chip), taken)
+    return [(chip, chip_label, nums[i]) for i, (chip, chip_label) in enumerate(chips)]
+
+
+def _find_chip(numbered_chips: List[Tuple[Any, str, int]], sensor: Sensor) -> Any:
+    """Pick out the chip a sensor lives on (None if it isn't there)
+
+    Chips are matched on label and address (many chips sit at address 0), falling back on the number suffix only
+    when several chips share both.
+    """
+    candidates = [
+        (chip, num)
+        for chip, chip_label, num in numbered_chips
+        if chip_label == sensor.chip and chip.addr == sensor.addr
+    ]
+    if len(candidates) == 1:
+        return candidates[0][0]
+    for chip, num in candidates:
+        if num == sensor.num:
+            return chip
+    return None
+
+
+def _readable(sensor: Sensor, read: Callable[[], float]) -> bool:
+    """Try reading a sensor (unless it's in quarantine), keeping the health tracker up to date"""
+    tracker = health.DEFAULT_TRACKER
+    if not tracker.should_read(sensor):
+        return False
+    try:
+        read()
+    except sensors.SensorsError as oops:
+        tracker.failed(sensor, oops)
+        return False
+    tracker.succeeded(sensor)
+    return True
+
+
 @sensors_session()
 def enumerate_all_sensors(
     readable_only: Optional[bool] = False,
+    include_cpu: Optional[bool] = False,
 ) -> List[Sensor]:
     """Generate a list of all available sensors
 
+    This includes both the chips detected by libsensors and the kernel's thermal zones (where the chip label is the
+    zone's type and the address is the zone number), leaving out zones that are also exposed as hwmon devices (and
+    so already come through libsensors). A virtual backend (see the `backends` module) replaces all of these with
+    its own chips.
+
     Parameters
     ----------
     readable_only : bool, optional
-        If True, only return the sensors that are actually readable (read: don't throw a SensorsError).
-        Default is False.
+        If True, only return the sensors that are actually readable (read: don't throw a SensorsError). Sensors that
+        have been failing aren't tried again until they're due (see `health.HealthTracker`). Default is False.
+    include_cpu : bool, optional
+        If True, also return each CPU's frequency and thermal throttling counters as pseudo-sensors, e.g.
+        "cpu0.freq" (see the `cpufreq` module). Default is False.
 
     Returns
     -------
     list of tuples, where the first value is a Sensor (chip, feature) tuples and the second the corresponding Feature
     instances
+
+    Notes
+    -----
+    The returned sensors are interned (see `intern_sensor`), so enumerating again returns the very same objects.
+    Number suffixes are handed out to chips sharing a label in order of bus and address (rather than detection
+    order) and are then remembered, both in memory and (if enabled with `persist_chip_map`) in the chip map (see
+    `chip_map.default_chip_map_path`), so the same name keeps referring to the same chip across runs and while other
+    chips come and go (see `rescan`).
+    A new chip never takes over the suffix of one that has been removed.
+    Each sensor's type (and therefore unit) is recorded along the way and can be looked up with `sensor_type`, and
+    the first time a sensor is enumerated its limits are read too (see `sensor_limits`).
     """
-    sensors_list: List[Sensor] = []
-    chip_labels: Set[Tuple[str, int]] = set()
-    for chip in sensors.iter_detected_chips():
-        chip_label = chip.prefix.decode()
-        num = 0
-        while (chip_label, num) in chip_labels:
-            num += 1
-        chip_labels.add((chip_label, num))
-        for feature in chip:
-            if readable_only:
-                try:
-                    _ = feature.get_value()
-                except sensors.SensorsError:
+    # the lock keeps `rescan` from freeing the chips while they're being looked at (and guards the chip numbers)
+    with _session_lock:
+        chip_map_path = _load_chip_nums()
+        previous_chip_nums = dict(_chip_nums)
+        chip_labels: Set[Tuple[str, int]] = set()
+        sensors_list: List[Sensor] = []
+        for chip, chip_label, num in _number_chips(chip_labels):
+            for feature in chip:
+                if not include_cpu and cpufreq.is_cpu_feature(
+                    chip_label, chip.addr, feature.name
+                ):
+                    # only virtual backends serve CPU pseudo-sensors as chips
                     continue
-            sensors_list.append(Sensor(chip_label, chip.addr, feature.name, num=num))
-    return sensors_list
+                sensor = _intern(
+                    chip_label, chip.addr, feature.name, num, _feature_type(feature)
+                )
+                if readable_only and not _readable(sensor, feature.get_value):
+                    continue
+                _record_limits(sensor, functools.partial(_feature_limits, feature))
+                sensors_list.append(sensor)
+
+        virtual = backends.is_virtual()
+        for zone in () if virtual else thermal_zones.list_thermal_zones():
+            if thermal_zones.has_hwmon(zone):
+                continue
+            num = _chip_num(
+                zone.type, f"thermal:{thermal_zones.zone_device(zone)}", chip_labels
+            )
+            sensor = _intern(
+                zone.type,
+                zone.number,
+                thermal_zones.FEATURE_NAME,
+                num,
+                FeatureType.TEMPERATURE,
+            )
+            if readable_only and not _readable(
+                sensor, functools.partial(thermal_zones.read_thermal_zone, zone.number)
+            ):
+                continue
+            _record_limits(sensor, functools.partial(_thermal_zone_limits, zone.number))
+            sensors_list.append(sensor)
+
+        if include_cpu and not virtual:
+            cpu_nums: Dict[int, int] = {}
+            for cpu_feature in cpufreq.list_cpu_features():
+                cpu_label = cpufreq.chip_label(cpu_feature.cpu)
+                if cpu_feature.cpu not in cpu_nums:
+                    cpu_nums[cpu_feature.cpu] = _chip_num(
+                        cpu_label, f"cpu:{cpu_feature.cpu}", chip_labels
+                    )
+                sensor = _intern(
+                    cpu_label,
+                    cpu_feature.cpu,
+                    cpu_feature.feature,
+                    cpu_nums[cpu_feature.cpu],
+                    FeatureType.FREQUENCY
+                    if cpu_feature.feature == cpufreq.FREQUENCY
+                    else FeatureType.OTHER,
+                )
+                if readable_only and not _readable(
+                    sensor,
+                    functools.partial(
+                        cpufreq.read_cpu_feature, cpu_feature.cpu, cpu_feature.feature
+                    ),
+                ):
+                    continue
+                sensors_list.append(sensor)
+
+        if (
+            _persist_chip_map
+            and chip_map_path is not None
+            and _chip_nums != previous_chip_nums
+        ):
+            seen = {
+                key for key, num in _chip_nums.items() if (key[0], num) in chip_labels
+            }
+            chip_map.save_chip_map(chip_map_path, _chip_nums, seen)
+        return sensors_list
+
+
+def _direct_reader(sensor: Sensor) -> Optional[Callable[[], float]]:
+    """Get the function for reading a sensor that doesn't go through libsensors (None if it's a libsensors one)"""
+    if backends.is_virtual():
+        return None
+    if cpufreq.is_cpu_feature(sensor.chip, sensor.addr, sensor.feature):
+        return functools.partial(cpufreq.read_cpu_feature, sensor.addr, sensor.feature)
+    if (
+        sensor.feature == thermal_zones.FEATURE_NAME
+        and thermal_zones.zone_type_of(sensor.addr) == sensor.chip
+    ):
+        return functools.partial(thermal_zones.read_thermal_zone, sensor.addr)
+    return None
 
 
 def read_sensor(sensor: Union[str, Sensor]):
@@ -129,24 +719,249 @@ def read_sensor(sensor: Union[str, Sensor]):
 
     Notes
     -----
-    No units are provided--hopefully you can figure out on your own whether you're seeing degrees C, RPM or volts.
+    No units are attached to the value itself, but you can look them up via `sensor_type(sensor).unit`.
     """
     if isinstance(sensor, str):
-        sensor_lookup = {str(value): value for value in enumerate_all_sensors()}
+        sensor_lookup = {
+            str(value): value for value in enumerate_all_sensors(include_cpu=True)
+        }
         try:
             sensor = sensor_lookup[sensor]
         except KeyError:
             raise ValueError(f"Could not find a sensor matching descriptor {sensor}")
 
-    with sensors_session():
-        for chip in sensors.iter_detected_chips():
-            if chip.addr != sensor.addr:
-                continue
-            for feature in chip:
-                if feature.name == sensor.feature:
-                    return feature.get_value()
-            else:
+    direct_reader = _direct_reader(sensor)
+    if direct_reader is not None:
+        return direct_reader()
+
+    # the lock keeps `rescan` from freeing the chips while they're being looked at
+    with sensors_session(), _session_lock:
+        chip = _find_chip(_number_chips(set()), sensor)
+        if chip is None:
+            raise ValueError(f"Chip {sensor.chip} not found at address {sensor.addr}")
+        for feature in chip:
+            if feature.name == sensor.feature:
+                return feature.get_value()
+    raise ValueError(
+        f"Feature {sensor.feature} not found on chip {str(sensor).split('.')[0]}"
+    )
+
+
+def find_sensors(
+    *patterns: str,
+    readable_only: Optional[bool] = True,
+    types: Optional[Iterable[FeatureType]] = None,
+    include_cpu: Optional[bool] = None,
+) -> List[Sensor]:
+    """Find all sensors whose string representations match any of the provided glob patterns
+
+    Parameters
+    ----------
+    *patterns : str
+        fnmatch-style patterns, e.g. "coretemp.*". If no patterns are provided, all sensors will be returned.
+    readable_only : bool, optional
+        If True, only return the sensors that are actually readable. Default is True.
+    types : iterable of FeatureType, optional
+        If provided, only return sensors of these types.
+    include_cpu : bool, optional
+        Whether to include the CPU frequency and throttling pseudo-sensors (see `enumerate_all_sensors`). Default
+        is to include them only when patterns are provided, so that e.g. "cpu*.freq" finds them but asking for
+        everything doesn't.
+
+    Returns
+    -------
+    list of Sensor
+        The matching sensors, in enumeration order
+    """
+    if include_cpu is None:
+        include_cpu = bool(patterns)
+    all_sensors = enumerate_all_sensors(
+        readable_only=readable_only, include_cpu=include_cpu
+    )
+    if types is not None:
+        wanted = set(types)
+        all_sensors = [
+            sensor for sensor in all_sensors if _interned[sensor].type in wanted
+        ]
+    if not patterns:
+        return all_sensors
+    return [
+        sensor
+        for sensor in all_sensors
+        if any(fnmatch.fnmatchcase(str(sensor), pattern) for pattern in patterns)
+    ]
+
+
+class BatchReader:
+    """Repeatedly read a fixed set of sensors within a single sensors session
+
+    The chips and features are only looked up once (when the reader is opened), so each subsequent read only costs
+    the reads themselves.
+
+    Parameters
+    ----------
+    sensors_to_read : iterable of Sensor tuples or strings
+        The sensors to read. See `read_sensor` for the accepted formats.
+
+    Raises
+    ------
+    ValueError
+        (upon opening) If any of the sensors cannot be found
+    """
+
+    def __init__(self, sensors_to_read: Iterable[Union[str, Sensor]]):
+        self._requested = list(sensors_to_read)
+        self.sensors: List[Sensor] = []
+        self.table: Optional["SensorTable"] = None
+        self._getters: List[Callable[[], float]] = []
+        self._unread: "array[float]" = array("d")
+        self._session: Optional[ExitStack] = None
+        self._generation = -1
+
+    def open(self) -> "BatchReader":
+        """Start the session and look up all the sensors"""
+        from .readings import Readings
+        from .sensor_table import SensorTable
+
+        if self._session is not None:
+            return self
+        session = ExitStack()
+        session.enter_context(sensors_session())
+        try:
+            with _session_lock:
+                self.sensors, self._getters = _resolve(self._requested)
+                self._generation = _generation
+        except Exception:
+            session.close()
+            raise
+        self.table = SensorTable.of(self.sensors)
+        self._readings_class = Readings
+        self._unread = array("d", (math.nan,) * len(self.sensors))
+        self._session = session
+        return self
+
+    def close(self) -> None:
+        """End the session"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+            self._getters = []
+
+    def __enter__(self) -> "BatchReader":
+        return self.open()
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def read(self) -> "Readings":
+        """Read all sensors
+
+        Returns
+        -------
+        Readings
+            The sensor values, which can be used like a dict of Sensor to float. Sensors that could not be read (or
+            whose chips have been removed since the reader was opened) will have a value of None, and won't be
+            tried again until they're due (see `health.HealthTracker`).
+        """
+        if self._session is None:
+            raise RuntimeError("BatchReader must be opened before reading")
+        table = self.table
+        assert table is not None
+        values = array("d", self._unread)
+        tracker = health.DEFAULT_TRACKER
+        with _session_lock:
+            if self._generation != _generation:
+                _, self._getters = _resolve(self.sensors, missing_ok=True)
+                self._generation = _generation
+            for i, (sensor, getter) in enumerate(zip(self.sensors, self._getters)):
+                if not tracker.should_read(sensor):
+                    continue
+                try:
+                    values[i] = getter()
+                except sensors.SensorsError as oops:
+                    tracker.failed(sensor, oops)
+                else:
+                    tracker.succeeded(sensor)
+        return self._readings_class(table, values)
+
+
+def _missing(sensor: Sensor) -> float:
+    raise sensors.SensorsError(f"{sensor} is no longer available")
+
+
+def _resolve(
+    sensors_to_read: Sequence[Union[str, Sensor]], missing_ok: bool = False
+) -> Tuple[List[Sensor], List[Callable[[], float]]]:
+    """Look up the function for reading each sensor (must be called from within a session)
+
+    If missing_ok is True, sensors that can't be found get a function that always fails instead of raising a
+    ValueError.
+    """
+    if any(isinstance(sensor, str) for sensor in sensors_to_read):
+        sensor_lookup = {
+            str(value): value for value in enumerate_all_sensors(include_cpu=True)
+        }
+    resolved: List[Sensor] = []
+    for sensor in sensors_to_read:
+        if isinstance(sensor, str):
+            try:
+                sensor = sensor_lookup[sensor]
+            except KeyError:
                 raise ValueError(
-                    f"Feature {sensor.feature} not found on chip {str(sensor).split('.')[0]}"
+                    f"Could not find a sensor matching descriptor {sensor}"
                 )
-    raise ValueError(f"Chip {sensor.chip} not found at address {sensor.addr}")
+        resolved.append(intern_sensor(sensor))
+
+    numbered_chips = _number_chips(set())
+    features: Dict[int, Dict[str, Callable[[], float]]] = {}
+
+    getters: List[Callable[[], float]] = []
+    for sensor in resolved:
+        direct_reader = _direct_reader(sensor)
+        if direct_reader is not None:
+            getters.append(direct_reader)
+            continue
+        chip = _find_chip(numbered_chips, sensor)
+        if chip is None:
+            if missing_ok:
+                getters.append(functools.partial(_missing, sensor))
+                continue
+            raise ValueError(f"Chip {sensor.chip} not found at address {sensor.addr}")
+        chip_features = features.get(id(chip))
+        if chip_features is None:
+            chip_features = features[id(chip)] = {
+                feature.name: feature.get_value for feature in chip
+            }
+        try:
+            getters.append(chip_features[sensor.feature])
+        except KeyError:
+            if missing_ok:
+                getters.append(functools.partial(_missing, sensor))
+                continue
+            raise ValueError(
+                f"Feature {sensor.feature} not found on chip {str(sensor).split('.')[0]}"
+            )
+    return resolved, getters
+
+
+def read_many(sensors_to_read: Iterable[Union[str, Sensor]]) -> "Readings":
+    """Read several sensors at once, using a single sensors session
+
+    Parameters
+    ----------
+    sensors_to_read : iterable of Sensor tuples or strings
+        The sensors to read. See `read_sensor` for the accepted formats.
+
+    Returns
+    -------
+    Readings
+        The sensor values, which can be used like a dict of Sensor to float. Sensors that could not be read will have
+        a value of None.
+
+    Raises
+    ------
+    ValueError
+        If any of the sensors cannot be found
+    """
+    with BatchReader(sensors_to_read) as reader:
+        return reader.read()
@@ -0,0 +1,222 @@
+"""Compact container for a batch of readings"""
+import math
+from array import array
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Sequence, Union
+
+from .read_sensors import FeatureType, Sensor
+from .sensor_table import SensorTable
+
+
+class Readings(Mapping[Sensor, Optional[float]]):
+    """A reading from each sensor in a table, stored as a flat array of doubles
+
+    This behaves like a (read-only) dict of Sensor to float, with None for sensors that could not be read, and can
+    also be indexed by sensor name. Each instance only holds a reference to its (shared) table plus 8 bytes per
+    sensor, instead of a dict entry and a float object per sensor.
+
+    Parameters
+    ----------
+    table : SensorTable
+        The sensors the readings are for
+    data : array of doubles
+        The readings, in table order, with NaN for sensors that could not be read
+
+    Attributes
+    ----------
+    table : SensorTable
+        The sensors the readings are for
+    data : array of doubles
+        The readings, in table order, with NaN for sensors that could not be read
+    """
+
+    __slots__ = ("table", "data")
+
+    def __init__(self, table: SensorTable, data: "array[float]"):
+        if len(data) != len(table):
+            raise ValueError(
+                f"Got {len(data)} readings for a table of {len(table)} sensors"
+            )
+        self.table = table
+        self.data = data
+
+    @classmethod
+    def from_mapping(
+        cls, table: SensorTable, readings: Mapping[Sensor, Optional[float]]
+    ) -> "Readings":
+        """Pack a dict of readings
+
+        Parameters
+        ----------
+        table : SensorTable
+            The sensors the readings are for. Any sensors in the table that are missing from the readings are
+            recorded as unreadable.
+        readings : dict of Sensor to float
+            The readings (None for unreadable)
+
+        Returns
+        -------
+        Readings
+            The packed readings
+        """
+        data = array("d", (math.nan,) * len(table))
+        for sensor, value in readings.items():
+            if value is not None:
+                data[table.index(sensor)] = value
+        return cls(table, data)
+
+    def __getitem__(self, sensor: Union[str, Sensor]) -> Optional[float]:  # type: ignore[override]
+        value = self.data[self.table.index(sensor)]
+        return None if value != value else value
+
+    def __contains__(self, sensor: object) -> bool:
+        return sensor in self.table
+
+    def __iter__(self) -> Iterator[Sensor]:
+        return iter(self.table.sensors)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(zip(self.table.names, self.data))!r})"
+
+    def by_name(self) -> Dict[str, Optional[float]]:
+        """Convert to a dict keyed by sensor name (e.g. for serialization)
+
+        Returns
+        -------
+        dict of str to float
+            The readings, keyed by the string representation of each sensor (None for unreadable)
+        """
+        return {
+            name: None if value != value else value
+            for name, value in zip(self.table.names, self.data)
+        }
+
+    def of_type(self, *types: FeatureType) -> "Readings":
+        """Keep just the readings from sensors of the given types
+
+        Parameters
+        ----------
+        *types : FeatureType
+            The types to keep
+
+        Returns
+        -------
+        Readings
+            The readings of the matching sensors, whose table is `self.table.of_type(*types)`
+        """
+        data = self.data
+        return Readings(
+            self.table.of_type(*types),
+            array("d", [data[i] for i in self.table.positions_of_type(*types)]),
+        )
+
+    def with_units(self) -> Dict[str, str]:
+        """Format each reading with its unit (e.g. for display)
+
+        Returns
+        -------
+        dict of str to str
+            The readings, keyed by sensor name, formatted like "62.3°C" (or "None" for unreadable)
+        """
+        return {
+            name: f"{value}{unit}" if value == value else "None"
+            for name, value, unit in zip(self.table.names, self.data, self.table.units)
+        }
+
+    def to_numpy(self):
+        """View the readings as a NumPy array (without copying)
+
+        Returns
+        -------
+        ndarray of float64
+            The readings, in table order, with NaN for sensors that could not be read. The array shares memory with
+            these readings.
+        """
+        import numpy as np
+
+        return np.frombuffer(self.data, dtype=np.float64)
+
+    def to_records(self):
+        """Convert to a NumPy structured array (requires NumPy)
+
+        Returns
+        -------
+        structured ndarray
+            One record per sensor, in table order, with fields "chip", "addr", "feature", "num" and "value" (NaN for
+            sensors that could not be read)
+        """
+        import numpy as np
+
+        sensors = self.table.to_numpy()
+        records = np.empty(
+            len(self),
+            dtype=[(level, sensors.dtype[level]) for level in _SENSOR_FIELDS]
+            + [("value", "f8")],
+        )
+        for level in _SENSOR_FIELDS:
+            records[level] = sensors[level]
+        records["value"] = self.to_numpy()
+        return records
+
+    def to_series(self):
+        """Convert to a pandas Series (requires pandas)
+
+        Returns
+        -------
+        pandas.Series
+            The readings (NaN for unreadable), indexed by the table's MultiIndex (see `SensorTable.to_index`)
+        """
+        import pandas as pd
+
+        return pd.Series(self.to_numpy(), index=self.table.to_index(), name="value")
+
+
+_SENSOR_FIELDS = ("chip", "addr", "feature", "num")
+
+
+def stack_readings(
+    readings: Iterable[Readings], timestamps: Optional[Sequence[float]] = None
+):
+    """Combine a series of batches of readings into a pandas DataFrame (requires pandas)
+
+    Parameters
+    ----------
+    readings : iterable of Readings
+        The batches, which must all share the same table (as the samples taken by a `Sampler` do)
+    timestamps : list of float, optional
+        The (Unix) time of each batch, to use as the index. Default is to number the batches.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per batch and one column per sensor, with the table's MultiIndex (see `SensorTable.to_index`) as the
+        columns. The batches are copied straight into a single 2D array, without going through Python floats.
+
+    Raises
+    ------
+    ValueError
+        If the batches aren't all for the same sensors, or if the number of timestamps doesn't match
+    """
+    import numpy as np
+    import pandas as pd
+
+    batches = list(readings)
+    if not batches:
+        return pd.DataFrame()
+    table = batches[0].table
+    if any(batch.table is not table for batch in batches):
+        raise ValueError("Readings must all be for the same sensors")
+    values = np.empty((len(batches), len(table)), dtype=np.float64)
+    for row, batch in zip(values, batches):
+        row[:] = batch.to_numpy()
+    index = None
+    if timestamps is not None:
+        if len(timestamps) != len(batches):
+            raise ValueError(
+                f"Got {len(timestamps)} timestamps for {len(batches)} batches of readings"
+            )
+        index = pd.to_datetime(np.asarray(timestamps, dtype=np.float64), unit="s")
+        index.name = "time"
+    return pd.DataFrame(values, index=index, columns=table.to_index())
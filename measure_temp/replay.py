@@ -0,0 +1,216 @@
+"""Play recorded history back through the normal API
+
+A `ReplayBackend` (see the `backends` module) serves the sensors recorded in a history database (see the `history`
+module) as if they were the machine's own, with each read returning whatever the sensor read at the corresponding
+point in the recording. Playback runs at real time or faster, and samples are timestamped with the recording's
+time, so that time-based consumers (alert rules, retention, profiles) see the recording as it happened, just
+compressed.
+
+Examples
+--------
+>>> set_backend(ReplayBackend("history.db", speed=100))
+>>> with Sampler(find_sensors(), interval=0.01) as sampler:
+...     sampler.subscribe(engine.update)  # one sample per recorded second
+...     time.sleep(36)  # an hour's worth
+"""
+import math
+import sqlite3
+from array import array
+from bisect import bisect_right
+from time import monotonic
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import sensors
+
+from .history import connect
+
+
+class ReplayFeature:
+    """A recorded sensor, as served by a ReplayBackend
+
+    Attributes
+    ----------
+    name : str
+        The feature name
+    feature_type : str
+        The recorded type (see `FeatureType`)
+    times, values : array of doubles
+        The recorded readings
+    """
+
+    __slots__ = ("name", "feature_type", "times", "values", "_backend")
+
+    subfeatures = ()
+
+    def __init__(
+        self,
+        name: str,
+        feature_type: str,
+        times: "array[float]",
+        values: "array[float]",
+        backend: "ReplayBackend",
+    ):
+        self.name = name
+        self.feature_type = feature_type
+        self.times = times
+        self.values = values
+        self._backend = backend
+
+    def get_value(self) -> float:
+        """Get the recorded reading as of the current playback position
+
+        Raises
+        ------
+        SensorsError
+            If the sensor hadn't been read yet at this point in the recording
+        """
+        i = bisect_right(self.times, self._backend.position()) - 1
+        if i < 0:
+            raise sensors.SensorsError(f"{self.name} hadn't been recorded yet")
+        return self.values[i]
+
+
+class ReplayChip:
+    """A recorded chip, as served by a ReplayBackend (with the number suffix it was recorded with)"""
+
+    def __init__(self, label: str, addr: int, num: int, features: List[ReplayFeature]):
+        self.prefix = label.encode()
+        self.addr = addr
+        self.num = num
+        self.features = features
+
+    def __iter__(self) -> Iterator[ReplayFeature]:
+        return iter(self.features)
+
+
+class ReplayBackend:
+    """Serve the readings recorded in a history database
+
+    Parameters
+    ----------
+    database : str or Connection
+        The database file (or an open connection to it)
+    speed : float, optional
+        How many recorded seconds to play back per real second. Default is 1 (real time).
+    loop : bool, optional
+        If True, start over from the beginning once the end of the recording is reached. Default is to keep
+        returning the last recorded readings.
+    start : float, optional
+        The (Unix) time in the recording to start playback from. Default is the start of the recording.
+    clock : callable, optional
+        The real-time clock to pace playback by. Default is `time.monotonic`.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there's no database at `database`
+    ValueError
+        If nothing was recorded in the database
+
+    Notes
+    -----
+    The recording is loaded into memory up front (16 bytes per reading), so reads are a binary search. Playback
+    starts the first time a sensors session is opened, and keeps going across sessions (and `rescan`s).
+
+    Only the raw readings are replayed; if the database's raw readings were dropped (see `HistoryWriter`), there's
+    nothing left to play back for that stretch. The sensors' limits aren't recorded, so replayed sensors don't have
+    any.
+    """
+
+    virtual = True
+
+    def __init__(
+        self,
+        database,
+        speed: float = 1.0,
+        loop: bool = False,
+        start: Optional[float] = None,
+        clock: Callable[[], float] = monotonic,
+    ):
+        if speed <= 0:
+            raise ValueError("Playback speed must be positive")
+        self.speed = speed
+        self.loop = loop
+        self.clock = clock
+        self.first = math.inf
+        self.last = -math.inf
+        self.chips: List[ReplayChip] = []
+        connection = (
+            connect(database, read_only=True) if isinstance(database, str) else database
+        )
+        try:
+            self._load(connection)
+        finally:
+            if isinstance(database, str):
+                connection.close()
+        if not self.chips:
+            raise ValueError(f"No readings recorded in {database}")
+        self.start = self.first if start is None else start
+        self._epoch: Optional[float] = None
+
+    def _load(self, connection: sqlite3.Connection) -> None:
+        series: Dict[int, Tuple["array[float]", "array[float]"]] = {}
+        for sensor_id, timestamp, value in connection.execute(
+            "SELECT sensor_id, time, value FROM readings ORDER BY sensor_id, time"
+        ):
+            times_and_values = series.get(sensor_id)
+            if times_and_values is None:
+                times_and_values = series[sensor_id] = (array("d"), array("d"))
+            times_and_values[0].append(timestamp)
+            times_and_values[1].append(value)
+
+        # the suffix, not the address, is what tells chips sharing a label apart (e.g. "acpitz" and "acpitz1" can
+        # both be at address 0)
+        chips: Dict[Tuple[str, int], ReplayChip] = {}
+        for sensor_id, chip, addr, feature, num, feature_type in connection.execute(
+            "SELECT id, chip, addr, feature, num, type FROM sensors ORDER BY id"
+        ):
+            if sensor_id not in series:
+                continue
+            times, values = series[sensor_id]
+            self.first = min(self.first, times[0])
+            self.last = max(self.last, times[-1])
+            replay_chip = chips.get((chip, num))
+            if replay_chip is None:
+                replay_chip = chips[(chip, num)] = ReplayChip(chip, addr, num, [])
+                self.chips.append(replay_chip)
+            replay_chip.features.append(
+                ReplayFeature(feature, feature_type, times, values, self)
+            )
+
+    def init(self) -> None:
+        if self._epoch is None:
+            self._epoch = self.clock()
+
+    def cleanup(self) -> None:
+        pass
+
+    def iter_detected_chips(self) -> Iterator[ReplayChip]:
+        return iter(self.chips)
+
+    def restart(self, start: Optional[float] = None) -> None:
+        """Go back to the beginning of the recording (or to the given time in it)"""
+        self.start = self.first if start is None else start
+        self._epoch = self.clock()
+
+    def time(self) -> float:
+        """The playback time: where playback would be in the recording if the recording went on forever
+
+        Unlike `position`, this never jumps back when looping, so samples timestamped with it stay in order.
+        """
+        if self._epoch is None:
+            return self.start
+        return self.start + (self.clock() - self._epoch) * self.speed
+
+    def position(self) -> float:
+        """The point in the recording that's currently being played back"""
+        now = self.time()
+        span = self.last - self.first
+        if self.loop and now > self.last and span > 0:
+            return self.first + (now - self.first) % span
+        return now
+
+    @property
+    def finished(self) -> bool:
+        """Whether playback has reached the end of the recording (never, when looping)"""
+        return not self.loop and self.time() >= self.last
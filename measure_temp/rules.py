@@ -0,0 +1,309 @@
+"""Simple alert rules, evaluated incrementally as samples come in
+
+A rule is one or more conditions joined by "and" (or "while"), optionally followed by "for <duration>". Each
+condition either compares a sensor (referred to by its string representation) against a number or checks whether
+it's trending up or down:
+
+    coretemp.temp1 > 85 for 30s
+    nct6775.fan1 == 0 while coretemp.temp1 rising
+
+Durations can be given in ms, s (the default), m or h. Rules only keep a constant amount of state (when they started
+matching, whether they're firing and, for trends, the previous value), so evaluating them never means rescanning
+history.
+
+Examples
+--------
+>>> engine = RuleEngine(
+...     [compile_rule("coretemp.temp1 > 85 for 30s", hysteresis=5)],
+...     callback=lambda alert: print(alert.rule.name, "firing" if alert.firing else "cleared"),
+... )
+>>> sampler.subscribe(engine.update)
+"""
+import math
+import operator
+import re
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Union
+
+from .read_sensors import Sensor
+
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+_FOR = re.compile(
+    r"^(?P<body>.+?)\s+for\s+(?P<amount>\d+(?:\.\d*)?)\s*(?P<unit>ms|s|m|h)?$"
+)
+_AND = re.compile(r"\s+(?:and|while)\s+")
+_COMPARISON = re.compile(
+    r"^(?P<name>\S+?)\s*(?P<op>>=|<=|==|!=|>|<)\s*"
+    r"(?P<threshold>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)$"
+)
+_TREND = re.compile(r"^(?P<name>\S+)\s+(?P<direction>rising|falling)$")
+
+_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# which way to shift a threshold (once a rule is firing) so that it takes a bigger change to clear it
+_HYSTERESIS_DIRECTIONS = {">": -1, ">=": -1, "<": 1, "<=": 1, "==": 0, "!=": 0}
+
+
+class Condition(NamedTuple):
+    """A single comparison or trend check against one sensor
+
+    Attributes
+    ----------
+    name : str
+        The string representation of the sensor
+    op : str
+        One of the comparison operators, or "rising" / "falling"
+    threshold : float
+        The number to compare against (NaN for trends)
+    """
+
+    name: str
+    op: str
+    threshold: float = math.nan
+
+
+def _parse_condition(text: str) -> Condition:
+    match = _COMPARISON.match(text)
+    if match:
+        return Condition(match["name"], match["op"], float(match["threshold"]))
+    match = _TREND.match(text)
+    if match:
+        return Condition(match["name"], match["direction"])
+    raise ValueError(f"Could not parse condition {text!r}")
+
+
+class Rule:
+    """A compiled alert rule (create these with `compile_rule`)
+
+    Attributes
+    ----------
+    name : str
+        The rule's name (the expression, unless one was given)
+    conditions : tuple of Condition
+        The conditions, all of which must hold for the rule to match
+    duration : float
+        How many seconds the conditions must hold before the rule fires
+    hysteresis : float
+        Once firing, how far past its threshold a comparison has to get back before it stops holding
+    firing : bool
+        Whether the rule is currently firing
+    """
+
+    def __init__(
+        self,
+        conditions: Iterable[Condition],
+        duration: float = 0.0,
+        hysteresis: float = 0.0,
+        name: str = "",
+    ):
+        self.conditions = tuple(conditions)
+        self.duration = duration
+        self.hysteresis = hysteresis
+        self.name = name
+        self.firing = False
+        self._matching_since: Optional[float] = None
+        self._previous: List[float] = [math.nan] * len(self.conditions)
+        self._table = None
+        self._positions: List[int] = []
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name!r})"
+
+    def reset(self) -> None:
+        """Forget all state"""
+        self.firing = False
+        self._matching_since = None
+        self._previous = [math.nan] * len(self.conditions)
+
+    def update(
+        self, timestamp: float, readings: Mapping[Union[str, Sensor], Optional[float]]
+    ) -> Optional[bool]:
+        """Evaluate the rule against a new sample
+
+        Parameters
+        ----------
+        timestamp : float
+            The time of the sample, in seconds
+        readings : Readings or dict
+            The sample, keyed by sensor name or by Sensor. Any sensor the rule refers to that's missing or unreadable
+            makes its condition false.
+
+        Returns
+        -------
+        bool or None
+            True if the rule just started firing, False if it just stopped firing, None if nothing changed
+        """
+        matching = True
+        for i, value in enumerate(self._values(readings)):
+            if not self._holds(i, value):
+                matching = False  # keep going so that every trend sees every sample
+
+        if not matching:
+            self._matching_since = None
+            if self.firing:
+                self.firing = False
+                return False
+            return None
+
+        if self._matching_since is None:
+            self._matching_since = timestamp
+        if not self.firing and timestamp - self._matching_since >= self.duration:
+            self.firing = True
+            return True
+        return None
+
+    def _values(
+        self, readings: Mapping[Union[str, Sensor], Optional[float]]
+    ) -> List[float]:
+        table = getattr(readings, "table", None)
+        if table is not None:
+            # Readings: look the positions up once per table and then index straight into the array
+            if table is not self._table:
+                self._table = table
+                self._positions = [
+                    table.index(condition.name) if condition.name in table else -1
+                    for condition in self.conditions
+                ]
+            data = readings.data  # type: ignore[attr-defined]
+            return [data[i] if i >= 0 else math.nan for i in self._positions]
+        values = []
+        by_name: Optional[Dict[str, Optional[float]]] = None
+        for condition in self.conditions:
+            if condition.name in readings:
+                value = readings[condition.name]
+            else:
+                # keyed by Sensor (or missing): match the names up once per sample
+                if by_name is None:
+                    by_name = {str(key): value for key, value in readings.items()}
+                value = by_name.get(condition.name)
+            values.append(math.nan if value is None else value)
+        return values
+
+    def _holds(self, i: int, value: float) -> bool:
+        condition = self.conditions[i]
+        if condition.op in ("rising", "falling"):
+            previous, self._previous[i] = self._previous[i], value
+            if condition.op == "rising":
+                return value > previous
+            return value < previous
+        if value != value:
+            return False
+        threshold = condition.threshold
+        if self.firing:
+            threshold += _HYSTERESIS_DIRECTIONS[condition.op] * self.hysteresis
+        return _OPERATORS[condition.op](value, threshold)
+
+
+def compile_rule(
+    expression: str, hysteresis: float = 0.0, name: Optional[str] = None
+) -> Rule:
+    """Compile a rule expression
+
+    Parameters
+    ----------
+    expression : str
+        The rule (see the module docstring for the syntax)
+    hysteresis : float, optional
+        Once the rule is firing, how far back past its threshold a comparison has to get before it stops holding,
+        e.g. with a hysteresis of 5, "coretemp.temp1 > 85" keeps firing until the temperature drops to 80.
+        Default is 0.
+    name : str, optional
+        A name for the rule. Default is the expression itself.
+
+    Returns
+    -------
+    Rule
+        The compiled rule
+
+    Raises
+    ------
+    ValueError
+        If the expression can't be parsed
+    """
+    body = expression.strip()
+    duration = 0.0
+    match = _FOR.match(body)
+    if match:
+        body = match["body"]
+        duration = float(match["amount"]) * _DURATION_UNITS[match["unit"] or "s"]
+    conditions = [_parse_condition(part) for part in _AND.split(body)]
+    return Rule(conditions, duration, hysteresis, name or expression.strip())
+
+
+class Alert(NamedTuple):
+    """A rule starting or stopping firing
+
+    Attributes
+    ----------
+    rule : Rule
+        The rule
+    timestamp : float
+        The time of the sample that triggered the change
+    firing : bool
+        True if the rule started firing, False if it stopped
+    """
+
+    rule: Rule
+    timestamp: float
+    firing: bool
+
+
+class RuleEngine:
+    """A set of rules fed from the same stream of samples
+
+    Parameters
+    ----------
+    rules : iterable of Rule or str
+        The rules (expressions will be compiled with the default settings)
+    callback : function of Alert -> None, optional
+        Called every time a rule starts or stops firing
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Union[Rule, str]],
+        callback: Optional[Callable[[Alert], None]] = None,
+    ):
+        self.rules = [
+            compile_rule(rule) if isinstance(rule, str) else rule for rule in rules
+        ]
+        self.callback = callback
+
+    @property
+    def firing(self) -> List[Rule]:
+        """The rules that are currently firing"""
+        return [rule for rule in self.rules if rule.firing]
+
+    def update(
+        self, timestamp: float, readings: Mapping[Union[str, Sensor], Optional[float]]
+    ) -> List[Alert]:
+        """Evaluate every rule against a new sample (meant to be subscribed to a `Sampler`)
+
+        Parameters
+        ----------
+        timestamp : float
+            The time of the sample, in seconds
+        readings : Readings or dict
+            The sample
+
+        Returns
+        -------
+        list of Alert
+            The rules that started or stopped firing
+        """
+        alerts = []
+        for rule in self.rules:
+            change = rule.update(timestamp, readings)
+            if change is not None:
+                alert = Alert(rule, timestamp, change)
+                alerts.append(alert)
+                if self.callback is not None:
+                    self.callback(alert)
+        return alerts
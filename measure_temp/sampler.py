@@ -0,0 +1,206 @@
+"""Periodically sample sensors"""
+import logging
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from . import backends
+from .read_sensors import BatchReader, Sensor
+from .readings import Readings
+
+if TYPE_CHECKING:
+    from .isolation import IsolatedReader
+
+Sample = Tuple[float, Readings]
+Subscriber = Callable[[float, Readings], None]
+
+LOGGER = logging.getLogger(__name__)
+
+
+def sample(
+    sensors_to_read: Iterable[Union[str, Sensor]],
+    interval: float = 1.0,
+    count: Optional[int] = None,
+    stop: Optional[threading.Event] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[Sample]:
+    """Read a set of sensors at regular intervals
+
+    Parameters
+    ----------
+    sensors_to_read : iterable of Sensor tuples or strings
+        The sensors to read. See `read_sensor` for the accepted formats.
+    interval : float, optional
+        The number of seconds between samples. Default is 1.
+    count : int, optional
+        The number of samples to take. Default is to keep going forever.
+    stop : Event, optional
+        If provided, sampling will end (without waiting out the rest of the interval) once this event is set.
+    deadline : float, optional
+        If provided, the sensors are read from a separate process (see `isolation.IsolatedReader`), and any sensor
+        that takes longer than this many seconds to read is recorded as unreadable (and skipped for a while) instead
+        of stalling the sampling.
+
+    Yields
+    ------
+    tuple of (float, Readings)
+        The (Unix) time of the sample (see `backends.timestamp`) and the readings, keyed by sensor (unreadable
+        sensors will have a value of None)
+
+    Notes
+    -----
+    A single sensors session is held open for as long as the generator is alive. Samples are scheduled on a fixed
+    grid, so slow reads (or slow consumers) don't make the sampling drift.
+    """
+    stop = stop or threading.Event()
+    if deadline is None:
+        reader: Union[BatchReader, "IsolatedReader"] = BatchReader(sensors_to_read)
+    else:
+        from .isolation import IsolatedReader
+
+        reader = IsolatedReader(sensors_to_read, deadline=deadline)
+    with reader:
+        next_tick = time.monotonic()
+        taken = 0
+        while (count is None or taken < count) and not stop.is_set():
+            yield backends.timestamp(), reader.read()
+            taken += 1
+            if taken == count:
+                break
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                if stop.wait(delay):
+                    break
+            else:
+                next_tick = time.monotonic()
+
+
+class Sampler:
+    """Sample a set of sensors on a background thread
+
+    Parameters
+    ----------
+    sensors_to_read : iterable of Sensor tuples or strings
+        The sensors to read. See `read_sensor` for the accepted formats.
+    interval : float, optional
+        The number of seconds between samples. Default is 1.
+    deadline : float, optional
+        If provided, the sensors are read from a separate process, giving up on any that take longer than this many
+        seconds. See `sample`.
+
+    Examples
+    --------
+    >>> with Sampler(["coretemp.temp1"], interval=0.5) as sampler:
+    ...     sampler.subscribe(lambda timestamp, readings: print(readings))
+    ...     time.sleep(10)
+    """
+
+    def __init__(
+        self,
+        sensors_to_read: Iterable[Union[str, Sensor]],
+        interval: float = 1.0,
+        deadline: Optional[float] = None,
+    ):
+        self.sensors_to_read = list(sensors_to_read)
+        self.interval = interval
+        self.deadline = deadline
+        self._subscribers: List[Subscriber] = []
+        self._latest: Optional[Sample] = None
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def latest(self) -> Optional[Sample]:
+        """The most recent sample (None if the sampler hasn't been started)"""
+        return self._latest
+
+    @property
+    def sensors(self) -> List[Sensor]:
+        """The sensors being sampled, in order (empty if the sampler hasn't been started)"""
+        return [] if self._latest is None else list(self._latest[1])
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Have a function called (from the sampling thread) with the time and readings of every sample
+
+        Parameters
+        ----------
+        callback : function of (float, Readings) -> None
+            The function to call. Exceptions raised by the callback are logged and otherwise ignored.
+        """
+        self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        """Stop calling a function that was previously subscribed"""
+        self._subscribers = [
+            subscriber for subscriber in self._subscribers if subscriber != callback
+        ]
+
+    def start(self) -> "Sampler":
+        """Start sampling, waiting until the first sample has been taken
+
+        Raises
+        ------
+        ValueError
+            If any of the sensors cannot be found
+        """
+        if self.running:
+            return self
+        self._stop.clear()
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+        return self
+
+    def stop(self) -> None:
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "Sampler":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        try:
+            for timestamp, readings in sample(
+                self.sensors_to_read,
+                self.interval,
+                stop=self._stop,
+                deadline=self.deadline,
+            ):
+                self._latest = (timestamp, readings)
+                self._ready.set()
+                for subscriber in self._subscribers:
+                    try:
+                        subscriber(timestamp, readings)
+                    except Exception:
+                        LOGGER.exception("Error in sampler subscriber %r", subscriber)
+        except BaseException as oops:
+            self._error = oops
+        finally:
+            self._ready.set()
@@ -0,0 +1,235 @@
+"""Shared, ordered tables of sensors"""
+import weakref
+from array import array
+from typing import Dict, FrozenSet, Iterable, Iterator, Tuple, Union
+
+from .read_sensors import (
+    FeatureType,
+    Sensor,
+    intern_sensor,
+    sensor_id,
+    sensor_limits,
+    sensor_type,
+)
+
+# tables are interned, so every batch of readings taken from the same set of sensors shares a single table
+_tables: "weakref.WeakValueDictionary[Tuple[Sensor, ...], SensorTable]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+class SensorTable:
+    """An immutable, ordered collection of sensors that can be looked up by position, by Sensor or by name
+
+    Don't construct these directly: use `SensorTable.of`, which returns the same table for the same sensors.
+
+    Attributes
+    ----------
+    sensors : tuple of Sensor
+        The sensors, in order (interned--see `intern_sensor`)
+    names : tuple of str
+        The string representation of each sensor
+    ids : array of ints
+        The id of each sensor (see `sensor_id`)
+    types : tuple of FeatureType
+        The type of each sensor (see `sensor_type`)
+    units : tuple of str
+        The unit of each sensor's readings
+    low, high, critical : array of doubles
+        Each sensor's limits (see `sensor_limits`), with NaN where a limit isn't set
+    """
+
+    __slots__ = (
+        "sensors",
+        "names",
+        "ids",
+        "types",
+        "units",
+        "low",
+        "high",
+        "critical",
+        "_index",
+        "_by_type",
+        "_records",
+        "_multi_index",
+        "__weakref__",
+    )
+
+    def __init__(self, sensors: Iterable[Sensor]):
+        self.sensors: Tuple[Sensor, ...] = tuple(
+            intern_sensor(sensor) for sensor in sensors
+        )
+        self.names: Tuple[str, ...] = tuple(str(sensor) for sensor in self.sensors)
+        self.ids = array("L", (sensor_id(sensor) for sensor in self.sensors))
+        self.types: Tuple[FeatureType, ...] = tuple(
+            sensor_type(sensor) for sensor in self.sensors
+        )
+        self.units: Tuple[str, ...] = tuple(
+            feature_type.unit for feature_type in self.types
+        )
+        self._by_type: Dict[FrozenSet[FeatureType], Tuple[int, ...]] = {}
+        limits = [sensor_limits(sensor) for sensor in self.sensors]
+        self.low = array("d", (limit.low for limit in limits))
+        self.high = array("d", (limit.high for limit in limits))
+        self.critical = array("d", (limit.critical for limit in limits))
+        self._records = None
+        self._multi_index = None
+        self._index: Dict[Union[str, Sensor], int] = {}
+        for i, (sensor, name) in enumerate(zip(self.sensors, self.names)):
+            self._index.setdefault(sensor, i)
+            self._index.setdefault(name, i)
+
+    @classmethod
+    def of(cls, sensors: Iterable[Sensor]) -> "SensorTable":
+        """Get the (shared) table for a sequence of sensors
+
+        Parameters
+        ----------
+        sensors : iterable of Sensor
+            The sensors, in order
+
+        Returns
+        -------
+        SensorTable
+            The table
+        """
+        key = tuple(sensors)
+        table = _tables.get(key)
+        if table is None:
+            table = _tables[key] = cls(key)
+        return table
+
+    def index(self, sensor: Union[str, Sensor]) -> int:
+        """Look up the position of a sensor in the table
+
+        Parameters
+        ----------
+        sensor : Sensor tuple or a string of the form "chip_prefix.feature_name"
+            The sensor to look up
+
+        Returns
+        -------
+        int
+            The sensor's position
+
+        Raises
+        ------
+        KeyError
+            If the sensor isn't in the table
+        """
+        return self._index[sensor]
+
+    def positions_of_type(self, *types: FeatureType) -> Tuple[int, ...]:
+        """Find the positions of all sensors of the given types
+
+        Parameters
+        ----------
+        *types : FeatureType
+            The types to look for
+
+        Returns
+        -------
+        tuple of int
+            The positions (computed once per combination of types and then cached)
+        """
+        key = frozenset(types)
+        positions = self._by_type.get(key)
+        if positions is None:
+            positions = self._by_type[key] = tuple(
+                i for i, feature_type in enumerate(self.types) if feature_type in key
+            )
+        return positions
+
+    def of_type(self, *types: FeatureType) -> "SensorTable":
+        """Get the (shared) table of just the sensors of the given types
+
+        Parameters
+        ----------
+        *types : FeatureType
+            The types to keep
+
+        Returns
+        -------
+        SensorTable
+            The sub-table
+        """
+        return SensorTable.of(self.sensors[i] for i in self.positions_of_type(*types))
+
+    def to_numpy(self):
+        """Describe the sensors as a NumPy structured array (requires NumPy)
+
+        Returns
+        -------
+        structured ndarray
+            One record per sensor, in table order, with fields "chip", "addr", "feature", "num", "name", "type",
+            "unit", "low", "high" and "critical" (NaN where a limit isn't set). The array is built once per table and
+            then shared, so it's marked read-only.
+        """
+        if self._records is None:
+            import numpy as np
+
+            columns = {
+                "chip": [sensor.chip for sensor in self.sensors],
+                "addr": [sensor.addr for sensor in self.sensors],
+                "feature": [sensor.feature for sensor in self.sensors],
+                "num": [sensor.num for sensor in self.sensors],
+                "name": self.names,
+                "type": [feature_type.value for feature_type in self.types],
+                "unit": self.units,
+            }
+            records = np.empty(
+                len(self),
+                dtype=[
+                    (field, "i8" if field in ("addr", "num") else _string_dtype(values))
+                    for field, values in columns.items()
+                ]
+                + [("low", "f8"), ("high", "f8"), ("critical", "f8")],
+            )
+            for field, values in columns.items():
+                records[field] = values
+            records["low"] = np.frombuffer(self.low)
+            records["high"] = np.frombuffer(self.high)
+            records["critical"] = np.frombuffer(self.critical)
+            records.flags.writeable = False
+            self._records = records
+        return self._records
+
+    def to_index(self):
+        """Get a pandas MultiIndex of the sensors (requires pandas)
+
+        Returns
+        -------
+        pandas.MultiIndex
+            With levels "chip", "addr", "feature" and "num", in table order (built once per table and then shared)
+        """
+        if self._multi_index is None:
+            import pandas as pd
+
+            records = self.to_numpy()
+            self._multi_index = pd.MultiIndex.from_arrays(
+                [records[level] for level in _INDEX_LEVELS], names=_INDEX_LEVELS
+            )
+        return self._multi_index
+
+    def __contains__(self, sensor: object) -> bool:
+        return sensor in self._index
+
+    def __getitem__(self, i: int) -> Sensor:
+        return self.sensors[i]
+
+    def __len__(self) -> int:
+        return len(self.sensors)
+
+    def __iter__(self) -> Iterator[Sensor]:
+        return iter(self.sensors)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self.names)!r})"
+
+
+_INDEX_LEVELS = ["chip", "addr", "feature", "num"]
+
+
+def _string_dtype(values: Iterable[str]) -> str:
+    """A fixed-width unicode dtype wide enough for all of the values"""
+    return f"U{max((len(value) for value in values), default=1) or 1}"
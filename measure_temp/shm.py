@@ -0,0 +1,236 @@
+"""Publish the latest readings to shared memory so that other processes can read them without any system calls
+
+The segment is laid out as a header of five 8-byte fields--a sequence counter, the number of sensors, a checksum of
+the sensor table, the size of the encoded sensor table and the time of the sample--followed by one double per sensor,
+in table order (NaN meaning unreadable), and then the sensor table itself as JSON, so that readers can attach without
+knowing which sensors the writer was given. The sequence counter works as a seqlock: it's odd while the writer is
+partway through an update, so a reader retries until it sees the same even value before and after copying the values.
+
+Python has no way to issue memory barriers, so the seqlock relies on the hardware not reordering the writer's stores
+(or the reader's loads) across the sequence counter. That holds on x86, whose memory model keeps stores in order, but
+not on weakly-ordered CPUs like ARM, where a reader can (rarely) get a torn sample: some values from one sample and
+some from the next, each of them a valid reading.
+
+Requires Python 3.8+.
+"""
+import json
+import math
+import struct
+import zlib
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+from .read_sensors import Sensor
+from .readings import Readings
+from .sensor_table import SensorTable
+
+DEFAULT_NAME = "measure_temp"
+
+_HEADER = struct.Struct("=QQQQd")
+_SEQ = struct.Struct("=Q")
+
+
+def table_checksum(sensors: Sequence[Sensor]) -> int:
+    """Fingerprint a sensor table so that readers can check they agree with the writer on what's where"""
+    return zlib.crc32("\n".join(repr(tuple(sensor)) for sensor in sensors).encode())
+
+
+def _encode_table(sensors: Sequence[Sensor]) -> bytes:
+    return json.dumps([list(sensor) for sensor in sensors]).encode()
+
+
+def _decode_table(encoded: bytes) -> List[Sensor]:
+    return [Sensor(*fields) for fields in json.loads(encoded)]
+
+
+def _buffer_of(memory: shared_memory.SharedMemory) -> memoryview:
+    buffer = memory.buf
+    assert buffer is not None  # only None once closed
+    return buffer
+
+
+class SharedReadingsWriter:
+    """Owner of a shared-memory segment holding the latest reading of each sensor
+
+    Parameters
+    ----------
+    sensors : list of Sensor
+        The sensor table
+    name : str, optional
+        The name of the segment. Default is DEFAULT_NAME.
+
+    Examples
+    --------
+    >>> with SharedReadingsWriter(sampler.sensors) as writer:
+    ...     sampler.subscribe(writer.publish)
+    """
+
+    def __init__(self, sensors: Sequence[Sensor], name: str = DEFAULT_NAME):
+        self.table = SensorTable.of(sensors)
+        self.sensors = list(self.table)
+        self._values = struct.Struct(f"={len(self.sensors)}d")
+        encoded_table = _encode_table(self.sensors)
+        self._memory = shared_memory.SharedMemory(
+            name,
+            create=True,
+            size=_HEADER.size + self._values.size + len(encoded_table),
+        )
+        self._buffer = _buffer_of(self._memory)
+        self._seq = 0
+        _HEADER.pack_into(
+            self._buffer,
+            0,
+            0,
+            len(self.sensors),
+            table_checksum(self.sensors),
+            len(encoded_table),
+            0.0,
+        )
+        self._values.pack_into(
+            self._buffer, _HEADER.size, *(math.nan for _ in self.sensors)
+        )
+        table_start = _HEADER.size + self._values.size
+        self._buffer[table_start : table_start + len(encoded_table)] = encoded_table
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def publish(
+        self, timestamp: float, readings: Mapping[Sensor, Optional[float]]
+    ) -> None:
+        """Write a sample to the segment (meant to be subscribed to a `Sampler`)
+
+        Parameters
+        ----------
+        timestamp : float
+            The (Unix) time of the sample
+        readings : dict of Sensor to float
+            The readings. Sensors that aren't in the table are ignored, and sensors that are missing from the readings
+            (or have a value of None) are published as NaN.
+        """
+        if isinstance(readings, Readings) and readings.table is self.table:
+            values = readings.data
+        else:
+            values = array("d", (math.nan,) * len(self.sensors))
+            for sensor, value in readings.items():
+                if value is not None and sensor in self.table:
+                    values[self.table.index(sensor)] = value
+        buffer = self._buffer
+        self._seq += 1
+        _SEQ.pack_into(buffer, 0, self._seq)
+        struct.pack_into("=d", buffer, _HEADER.size - 8, timestamp)
+        self._values.pack_into(buffer, _HEADER.size, *values)
+        self._seq += 1
+        _SEQ.pack_into(buffer, 0, self._seq)
+
+    def close(self) -> None:
+        """Destroy the segment"""
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self) -> "SharedReadingsWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class SharedReadingsReader:
+    """Reader of a shared-memory segment created by a `SharedReadingsWriter`
+
+    Parameters
+    ----------
+    sensors : list of Sensor, optional
+        The sensor table the reader expects the writer to be using. Default is whatever table the writer published.
+    name : str, optional
+        The name of the segment. Default is DEFAULT_NAME.
+    max_retries : int, optional
+        How many times to retry a read that overlapped with a write before giving up. Default is 10000.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the segment doesn't exist
+    ValueError
+        If the writer is using a different sensor table
+    """
+
+    def __init__(
+        self,
+        sensors: Optional[Sequence[Sensor]] = None,
+        name: str = DEFAULT_NAME,
+        max_retries: int = 10000,
+    ):
+        self.max_retries = max_retries
+        self._memory = shared_memory.SharedMemory(name)
+        # attaching registers the segment with this process's resource tracker, which would then unlink it out from
+        # under the writer when this process exits
+        resource_tracker.unregister(self._memory._name, "shared_memory")  # type: ignore[attr-defined]
+        self._buffer = _buffer_of(self._memory)
+        _, num_sensors, checksum, table_size, _ = _HEADER.unpack_from(self._buffer, 0)
+        self._values = struct.Struct(f"={num_sensors}d")
+        if sensors is None:
+            table_start = _HEADER.size + self._values.size
+            sensors = _decode_table(
+                bytes(self._buffer[table_start : table_start + table_size])
+            )
+        if num_sensors != len(sensors) or checksum != table_checksum(sensors):
+            self._memory.close()
+            raise ValueError(
+                f"Shared memory segment {name} uses a different sensor table"
+            )
+        self.table = SensorTable.of(sensors)
+        self.sensors = list(self.table)
+
+    def read(self) -> Tuple[float, Tuple[float, ...]]:
+        """Get a consistent copy of the latest sample
+
+        Returns
+        -------
+        tuple of (float, tuple of float)
+            The time of the sample (0 if nothing has been published yet) and the values, in table order, with NaN
+            for unreadable sensors
+
+        Raises
+        ------
+        TimeoutError
+            If a consistent copy couldn't be made within max_retries attempts (e.g. the writer died partway through
+            a write)
+
+        Notes
+        -----
+        On weakly-ordered CPUs (e.g. ARM) a sample can occasionally be torn between two writes (see the module
+        docstring).
+        """
+        buffer = self._buffer
+        for _ in range(self.max_retries):
+            seq, _, _, _, timestamp = _HEADER.unpack_from(buffer, 0)
+            if seq & 1:
+                continue
+            values = self._values.unpack_from(buffer, _HEADER.size)
+            if _SEQ.unpack_from(buffer, 0)[0] == seq:
+                return timestamp, values
+        raise TimeoutError("Could not get a consistent read of the shared readings")
+
+    def snapshot(self) -> Tuple[float, Readings]:
+        """Get a consistent copy of the latest sample, keyed by sensor
+
+        Returns
+        -------
+        tuple of (float, Readings)
+            The time of the sample and the readings (unreadable sensors will have a value of None)
+        """
+        timestamp, values = self.read()
+        return timestamp, Readings(self.table, array("d", values))
+
+    def close(self) -> None:
+        """Detach from the segment"""
+        self._memory.close()
+
+    def __enter__(self) -> "SharedReadingsReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,141 @@
+"""Places to send report lines to
+
+Each sink does its setup (importing IPython, opening a file, connecting a socket) once, when it's created, so that
+it can be reused for every report a long-running kernel or daemon makes.
+"""
+import abc
+import functools
+import socket
+import sys
+from typing import Optional, TextIO
+
+from .detect_notebook import in_ipython_frontend
+
+
+class OutputSink(abc.ABC):
+    """Somewhere to send lines of text"""
+
+    @abc.abstractmethod
+    def write(self, line: str) -> None:
+        """Send a single line (without the trailing newline)"""
+
+    def close(self) -> None:
+        """Release anything the sink is holding on to"""
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class StdoutSink(OutputSink):
+    """Print each line to stdout"""
+
+    def write(self, line: str) -> None:
+        # sys.stdout is looked up on every write so that redirection keeps working
+        sys.stdout.write(line + "\n")
+
+
+class NotebookSink(OutputSink):
+    """Display each line as Markdown in a Jupyter notebook (requires IPython)"""
+
+    def __init__(self):
+        from IPython.display import Markdown, display
+
+        self._markdown = Markdown
+        self._display = display
+
+    def write(self, line: str) -> None:
+        self._display(self._markdown(line))
+
+
+class FileSink(OutputSink):
+    """Append each line to a file
+
+    Parameters
+    ----------
+    path : str
+        The file to write to (created if it doesn't exist)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: TextIO = open(path, "a", buffering=1)
+
+    def write(self, line: str) -> None:
+        self._file.write(line + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SocketSink(OutputSink):
+    """Send each line over a stream socket
+
+    Parameters
+    ----------
+    address : str or tuple of (str, int)
+        The path of a Unix domain socket, or the host and port of a TCP socket
+    """
+
+    def __init__(self, address):
+        if isinstance(address, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            self._socket.connect(address)
+        except OSError:
+            self._socket.close()
+            raise
+
+    def write(self, line: str) -> None:
+        self._socket.sendall((line + "\n").encode())
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+@functools.lru_cache(maxsize=None)
+def default_sink() -> OutputSink:
+    """Get the sink for the current frontend (chosen once per process)
+
+    Returns
+    -------
+    OutputSink
+        A NotebookSink inside a Jupyter notebook (see `in_ipython_frontend`), otherwise a StdoutSink
+    """
+    return NotebookSink() if in_ipython_frontend() else StdoutSink()
+
+
+def open_sink(target: Optional[str] = None) -> OutputSink:
+    """Create a sink from a short description
+
+    Parameters
+    ----------
+    target : str, optional
+        One of:
+        - "stdout" or "notebook"
+        - "unix:PATH" for a Unix domain socket
+        - "tcp:HOST:PORT" for a TCP socket
+        - anything else is taken to be the path of a file to append to
+        Default is the sink for the current frontend (see `default_sink`).
+
+    Returns
+    -------
+    OutputSink
+        The sink
+    """
+    if target is None:
+        return default_sink()
+    if target == "stdout":
+        return StdoutSink()
+    if target == "notebook":
+        return NotebookSink()
+    if target.startswith("unix:"):
+        return SocketSink(target[len("unix:") :])
+    if target.startswith("tcp:"):
+        host, _, port = target[len("tcp:") :].rpartition(":")
+        return SocketSink((host, int(port)))
+    return FileSink(target)
@@ -0,0 +1,201 @@
+"""Generated sensors, for seeing how things hold up with a lot of hardware without having the hardware
+
+A `SyntheticBackend` (see the `backends` module) serves any number of made-up chips, each with a mix of
+temperature, fan and voltage features whose readings follow a waveform over time. Reads can be made slow, and can
+be made to fail at random, to see how samplers, daemons and exporters cope.
+
+Examples
+--------
+>>> set_backend(SyntheticBackend(chips=100, features=5, latency=0.0005, error_rate=0.01))
+>>> len(find_sensors())
+500
+
+or, from the command line
+
+$ MEASURE_TEMP_BACKEND=synthetic:chips=100,features=5 measure_temp read
+"""
+import math
+import random
+import time
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+import sensors
+
+# the chip labels handed out, in turn (so that bigger configurations get several chips sharing a label)
+CHIP_LABELS = ("coretemp", "nct6775", "nvme", "amdgpu", "k10temp", "acpitz", "it8792")
+
+WAVEFORMS = ("sine", "square", "sawtooth", "noise", "constant")
+
+
+class _Kind(NamedTuple):
+    prefix: str
+    center: float
+    amplitude: float
+    limits: Tuple[Tuple[str, float], ...]
+
+
+# what each kind of feature reads (center +/- amplitude) and the limit subfeatures it comes with
+_KINDS = (
+    _Kind("temp", 50.0, 15.0, (("max", 80.0), ("crit", 100.0))),
+    _Kind("fan", 1200.0, 400.0, (("min", 300.0),)),
+    _Kind("in", 1.2, 0.05, (("min", 1.0), ("max", 1.4))),
+)
+
+
+class SyntheticSubfeature(NamedTuple):
+    """A fixed value hanging off a feature (e.g. "temp1_max")"""
+
+    name: str
+    value: float
+
+    def get_value(self) -> float:
+        return self.value
+
+
+class SyntheticFeature:
+    """A generated sensor
+
+    Attributes
+    ----------
+    name : str
+        The feature name (e.g. "temp1")
+    subfeatures : tuple of SyntheticSubfeature
+        The feature's limits
+    """
+
+    __slots__ = ("name", "subfeatures", "_center", "_amplitude", "_phase", "_backend")
+
+    def __init__(
+        self,
+        name: str,
+        kind: _Kind,
+        phase: float,
+        backend: "SyntheticBackend",
+    ):
+        self.name = name
+        self.subfeatures = tuple(
+            SyntheticSubfeature(f"{name}_{suffix}", value)
+            for suffix, value in kind.limits
+        )
+        self._center = kind.center
+        self._amplitude = kind.amplitude
+        self._phase = phase
+        self._backend = backend
+
+    def get_value(self) -> float:
+        """Generate the current reading
+
+        Raises
+        ------
+        SensorsError
+            At random, at the backend's error rate
+        """
+        backend = self._backend
+        if backend.latency:
+            time.sleep(backend.latency)
+        if backend.error_rate and backend.random.random() < backend.error_rate:
+            raise sensors.SensorsError(f"{self.name}: injected failure")
+        return self._center + self._amplitude * backend.wave(
+            backend.clock() / backend.period + self._phase
+        )
+
+
+class SyntheticChip:
+    """A generated chip"""
+
+    def __init__(self, label: str, addr: int, features: List[SyntheticFeature]):
+        self.prefix = label.encode()
+        self.addr = addr
+        self.features = features
+
+    def __iter__(self) -> Iterator[SyntheticFeature]:
+        return iter(self.features)
+
+
+def _wave(waveform: str, rng: random.Random) -> Callable[[float], float]:
+    """Get the function mapping a phase (in cycles) to a value between -1 and 1"""
+    if waveform == "sine":
+        return lambda phase: math.sin(2 * math.pi * phase)
+    if waveform == "square":
+        return lambda phase: 1.0 if phase % 1 < 0.5 else -1.0
+    if waveform == "sawtooth":
+        return lambda phase: 2 * (phase % 1) - 1
+    if waveform == "noise":
+        return lambda phase: rng.uniform(-1, 1)
+    if waveform == "constant":
+        return lambda phase: 0.0
+    raise ValueError(f"Unknown waveform: {waveform} (expected one of {WAVEFORMS})")
+
+
+class SyntheticBackend:
+    """Serve generated chips
+
+    Parameters
+    ----------
+    chips : int, optional
+        The number of chips. Default is 4.
+    features : int, optional
+        The number of features on each chip, cycling through temperatures, fans and voltages. Default is 4.
+    waveform : str, optional
+        The shape the readings follow over time: "sine", "square", "sawtooth", "noise" (uniformly random) or
+        "constant". Default is "sine".
+    period : float, optional
+        The number of seconds per cycle of the waveform. Default is 60. Each feature is given its own phase.
+    latency : float, optional
+        The number of seconds each read takes. Default is 0.
+    error_rate : float, optional
+        The fraction of reads that fail (with a SensorsError). Default is 0.
+    seed : int, optional
+        The seed for the phases, noise and failures, so that runs can be repeated. Default is 0.
+    clock : callable, optional
+        The clock the waveforms are driven by. Default is `time.time`.
+    """
+
+    virtual = True
+
+    def __init__(
+        self,
+        chips: int = 4,
+        features: int = 4,
+        waveform: str = "sine",
+        period: float = 60.0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.period = period
+        self.latency = latency
+        self.error_rate = error_rate
+        self.clock = clock
+        self.random = random.Random(seed)
+        self.wave = _wave(waveform, self.random)
+        self.chips: List[SyntheticChip] = []
+        for i in range(chips):
+            label = CHIP_LABELS[i % len(CHIP_LABELS)]
+            # chips sharing a label sit at different addresses, like on a real bus
+            addr = 0x290 + i
+            chip_features: List[SyntheticFeature] = []
+            counts = [0] * len(_KINDS)
+            for j in range(features):
+                kind_index = j % len(_KINDS)
+                kind = _KINDS[kind_index]
+                counts[kind_index] += 1
+                chip_features.append(
+                    SyntheticFeature(
+                        f"{kind.prefix}{counts[kind_index]}",
+                        kind,
+                        self.random.random(),
+                        self,
+                    )
+                )
+            self.chips.append(SyntheticChip(label, addr, chip_features))
+
+    def init(self) -> None:
+        pass
+
+    def cleanup(self) -> None:
+        pass
+
+    def iter_detected_chips(self) -> Iterator[SyntheticChip]:
+        return iter(self.chips)
@@ -0,0 +1,127 @@
+"""Shared fixtures for testing against fake hardware"""
+import os
+from typing import Iterable, NamedTuple, Optional, Sequence, Tuple
+
+import pytest
+import sensors
+
+from measure_temp import (
+    backends,
+    chip_map,
+    cpufreq,
+    daemon,
+    health,
+    read_sensors,
+    thermal_zones,
+)
+
+
+class MockFeature(NamedTuple):
+
+    name: str
+    value: float
+    readable: Optional[bool] = True
+    subfeatures: Sequence["MockFeature"] = ()
+
+    def get_value(self):
+        if not self.readable:
+            raise sensors.SensorsError("permission denied")
+        return self.value
+
+
+class MockChip:
+    def __init__(self, prefix: str, addr: int, features: Iterable[Tuple]):
+        self.prefix = prefix.encode()
+        self.addr = addr
+        self.features = features
+
+    def __iter__(self):
+        for feature in self.features:
+            yield feature
+
+
+def pytest_configure(config):
+    # some tests enumerate the real sensors while they're being collected, before any fixture gets to run
+    os.environ[chip_map.CHIP_MAP_ENV_VAR] = ""
+
+
+@pytest.fixture(autouse=True)
+def forget_chip_numbers(monkeypatch):
+    """Don't let the number suffixes handed out in one test leak into the next (or into the real chip map)"""
+    monkeypatch.setattr(read_sensors, "_chip_nums", {})
+    monkeypatch.setattr(read_sensors, "_loaded_chip_map", None)
+    monkeypatch.setattr(read_sensors, "_persist_chip_map", False)
+    monkeypatch.setenv(chip_map.CHIP_MAP_ENV_VAR, "")
+
+
+@pytest.fixture(autouse=True)
+def fresh_health_tracker(monkeypatch):
+    """Don't let sensors that failed in one test get skipped in the next"""
+    monkeypatch.setattr(health, "DEFAULT_TRACKER", health.HealthTracker())
+
+
+@pytest.fixture(autouse=True)
+def default_backend(monkeypatch):
+    """Read from libsensors (or whatever it's mocked out with), whatever the environment says"""
+    monkeypatch.delenv(backends.BACKEND_ENV_VAR, raising=False)
+    monkeypatch.setattr(backends, "_active", None)
+
+
+@pytest.fixture
+def mock_chips():
+    yield [
+        MockChip(
+            "coretemp",
+            0,
+            [
+                MockFeature(
+                    "temp1",
+                    62.3,
+                    subfeatures=(
+                        MockFeature("temp1_input", 62.3),
+                        MockFeature("temp1_max", 80.0),
+                        MockFeature("temp1_crit", 100.0),
+                        MockFeature("temp1_crit_alarm", 0.0),
+                    ),
+                ),
+                MockFeature("temp2", 58.0),
+            ],
+        ),
+        MockChip(
+            "nct6775",
+            656,
+            [
+                MockFeature(
+                    "fan1", 1200, subfeatures=(MockFeature("fan1_min", 300.0),)
+                ),
+                MockFeature("in0", 1.1),
+            ],
+        ),
+        MockChip("nvme", 256, [MockFeature("temp1", 41.9, readable=False)]),
+    ]
+
+
+@pytest.fixture
+def mock_sensors(monkeypatch, tmp_path, mock_chips):
+    """Replace libsensors with the mock chips (and hide any real thermal zones, CPUs and daemons)"""
+    monkeypatch.setattr(sensors, "init", lambda: None)
+    monkeypatch.setattr(sensors, "cleanup", lambda: None)
+    monkeypatch.setattr(sensors, "iter_detected_chips", lambda: iter(mock_chips))
+    monkeypatch.setattr(thermal_zones, "THERMAL_ROOT", str(tmp_path / "thermal"))
+    monkeypatch.setattr(thermal_zones, "HWMON_ROOT", str(tmp_path / "hwmon"))
+    monkeypatch.setattr(cpufreq, "CPU_ROOT", str(tmp_path / "cpu"))
+    monkeypatch.setenv(daemon.SOCKET_PATH_ENV_VAR, str(tmp_path / "no-daemon.sock"))
+    yield mock_chips
+
+
+@pytest.fixture
+def synthetic_sensors(monkeypatch):
+    """Read from generated chips instead of libsensors (call with SyntheticBackend settings to configure them)"""
+    from measure_temp.synthetic import SyntheticBackend
+
+    def use(**settings):
+        backend = SyntheticBackend(**settings)
+        monkeypatch.setattr(backends, "_active", backend)
+        return backend
+
+    yield use
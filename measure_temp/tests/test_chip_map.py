@@ -0,0 +1,216 @@
+"""Tests for keeping chip number suffixes stable across runs"""
+import json
+import time
+from typing import NamedTuple
+
+import pytest
+from click.testing import CliRunner
+
+from measure_temp import chip_map, cli, read_sensors, thermal_zones
+from measure_temp.tests.conftest import MockChip, MockFeature
+
+
+@pytest.fixture
+def map_path(tmp_path, monkeypatch):
+    path = tmp_path / "cache" / "chips.json"
+    monkeypatch.setenv(chip_map.CHIP_MAP_ENV_VAR, str(path))
+    read_sensors.persist_chip_map()
+    return path
+
+
+@pytest.fixture
+def twin_chips(mock_sensors):
+    mock_sensors[:] = [
+        MockChip("fluxcapacitor", 9309, [MockFeature("year", 1955)]),
+        MockChip("fluxcapacitor", 1809, [MockFeature("year", 2035)]),
+    ]
+    return mock_sensors
+
+
+class Bus(NamedTuple):
+    type: int
+    nr: int
+
+
+def new_run(monkeypatch):
+    monkeypatch.setattr(read_sensors, "_chip_nums", {})
+    monkeypatch.setattr(read_sensors, "_loaded_chip_map", None)
+    thermal_zones.close_thermal_zones()
+
+
+def add_zone(root, index, zone_type, temp, device):
+    zone = root / f"thermal_zone{index}"
+    zone.mkdir(parents=True)
+    (zone / "type").write_text(zone_type + "\n")
+    (zone / "temp").write_text(temp + "\n")
+    (zone / "device").symlink_to(device)
+    return zone
+
+
+class TestChipMapFile:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "nested" / "chips.json")
+        chip_nums = {
+            ("nvme", "sensors:6:1:0"): 0,
+            ("nvme", "sensors:6:2:0"): 1,
+            ("acpitz", "thermal:/sys/devices/LNXTHERM:00"): 0,
+        }
+        assert chip_map.save_chip_map(path, chip_nums)
+        assert chip_map.load_chip_map(path) == chip_nums
+        with open(path) as map_file:
+            nvme = json.load(map_file)["nvme"]
+        assert {device: entry["num"] for device, entry in nvme.items()} == {
+            "sensors:6:1:0": 0,
+            "sensors:6:2:0": 1,
+        }
+
+    def test_maps_without_times_are_read(self, tmp_path):
+        path = tmp_path / "chips.json"
+        path.write_text(json.dumps({"nvme": {"sensors:6:1:0": 1}}))
+        assert chip_map.load_chip_map(str(path)) == {("nvme", "sensors:6:1:0"): 1}
+
+    def test_devices_long_gone_are_forgotten(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "chips.json")
+        chip_nums = {("usbtemp", "sensors:3:1:0"): 0, ("usbtemp", "sensors:3:2:0"): 1}
+        assert chip_map.save_chip_map(path, chip_nums)
+
+        later = time.time() + chip_map.MAX_AGE / 2
+        monkeypatch.setattr(time, "time", lambda: later)
+        chip_nums[("usbtemp", "sensors:3:3:0")] = 2
+        assert chip_map.save_chip_map(
+            path, chip_nums, seen=[("usbtemp", "sensors:3:3:0")]
+        )
+        assert chip_map.load_chip_map(path) == chip_nums
+
+        # the first two haven't been seen since the first save
+        later += chip_map.MAX_AGE * 0.6
+        chip_nums[("usbtemp", "sensors:3:4:0")] = 3
+        assert chip_map.save_chip_map(
+            path, chip_nums, seen=[("usbtemp", "sensors:3:4:0")]
+        )
+        assert chip_map.load_chip_map(path) == {
+            ("usbtemp", "sensors:3:3:0"): 2,
+            ("usbtemp", "sensors:3:4:0"): 3,
+        }
+
+    def test_maps_keyed_by_address_are_ignored(self, tmp_path):
+        path = tmp_path / "chips.json"
+        path.write_text(json.dumps({"nvme": {"256": 1, "sensors:6:1:0": 0}}))
+        assert chip_map.load_chip_map(str(path)) == {("nvme", "sensors:6:1:0"): 0}
+
+    @pytest.mark.parametrize("contents", (None, "not json", "[1, 2]"))
+    def test_missing_or_corrupt_map_is_empty(self, tmp_path, contents):
+        path = tmp_path / "chips.json"
+        if contents is not None:
+            path.write_text(contents)
+        assert chip_map.load_chip_map(str(path)) == {}
+
+    def test_empty_env_var_disables(self, monkeypatch):
+        monkeypatch.setenv(chip_map.CHIP_MAP_ENV_VAR, "")
+        assert chip_map.default_chip_map_path() is None
+
+    def test_default_path_is_in_the_cache(self, monkeypatch, tmp_path):
+        monkeypatch.delenv(chip_map.CHIP_MAP_ENV_VAR)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert chip_map.default_chip_map_path() == str(
+            tmp_path / "measure_temp" / "chips.json"
+        )
+
+
+class TestStableNumbering:
+    def test_numbered_by_address(self, twin_chips):
+        assert {
+            str(sensor): sensor.addr for sensor in read_sensors.enumerate_all_sensors()
+        } == {"fluxcapacitor.year": 1809, "fluxcapacitor1.year": 9309}
+
+    def test_enumeration_order_is_detection_order(self, twin_chips):
+        assert [sensor.addr for sensor in read_sensors.enumerate_all_sensors()] == [
+            9309,
+            1809,
+        ]
+
+    def test_persisted_across_runs(self, twin_chips, map_path, monkeypatch):
+        read_sensors.enumerate_all_sensors()
+        assert chip_map.load_chip_map(str(map_path)) == {
+            ("fluxcapacitor", "sensors:0:0:1809"): 0,
+            ("fluxcapacitor", "sensors:0:0:9309"): 1,
+        }
+
+        # next boot, the lower-addressed chip is gone and a new one has turned up
+        new_run(monkeypatch)
+        twin_chips[1] = MockChip("fluxcapacitor", 42, [MockFeature("year", 1885)])
+        assert read_sensors.read_sensor("fluxcapacitor1.year") == 1955
+        assert read_sensors.read_sensor("fluxcapacitor2.year") == 1885
+
+    def test_nothing_written_when_nothing_changed(self, twin_chips, map_path):
+        read_sensors.enumerate_all_sensors()
+        map_path.unlink()
+        read_sensors.enumerate_all_sensors()
+        assert not map_path.exists()
+
+    def test_only_written_when_asked(self, twin_chips, map_path):
+        read_sensors.persist_chip_map(False)
+        read_sensors.enumerate_all_sensors()
+        assert not map_path.exists()
+
+    def test_written_by_the_cli(self, twin_chips, map_path):
+        read_sensors.persist_chip_map(False)
+        result = CliRunner().invoke(cli.main, ["read", "fluxcapacitor1.year"])
+        assert result.exit_code == 0, result.output
+        assert chip_map.load_chip_map(str(map_path)) == {
+            ("fluxcapacitor", "sensors:0:0:1809"): 0,
+            ("fluxcapacitor", "sensors:0:0:9309"): 1,
+        }
+
+    def test_unwritable_map_is_ignored(self, twin_chips, tmp_path, monkeypatch):
+        (tmp_path / "file").write_text("")
+        monkeypatch.setenv(
+            chip_map.CHIP_MAP_ENV_VAR, str(tmp_path / "file" / "chips.json")
+        )
+        assert len(read_sensors.enumerate_all_sensors()) == 2
+
+    def test_chips_sharing_a_label_and_address(self, mock_sensors):
+        first = MockChip("nvme", 0, [MockFeature("temp1", 30.0)])
+        second = MockChip("nvme", 0, [MockFeature("temp1", 40.0)])
+        first.bus, second.bus = Bus(6, 1), Bus(6, 0)
+        mock_sensors[:] = [first, second]
+        for _ in range(2):
+            assert list(
+                read_sensors.read_many(["nvme.temp1", "nvme1.temp1"]).values()
+            ) == [40.0, 30.0]
+
+    def test_zones_and_chips_sharing_a_label_and_address(
+        self, mock_sensors, map_path, tmp_path, monkeypatch
+    ):
+        # ACPI thermal zones show up both through libsensors and as thermal zones
+        mock_sensors[:] = [MockChip("acpitz", 0, [MockFeature("temp1", 27.8)])]
+        lnxtherm = tmp_path / "devices" / "LNXTHERM:00"
+        lnxtherm.mkdir(parents=True)
+        add_zone(tmp_path / "thermal", 0, "acpitz", "27800", lnxtherm)
+        names = [str(sensor) for sensor in read_sensors.enumerate_all_sensors()]
+        assert names == ["acpitz.temp1", "acpitz1.temp"]
+
+        # next boot, the zone is probed later and gets a different number
+        new_run(monkeypatch)
+        (tmp_path / "thermal" / "thermal_zone0").rename(
+            tmp_path / "thermal" / "thermal_zone3"
+        )
+        assert [str(sensor) for sensor in read_sensors.enumerate_all_sensors()] == names
+        assert read_sensors.read_sensor("acpitz1.temp") == pytest.approx(27.8)
+        assert read_sensors.read_sensor("acpitz.temp1") == 27.8
+
+    def test_suffixes_are_not_taken_from_other_devices(
+        self, twin_chips, map_path, monkeypatch
+    ):
+        read_sensors.enumerate_all_sensors()
+        saved = chip_map.load_chip_map(str(map_path))
+
+        # a chip claiming to be the same device as one that's already there doesn't take anyone's suffix
+        new_run(monkeypatch)
+        twin_chips.append(MockChip("fluxcapacitor", 1809, [MockFeature("year", 1885)]))
+        assert [str(sensor) for sensor in read_sensors.enumerate_all_sensors()] == [
+            "fluxcapacitor1.year",
+            "fluxcapacitor.year",
+            "fluxcapacitor2.year",
+        ]
+        assert chip_map.load_chip_map(str(map_path)) == saved
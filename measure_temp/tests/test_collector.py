@@ -0,0 +1,162 @@
+"""Tests for the agent and collector, using local agents over pipes"""
+import asyncio
+import io
+import json
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from measure_temp import agent, cli, collector
+
+
+def fake_agent(label: str, count: int):
+    script = (
+        "import json\n"
+        f"for i in range({count}):\n"
+        f"    print(json.dumps({{'time': i, 'readings': {{'{label}.temp1': i}}}}), flush=True)\n"
+        "print('not json', flush=True)\n"
+    )
+    return [sys.executable, "-c", script]
+
+
+async def gather_records(commands, **kwargs):
+    async with collector.Collector(commands, **kwargs) as fan_in:
+        return [record async for record in fan_in.records()]
+
+
+class TestAgent:
+    def test_records_are_json_lines(self, mock_sensors):
+        stream = io.StringIO()
+        agent.run_agent(
+            ["coretemp.temp1", "nvme.temp1"], interval=0, count=2, stream=stream
+        )
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [record["readings"] for record in records] == [
+            {"coretemp.temp1": 62.3, "nvme.temp1": None}
+        ] * 2
+
+    def test_cli_agent(self, mock_sensors):
+        result = CliRunner().invoke(
+            cli.main, ["agent", "--stdio", "-s", "nct6775.*", "-i", "0", "-n", "1"]
+        )
+        assert json.loads(result.output)["readings"] == {
+            "nct6775.fan1": 1200,
+            "nct6775.in0": 1.1,
+        }
+
+    def test_cli_agent_requires_transport(self, mock_sensors):
+        assert CliRunner().invoke(cli.main, ["agent", "-n", "1"]).exit_code != 0
+
+
+class TestCollector:
+    def test_records_from_all_hosts_are_aggregated(self):
+        records = asyncio.run(
+            gather_records(
+                {"alpha": fake_agent("a", 3), "beta": fake_agent("b", 2)},
+                reconnect_delay=None,
+            )
+        )
+        assert sorted((record["host"], record["time"]) for record in records) == [
+            ("alpha", 0),
+            ("alpha", 1),
+            ("alpha", 2),
+            ("beta", 0),
+            ("beta", 1),
+        ]
+
+    def test_records_from_each_host_stay_in_order(self):
+        records = asyncio.run(
+            gather_records({"alpha": fake_agent("a", 5)}, reconnect_delay=None)
+        )
+        assert [record["readings"]["a.temp1"] for record in records] == list(range(5))
+
+    def test_agents_are_relaunched(self):
+        async def take(count):
+            async with collector.Collector(
+                {"alpha": fake_agent("a", 1)}, reconnect_delay=0
+            ) as fan_in:
+                records = []
+                async for record in fan_in.records():
+                    records.append(record)
+                    if len(records) == count:
+                        return records
+
+        assert len(asyncio.run(take(3))) == 3
+
+    def test_commands_launch_stdio_agents(self):
+        arguments = collector.agent_arguments(["coretemp.*"], interval=0.5)
+        assert collector.local_command(arguments)[-6:] == [
+            "agent",
+            "--stdio",
+            "--interval",
+            "0.5",
+            "--sensors",
+            "coretemp.*",
+        ]
+
+    def test_remote_arguments_are_shell_quoted(self):
+        arguments = collector.agent_arguments(["it's.*"], interval=0.5)
+        command = collector.ssh_command("pi", arguments, executable="my agent")
+        assert command[-8:] == [
+            "pi",
+            "'my agent'",
+            "agent",
+            "--stdio",
+            "--interval",
+            "0.5",
+            "--sensors",
+            "'it'\"'\"'s.*'",
+        ]
+
+    def test_failed_launches_are_logged(self, caplog):
+        records = asyncio.run(
+            gather_records(
+                {"ghost": ["/nonexistent/agent"], "beta": fake_agent("b", 1)},
+                reconnect_delay=None,
+            )
+        )
+        assert [record["host"] for record in records] == ["beta"]
+        assert "Could not launch the agent for ghost" in caplog.text
+
+    def test_failed_launches_are_retried(self, tmp_path, caplog):
+        # the agent only shows up after the first attempt
+        command = tmp_path / "agent"
+
+        async def take():
+            async with collector.Collector(
+                {"late": [str(command)]}, reconnect_delay=0.01
+            ) as fan_in:
+                first = asyncio.ensure_future(fan_in.records().__anext__())
+                await asyncio.sleep(0.05)
+                command.write_text('#!/bin/sh\necho \'{"time": 1, "readings": {}}\'\n')
+                command.chmod(0o755)
+                return await first
+
+        assert asyncio.run(take())["host"] == "late"
+        assert "Could not launch the agent for late" in caplog.text
+
+    def test_failed_agents_are_logged(self, caplog):
+        command = [sys.executable, "-c", "import sys; sys.exit('out of cheese')"]
+        records = asyncio.run(gather_records({"pi": command}, reconnect_delay=None))
+        assert records == []
+        assert "The agent for pi exited with status 1" in caplog.text
+        assert "out of cheese" in caplog.text
+
+    def test_failing_agents_are_given_up_on(self, caplog, monkeypatch):
+        delays = []
+        sleep = asyncio.sleep
+
+        async def record_delay(delay):
+            delays.append(delay)
+            await sleep(0)
+
+        monkeypatch.setattr(asyncio, "sleep", record_delay)
+        command = [sys.executable, "-c", "import sys; sys.exit(2)"]
+        records = asyncio.run(
+            gather_records({"pi": command}, reconnect_delay=1, max_failures=4)
+        )
+        assert records == []
+        assert delays == [1, 2, 4]
+        assert caplog.text.count("exited with status 2") == 4
+        assert "Giving up on pi after 4 failed attempts in a row" in caplog.text
@@ -0,0 +1,91 @@
+"""Tests for the CPU frequency and throttling pseudo-sensors, run against a fake sysfs directory"""
+import pytest
+import sensors
+
+from measure_temp import cpufreq, read_sensors
+
+
+@pytest.fixture
+def fake_cpus(mock_sensors, tmp_path):
+    root = tmp_path / "cpu"
+    for cpu, frequency in ((0, "2400000"), (1, "800000"), (10, "garbage")):
+        (root / f"cpu{cpu}" / "cpufreq").mkdir(parents=True)
+        (root / f"cpu{cpu}" / "cpufreq" / "scaling_cur_freq").write_text(
+            frequency + "\n"
+        )
+    (root / "cpu0" / "thermal_throttle").mkdir()
+    (root / "cpu0" / "thermal_throttle" / "core_throttle_count").write_text("7\n")
+    (root / "cpufreq").mkdir()
+    (root / "cpuidle").mkdir()
+    yield root
+    cpufreq.close_cpu_features()
+
+
+def names(sensors_list):
+    return [str(sensor) for sensor in sensors_list]
+
+
+class TestListCpuFeatures:
+    def test_features_are_listed(self, fake_cpus):
+        assert [
+            (feature.cpu, feature.feature) for feature in cpufreq.list_cpu_features()
+        ] == [(0, "core_throttle_count"), (0, "freq"), (1, "freq"), (10, "freq")]
+
+    def test_missing_root(self, tmp_path):
+        assert cpufreq.list_cpu_features(str(tmp_path / "nope")) == []
+
+
+class TestReadCpuFeature:
+    def test_frequency_is_in_mhz(self, fake_cpus):
+        assert cpufreq.read_cpu_feature(0, cpufreq.FREQUENCY) == 2400.0
+
+    def test_throttle_count(self, fake_cpus):
+        assert cpufreq.read_cpu_feature(0, cpufreq.CORE_THROTTLE_COUNT) == 7
+
+    def test_reads_are_fresh(self, fake_cpus):
+        cpufreq.read_cpu_feature(1, cpufreq.FREQUENCY)
+        (fake_cpus / "cpu1" / "cpufreq" / "scaling_cur_freq").write_text("3100000\n")
+        assert cpufreq.read_cpu_feature(1, cpufreq.FREQUENCY) == 3100.0
+
+    @pytest.mark.parametrize("cpu", (10, 99))
+    def test_unreadable_raises_sensors_error(self, fake_cpus, cpu):
+        with pytest.raises(sensors.SensorsError):
+            cpufreq.read_cpu_feature(cpu, cpufreq.FREQUENCY)
+
+
+class TestPseudoSensors:
+    def test_not_enumerated_by_default(self, fake_cpus):
+        assert not any(
+            name.startswith("cpu") for name in names(read_sensors.find_sensors())
+        )
+
+    def test_enumerated_on_request(self, fake_cpus):
+        assert names(
+            read_sensors.enumerate_all_sensors(readable_only=True, include_cpu=True)
+        )[-3:] == ["cpu0.core_throttle_count", "cpu0.freq", "cpu1.freq"]
+
+    def test_found_by_pattern(self, fake_cpus):
+        assert names(read_sensors.find_sensors("cpu*.freq")) == [
+            "cpu0.freq",
+            "cpu1.freq",
+        ]
+
+    def test_types(self, fake_cpus):
+        assert (
+            read_sensors.sensor_type(read_sensors.Sensor("cpu0", 0, "freq"))
+            is read_sensors.FeatureType.FREQUENCY
+        )
+        assert read_sensors.FeatureType.FREQUENCY.unit == "MHz"
+
+    def test_read_sensor(self, fake_cpus):
+        assert read_sensors.read_sensor("cpu1.freq") == 800.0
+
+    def test_sampled_in_the_same_tick(self, fake_cpus):
+        readings = read_sensors.read_many(
+            ["coretemp.temp1", "cpu0.freq", "cpu0.core_throttle_count"]
+        )
+        assert readings.with_units() == {
+            "coretemp.temp1": "62.3°C",
+            "cpu0.freq": "2400.0MHz",
+            "cpu0.core_throttle_count": "7.0",
+        }
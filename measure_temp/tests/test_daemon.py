@@ -0,0 +1,180 @@
+"""Tests for sharing a single sensors session via the daemon"""
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+import pytest
+from click.testing import CliRunner
+
+from measure_temp import cli, daemon, sampler
+
+
+@pytest.fixture
+def running_daemon(mock_sensors, tmp_path, monkeypatch):
+    path = str(tmp_path / "daemon.sock")
+    monkeypatch.setenv(daemon.SOCKET_PATH_ENV_VAR, path)
+    with sampler.Sampler(["coretemp.temp1", "nvme.temp1"], interval=60) as background:
+        server = daemon.DaemonServer(path, background)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield path
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+class TestSocketPath:
+    def test_env_var_takes_precedence(self, monkeypatch):
+        monkeypatch.setenv(daemon.SOCKET_PATH_ENV_VAR, "/somewhere/else.sock")
+        assert daemon.default_socket_path() == "/somewhere/else.sock"
+
+    def test_runtime_dir(self, monkeypatch):
+        monkeypatch.delenv(daemon.SOCKET_PATH_ENV_VAR, raising=False)
+        monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+        assert daemon.default_socket_path() == "/run/user/1000/measure_temp.sock"
+
+
+class TestQueryDaemon:
+    def test_read_everything(self, running_daemon):
+        _, readings = daemon.query_daemon()
+        assert readings == {"coretemp.temp1": 62.3, "nvme.temp1": None}
+
+    def test_read_specific_sensors(self, running_daemon):
+        _, readings = daemon.query_daemon(["nvme.temp1"])
+        assert readings == {"nvme.temp1": None}
+
+    def test_unknown_sensor_raises_value_error(self, running_daemon):
+        with pytest.raises(ValueError, match="nct6775.fan1"):
+            daemon.query_daemon(["nct6775.fan1"])
+
+    def test_no_daemon_means_none(self, tmp_path):
+        assert daemon.query_daemon(path=str(tmp_path / "nope.sock")) is None
+
+    def test_stale_socket_is_replaced(self, mock_sensors, tmp_path):
+        path = str(tmp_path / "daemon.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as left_behind:
+            left_behind.bind(path)
+        with sampler.Sampler(["coretemp.temp1"], interval=60) as background:
+            daemon.DaemonServer(path, background).server_close()
+
+    def test_running_daemon_is_left_alone(self, running_daemon, mock_sensors):
+        with sampler.Sampler(["coretemp.temp1"], interval=60) as background:
+            with pytest.raises(OSError, match="already listening"):
+                daemon.DaemonServer(running_daemon, background)
+        assert daemon.query_daemon(path=running_daemon) is not None
+
+    def test_other_files_are_left_alone(self, mock_sensors, tmp_path):
+        path = tmp_path / "daemon.sock"
+        path.write_text("not a socket")
+        with sampler.Sampler(["coretemp.temp1"], interval=60) as background:
+            with pytest.raises(OSError):
+                daemon.DaemonServer(str(path), background)
+        assert path.read_text() == "not a socket"
+
+    def test_socket_is_cleaned_up(self, mock_sensors, tmp_path):
+        path = str(tmp_path / "daemon.sock")
+        with sampler.Sampler(["coretemp.temp1"], interval=60) as background:
+            daemon.DaemonServer(path, background).server_close()
+        assert not os.path.exists(path)
+
+
+class TestCLIUsesDaemon:
+    def test_read_from_daemon(self, running_daemon, mock_chips):
+        # if the reading came from the daemon, it won't see the change to the chip
+        mock_chips[0].features[0] = mock_chips[0].features[0]._replace(value=99.0)
+        result = CliRunner().invoke(cli.main, ["read", "coretemp.temp1"])
+        assert result.output == "coretemp.temp1=62.3\n"
+
+    def test_fall_back_for_sensors_the_daemon_doesnt_sample(self, running_daemon):
+        result = CliRunner().invoke(cli.main, ["read", "nct6775.fan1"])
+        assert result.output == "nct6775.fan1=1200.0\n"
+
+    def test_fall_back_without_daemon(self, mock_sensors):
+        result = CliRunner().invoke(cli.main, ["read", "coretemp.temp2"])
+        assert result.output == "coretemp.temp2=58.0\n"
+
+    def test_report_from_daemon(self, running_daemon):
+        result = CliRunner().invoke(cli.main, [])
+        assert result.output.splitlines() == [
+            "- coretemp:temp1 : 62.3",
+            "- nvme:temp1 : None",
+        ]
+
+    def test_report_matches_direct_report(self, running_daemon, monkeypatch):
+        from_daemon = CliRunner().invoke(cli.main, []).output.splitlines()
+        monkeypatch.setenv(daemon.SOCKET_PATH_ENV_VAR, running_daemon + ".missing")
+        direct = CliRunner().invoke(cli.main, []).output.splitlines()
+        assert set(from_daemon) <= set(direct)
+
+    def test_report_falls_back_before_first_sample(self, mock_sensors, tmp_path):
+        path = os.environ[daemon.SOCKET_PATH_ENV_VAR]
+        with sampler.Sampler(["coretemp.temp1"], interval=60) as background:
+            background._latest = None
+            server = daemon.DaemonServer(path, background)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                result = CliRunner().invoke(cli.main, [])
+            finally:
+                server.shutdown()
+                server.server_close()
+                thread.join()
+        assert result.exit_code == 0
+        assert "- nvme:temp1 : None" in result.output.splitlines()
+
+    def test_unknown_sensor(self, mock_sensors):
+        assert CliRunner().invoke(cli.main, ["read", "zpm.power"]).exit_code == 2
+
+
+class TestShutdown:
+    def test_sigterm_cleans_up(self, tmp_path):
+        path = tmp_path / "daemon.sock"
+        history_path = tmp_path / "history.db"
+        shared_memory_name = f"measure_temp_test_{uuid.uuid4().hex[:8]}"
+        env = dict(
+            os.environ,
+            MEASURE_TEMP_BACKEND="synthetic:chips=2,features=2",
+            MEASURE_TEMP_CHIP_MAP="",
+        )
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "measure_temp",
+                "daemon",
+                "-i",
+                "0.01",
+                "--socket",
+                str(path),
+                "--history",
+                str(history_path),
+                "--shared-memory",
+                shared_memory_name,
+            ],
+            env=env,
+        )
+        try:
+            deadline = time.monotonic() + 30
+            while daemon.query_daemon(path=str(path)) is None:
+                assert time.monotonic() < deadline and process.poll() is None
+                time.sleep(0.05)
+            # once a second sample is out, the first one has been recorded to the history
+            first, _ = daemon.query_daemon(path=str(path))
+            while daemon.query_daemon(path=str(path))[0] == first:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            assert os.path.exists(f"/dev/shm/{shared_memory_name}")
+            process.send_signal(signal.SIGTERM)
+            assert process.wait(timeout=30) == 0
+        finally:
+            process.kill()
+        assert not path.exists()
+        assert not os.path.exists(f"/dev/shm/{shared_memory_name}")
+        with sqlite3.connect(history_path) as connection:
+            assert connection.execute("SELECT COUNT(*) FROM readings").fetchone()[0]
@@ -0,0 +1,68 @@
+"""Tests for the notebook dashboard"""
+import time
+
+import pytest
+
+from measure_temp import dashboard
+
+display = pytest.importorskip("IPython.display")
+
+
+class FakeHandle:
+    def __init__(self, obj):
+        self.frames = [obj.data]
+
+    def update(self, obj):
+        self.frames.append(obj.data)
+
+
+@pytest.fixture
+def handles(monkeypatch):
+    handles = []
+
+    def fake_display(obj, display_id=False):
+        assert display_id
+        handles.append(FakeHandle(obj))
+        return handles[-1]
+
+    monkeypatch.setattr(display, "display", fake_display)
+    return handles
+
+
+SENSORS = ["coretemp.temp1", "nct6775.fan1", "nvme.temp1"]
+
+
+def test_updates_a_single_display(mock_sensors, handles):
+    with dashboard.Dashboard(SENSORS, interval=0.01, max_fps=1000) as board:
+        deadline = time.monotonic() + 5
+        while len(handles[0].frames) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert len(handles) == 1
+    final = handles[0].frames[-1]
+    assert "coretemp.temp1" in final and "62.3°C" in final and "1200RPM" in final
+    assert "<svg" in final
+    assert not board.running
+
+
+def test_redraws_are_throttled(mock_sensors, handles):
+    board = dashboard.Dashboard(SENSORS, max_fps=1)
+    board.start()
+    board.sampler.stop()
+    readings = board.sampler.latest[1]
+    for i in range(10):
+        board._on_sample(float(i), readings)
+    assert len(handles[0].frames) == 2  # the initial frame plus one redraw
+    board.stop()
+    assert len(handles[0].frames) == 3
+
+
+def test_limits_are_highlighted(mock_sensors, handles, monkeypatch):
+    mock_sensors[0].features[0] = mock_sensors[0].features[0]._replace(value=101.0)
+    with dashboard.Dashboard(["coretemp.temp1"], interval=0.01):
+        pass
+    assert 'style="color: red; font-weight: bold">101°C' in handles[0].frames[-1]
+
+
+def test_sparkline_skips_unreadable():
+    assert dashboard._sparkline([1.0, float("nan")]) == ""
+    assert dashboard._sparkline([1.0, float("nan"), 3.0]).count(",") == 2
@@ -0,0 +1,98 @@
+"""Tests for exporting recorded history as Arrow / Parquet"""
+import sqlite3
+
+import pytest
+from click.testing import CliRunner
+
+from measure_temp import cli, export, history
+from measure_temp.read_sensors import read_many
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+SENSORS = ["coretemp.temp1", "nct6775.fan1", "coretemp.temp2"]
+
+
+@pytest.fixture
+def database(mock_sensors, tmp_path):
+    path = str(tmp_path / "history.db")
+    readings = read_many(SENSORS)
+    with history.HistoryWriter(path) as writer:
+        for timestamp in range(10):
+            writer.record(float(timestamp), readings)
+    return path
+
+
+class TestExportHistory:
+    def test_parquet(self, database, tmp_path):
+        path = str(tmp_path / "history.parquet")
+        assert export.export_history(database, path, row_group_size=7) == 30
+        parquet_file = pq.ParquetFile(path)
+        assert parquet_file.metadata.num_row_groups == 5
+        table = parquet_file.read()
+        assert table.schema.field("chip").type == pa.dictionary(pa.int32(), pa.string())
+        rows = table.to_pylist()
+        assert rows[0] == {
+            "time": 0.0,
+            "chip": "coretemp",
+            "addr": 0,
+            "feature": "temp1",
+            "num": 0,
+            "value": pytest.approx(62.3),
+        }
+        assert {(row["chip"], row["feature"]) for row in rows} == {
+            ("coretemp", "temp1"),
+            ("coretemp", "temp2"),
+            ("nct6775", "fan1"),
+        }
+        assert [row["time"] for row in rows] == sorted(row["time"] for row in rows)
+
+    def test_arrow(self, database, tmp_path):
+        path = str(tmp_path / "history.arrow")
+        export.export_history(database, path, start=5, end=8, row_group_size=4)
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        assert sorted(set(table.column("time").to_pylist())) == [5.0, 6.0, 7.0]
+        assert table.column("addr").to_pylist().count(656) == 3
+
+    def test_empty_database(self, tmp_path):
+        database = str(tmp_path / "empty.db")
+        history.HistoryWriter(database).close()
+        path = str(tmp_path / "empty.parquet")
+        assert export.export_history(database, path) == 0
+        assert pq.read_table(path).num_rows == 0
+
+    def test_missing_database(self, tmp_path):
+        path = tmp_path / "missing.parquet"
+        with pytest.raises(FileNotFoundError):
+            export.export_history(str(tmp_path / "missing.db"), str(path))
+        assert not (tmp_path / "missing.db").exists()
+        assert not path.exists()
+
+    def test_database_is_left_alone(self, database, tmp_path):
+        with sqlite3.connect(database) as connection:
+            connection.execute("PRAGMA journal_mode=DELETE")
+        export.export_history(database, str(tmp_path / "history.parquet"))
+        with sqlite3.connect(database) as connection:
+            assert connection.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+
+    def test_time_range_uses_index(self, database):
+        with sqlite3.connect(database) as connection:
+            plan = connection.execute(
+                "EXPLAIN QUERY PLAN SELECT time, sensor_id, value FROM readings"
+                " WHERE time >= ? AND time < ? ORDER BY time",
+                (0.0, 1.0),
+            ).fetchall()
+        assert "readings_by_time" in " ".join(str(row) for row in plan)
+
+    def test_unknown_format(self, database, tmp_path):
+        with pytest.raises(ValueError):
+            export.export_history(database, str(tmp_path / "x"), file_format="csv")
+
+
+def test_cli(database, tmp_path):
+    path = str(tmp_path / "history.parquet")
+    result = CliRunner().invoke(cli.main, ["export", database, path])
+    assert result.exit_code == 0, result.output
+    assert "Exported 30 readings" in result.output
+    assert pq.read_table(path).num_rows == 30
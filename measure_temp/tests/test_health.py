@@ -0,0 +1,111 @@
+"""Tests for quarantining sensors that keep failing"""
+import pytest
+import sensors
+
+from measure_temp import health, read_sensors
+from measure_temp.health import HealthTracker, SensorState
+
+SENSOR = read_sensors.Sensor("nvme", 256, "temp1")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def tracker(clock):
+    return HealthTracker(backoff=1.0, max_backoff=5.0, clock=clock)
+
+
+@pytest.fixture
+def counted_reads(mock_sensors, monkeypatch):
+    """Count the attempts to read the unreadable nvme sensor"""
+    attempts = []
+    nvme = mock_sensors[2]
+    feature = nvme.features[0]
+
+    class CountingFeature(type(feature)):
+        def get_value(self):
+            attempts.append(self.name)
+            return super().get_value()
+
+    nvme.features = [CountingFeature(*feature)]
+    return attempts
+
+
+class TestHealthTracker:
+    def test_healthy_by_default(self, tracker):
+        assert tracker.should_read(SENSOR)
+        assert tracker.health(SENSOR) == health.HEALTHY
+        assert tracker.unhealthy() == {}
+
+    def test_backoff_doubles_up_to_the_cap(self, tracker, clock):
+        for expected in (1.0, 2.0, 4.0, 5.0):
+            tracker.failed(SENSOR, sensors.SensorsError("permission denied"))
+            assert tracker.health(SENSOR).retry_at == clock.now + expected
+        assert tracker.health(SENSOR) == (
+            SensorState.QUARANTINED,
+            4,
+            105.0,
+            "permission denied",
+        )
+        assert not tracker.should_read(SENSOR)
+
+    def test_probed_once_due(self, tracker, clock):
+        tracker.failed(SENSOR)
+        clock.now += 1
+        assert tracker.should_read(SENSOR)
+        assert tracker.health(SENSOR).state is SensorState.PROBING
+
+    def test_success_clears(self, tracker):
+        tracker.failed(SENSOR)
+        tracker.succeeded(SENSOR)
+        assert tracker.health(SENSOR) == health.HEALTHY
+
+    def test_reset(self, tracker):
+        tracker.failed(SENSOR)
+        tracker.reset()
+        assert tracker.should_read(SENSOR)
+
+
+class TestSkippingBrokenSensors:
+    def test_batch_reader_skips_quarantined(self, counted_reads):
+        with read_sensors.BatchReader(["nvme.temp1", "coretemp.temp1"]) as reader:
+            for _ in range(3):
+                readings = reader.read()
+        assert readings["nvme.temp1"] is None
+        assert readings["coretemp.temp1"] == pytest.approx(62.3)
+        assert counted_reads == ["temp1"]
+        (sensor,) = health.DEFAULT_TRACKER.unhealthy()
+        assert str(sensor) == "nvme.temp1"
+
+    def test_enumeration_skips_quarantined(self, counted_reads):
+        for _ in range(3):
+            readable = read_sensors.enumerate_all_sensors(readable_only=True)
+        assert "nvme.temp1" not in [str(sensor) for sensor in readable]
+        assert counted_reads == ["temp1"]
+
+    def test_report_skips_quarantined(self, counted_reads, capsys):
+        read_sensors.report_all_readings()
+        read_sensors.report_all_readings()
+        assert capsys.readouterr().out.count("- nvme:temp1 : None") == 2
+        assert counted_reads == ["temp1"]
+
+    def test_recovered_sensor_is_read_again(self, mock_sensors, monkeypatch):
+        monkeypatch.setattr(health, "DEFAULT_TRACKER", HealthTracker(backoff=0))
+        nvme = mock_sensors[2]
+        with read_sensors.BatchReader(["nvme.temp1"]) as reader:
+            assert reader.read()["nvme.temp1"] is None
+            nvme.features = [nvme.features[0]._replace(readable=True)]
+            assert reader.read()["nvme.temp1"] is None  # still holding the old feature
+        assert read_sensors.read_many(["nvme.temp1"])["nvme.temp1"] == 41.9
+        assert health.DEFAULT_TRACKER.unhealthy() == {}
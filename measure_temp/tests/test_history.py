@@ -0,0 +1,220 @@
+"""Tests for recording readings to a SQLite database"""
+import math
+import sqlite3
+import time
+
+import pytest
+
+from measure_temp import history
+from measure_temp.read_sensors import read_many
+from measure_temp.sampler import Sampler
+
+SENSORS = ["coretemp.temp1", "nct6775.fan1", "nvme.temp1"]
+
+
+@pytest.fixture
+def database(tmp_path):
+    return str(tmp_path / "history.db")
+
+
+class TestHistoryWriter:
+    def test_record_and_query(self, mock_sensors, database):
+        readings = read_many(SENSORS)
+        with history.HistoryWriter(database, flush_interval=60) as writer:
+            for timestamp in (120.0, 150.0, 185.0):
+                writer.record(timestamp, readings)
+        raw = history.query_history(database, "coretemp.temp1")
+        assert list(raw["time"]) == [120.0, 150.0, 185.0]
+        assert list(raw["value"]) == pytest.approx([62.3] * 3)
+        assert list(
+            history.query_history(database, "coretemp.temp1", 130, 185)["time"]
+        ) == [150.0]
+
+    def test_unreadable_sensors_are_not_recorded(self, mock_sensors, database):
+        with history.HistoryWriter(database) as writer:
+            writer.record(0.0, read_many(SENSORS))
+        assert len(history.query_history(database, "nvme.temp1")) == 0
+
+    def test_sensor_metadata(self, mock_sensors, database):
+        with history.HistoryWriter(database) as writer:
+            writer.record(0.0, read_many(SENSORS))
+        with sqlite3.connect(database) as connection:
+            rows = connection.execute(
+                "SELECT chip, addr, feature, num, name, type, unit FROM sensors ORDER BY id"
+            ).fetchall()
+        assert rows == [
+            ("coretemp", 0, "temp1", 0, "coretemp.temp1", "temperature", "°C"),
+            ("nct6775", 656, "fan1", 0, "nct6775.fan1", "fan", "RPM"),
+            ("nvme", 256, "temp1", 0, "nvme.temp1", "temperature", "°C"),
+        ]
+
+    def test_buckets_are_aggregated_across_flushes(self, mock_sensors, database):
+        readings = read_many(SENSORS)
+        with history.HistoryWriter(database, buckets=(60,)) as writer:
+            writer.record(100.0, readings)
+            writer.flush()
+            mock_sensors[0].features[0] = (
+                mock_sensors[0].features[0]._replace(value=70.3)
+            )
+            writer.record(110.0, read_many(SENSORS))
+            writer.record(130.0, readings)
+        buckets = history.query_history(database, "coretemp.temp1", bucket=60)
+        assert list(buckets["time"]) == [60.0, 120.0]
+        assert buckets["min"][0] == pytest.approx(62.3)
+        assert buckets["max"][0] == pytest.approx(70.3)
+        assert buckets["mean"][0] == pytest.approx(66.3)
+        assert buckets["mean"][1] == pytest.approx(62.3)
+
+    def test_writes_are_batched(self, mock_sensors, database):
+        with history.HistoryWriter(database, flush_interval=60) as writer:
+            writer.record(0.0, read_many(SENSORS))
+            assert len(history.query_history(database, "coretemp.temp1")) == 0
+            writer.flush()
+            assert len(history.query_history(database, "coretemp.temp1")) == 1
+
+    def test_reopening_keeps_sensor_ids(self, mock_sensors, database):
+        readings = read_many(SENSORS)
+        for timestamp in (0.0, 1.0):
+            with history.HistoryWriter(database) as writer:
+                writer.record(timestamp, readings)
+        assert len(history.query_history(database, "nct6775.fan1")) == 2
+
+    def test_subscribed_to_sampler(self, mock_sensors, database):
+        with history.HistoryWriter(database) as writer:
+            with Sampler(SENSORS, interval=0.01) as sampler:
+                sampler.subscribe(writer.record)
+                time.sleep(0.05)
+            sampler.unsubscribe(writer.record)
+        assert len(history.query_history(database, "coretemp.temp1")) >= 1
+
+
+class TestRetention:
+    def test_raw_readings_are_dropped(self, mock_sensors, database):
+        readings = read_many(SENSORS)
+        with history.HistoryWriter(database, raw_retention=100) as writer:
+            for timestamp in (0.0, 50.0, 100.0, 150.0):
+                writer.record(timestamp, readings)
+                writer.flush()
+        raw = history.query_history(database, "coretemp.temp1")
+        assert list(raw["time"]) == [50.0, 100.0, 150.0]
+        # the aggregates still cover everything
+        buckets = history.query_history(database, "coretemp.temp1", bucket=60)
+        assert list(buckets["time"]) == [0.0, 60.0, 120.0]
+
+    def test_buckets_are_dropped_once_wholly_expired(self, mock_sensors, database):
+        readings = read_many(SENSORS)
+        with history.HistoryWriter(
+            database, buckets=(60, 3600), bucket_retention={60: 120}
+        ) as writer:
+            for timestamp in range(0, 301, 30):
+                writer.record(float(timestamp), readings)
+        buckets = history.query_history(database, "coretemp.temp1", bucket=60)
+        assert list(buckets["time"]) == [120.0, 180.0, 240.0, 300.0]
+        assert len(history.query_history(database, "coretemp.temp1", bucket=3600)) == 1
+
+    def test_unknown_bucket_retention(self, database):
+        with pytest.raises(ValueError):
+            history.HistoryWriter(database, buckets=(60,), bucket_retention={3600: 1})
+
+
+class TestQueryHistory:
+    def test_unknown_sensor(self, mock_sensors, database):
+        with history.HistoryWriter(database) as writer:
+            writer.record(0.0, read_many(SENSORS))
+        with pytest.raises(ValueError):
+            history.query_history(database, "zpm.power")
+
+    def test_by_sensor_tuple(self, mock_sensors, database):
+        readings = read_many(SENSORS)
+        with history.HistoryWriter(database) as writer:
+            writer.record(0.0, readings)
+        result = history.query_history(database, readings.table[1])
+        assert result["value"][0] == 1200
+
+    def test_missing_database(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            history.query_history(str(tmp_path / "missing.db"), "coretemp.temp1")
+        assert not (tmp_path / "missing.db").exists()
+
+
+def test_aggregate():
+    rows = [(0.0, 1, 2.0), (30.0, 1, 4.0), (61.0, 1, 3.0), (5.0, 2, math.pi)]
+    assert sorted(history._aggregate(rows, 60)) == [
+        (1, 0, 2, 2.0, 4.0, 6.0),
+        (1, 60, 1, 3.0, 3.0, 3.0),
+        (2, 0, 1, math.pi, math.pi, math.pi),
+    ]
+
+
+class TestResolution:
+    @pytest.fixture
+    def recorded(self, mock_sensors, database):
+        readings = read_many(SENSORS)
+        with history.HistoryWriter(database) as writer:
+            for timestamp in range(0, 7200, 30):
+                writer.record(float(timestamp), readings)
+        return database
+
+    @pytest.mark.parametrize(
+        "resolution, expected",
+        [(1, 240), (59, 240), (60, 120), (900, 120), (3600, 2), (86400, 2)],
+    )
+    def test_coarsest_tier_that_is_fine_enough(self, recorded, resolution, expected):
+        result = history.query_history(
+            recorded, "coretemp.temp1", resolution=resolution
+        )
+        assert len(result) == expected
+        assert result.dtype.names == ("time", "min", "mean", "max")
+        assert result["mean"][0] == pytest.approx(62.3)
+
+    def test_range_includes_overlapping_bucket(self, recorded):
+        result = history.query_history(
+            recorded, "coretemp.temp1", start=90, end=200, resolution=60
+        )
+        assert list(result["time"]) == [60.0, 120.0, 180.0]
+
+    @pytest.fixture
+    def pruned(self, mock_sensors, database):
+        # raw readings kept for 10 minutes and minutes for an hour, out of two hours
+        readings = read_many(SENSORS)
+        with history.HistoryWriter(
+            database, raw_retention=600, bucket_retention={60: 3600}
+        ) as writer:
+            for timestamp in range(0, 7200, 30):
+                writer.record(float(timestamp), readings)
+        return database
+
+    @pytest.mark.parametrize(
+        "start, resolution, first",
+        [
+            (7000, 1, 7020.0),  # the raw readings go back far enough
+            (6010, 1, 6000.0),  # they don't, but the minutes do
+            (6010, 60, 6000.0),
+            (1000, 1, 0.0),  # only the hours go back that far
+            (None, 60, 0.0),  # everything
+            (-100, 60, 0.0),  # nothing goes back that far: the hours go back furthest
+        ],
+    )
+    def test_tier_that_goes_back_far_enough(self, pruned, start, resolution, first):
+        result = history.query_history(
+            pruned, "coretemp.temp1", start=start, resolution=resolution
+        )
+        assert result["time"][0] == first
+
+    @pytest.mark.parametrize("start", (None, 0.0))
+    def test_unaligned_readings_at_full_resolution(self, mock_sensors, database, start):
+        # the hour bucket starts well before the first reading, which mustn't make it look like it goes back further
+        readings = read_many(SENSORS)
+        first = 999997203.0
+        with history.HistoryWriter(database) as writer:
+            for i in range(523):
+                writer.record(first + i, readings)
+        result = history.query_history(
+            database, "coretemp.temp1", start=start, resolution=1
+        )
+        assert len(result) == 523
+        assert result["time"][0] == first
+
+    def test_tiers(self, recorded):
+        with sqlite3.connect(recorded) as connection:
+            assert history.history_tiers(connection) == [60, 3600]
@@ -0,0 +1,94 @@
+"""Tests for picking up chips that come and go"""
+import pytest
+
+from measure_temp import hotplug, read_sensors
+from measure_temp.tests.conftest import MockChip, MockFeature
+
+
+@pytest.fixture
+def hwmon(tmp_path):
+    root = tmp_path / "hwmon"
+    root.mkdir()
+    return root
+
+
+def plug_in(hwmon, mock_chips, entry, chip):
+    (hwmon / entry).symlink_to(f"../../devices/{chip.prefix.decode()}/{entry}")
+    mock_chips.append(chip)
+
+
+def unplug(hwmon, mock_chips, entry, chip):
+    (hwmon / entry).unlink()
+    mock_chips.remove(chip)
+
+
+@pytest.fixture
+def usb_chips():
+    return [
+        MockChip("usbtemp", 1, [MockFeature("temp1", 30.0)]),
+        MockChip("usbtemp", 2, [MockFeature("temp1", 31.0)]),
+    ]
+
+
+def names(sensors):
+    return [str(sensor) for sensor in sensors]
+
+
+class TestFingerprint:
+    def test_fingerprint_follows_links(self, hwmon):
+        (hwmon / "hwmon0").symlink_to("../../devices/platform/coretemp.0/hwmon/hwmon0")
+        assert hotplug.hwmon_fingerprint(str(hwmon)) == {
+            "hwmon0": "../../devices/platform/coretemp.0/hwmon/hwmon0"
+        }
+
+    def test_missing_root_is_empty(self, tmp_path):
+        assert hotplug.hwmon_fingerprint(str(tmp_path / "nope")) == {}
+
+
+class TestHotplugWatcher:
+    def test_nothing_changed(self, mock_sensors, hwmon, monkeypatch):
+        watcher = hotplug.HotplugWatcher(root=str(hwmon))
+        rescans = []
+        monkeypatch.setattr(hotplug, "rescan", lambda: rescans.append(True))
+        assert not watcher.poll()
+        assert rescans == []
+
+    def test_added_and_removed(self, mock_sensors, hwmon, usb_chips):
+        watcher = hotplug.HotplugWatcher(root=str(hwmon))
+        plug_in(hwmon, mock_sensors, "hwmon7", usb_chips[0])
+        plug_in(hwmon, mock_sensors, "hwmon8", usb_chips[1])
+        changes = watcher.poll()
+        assert names(changes.added) == ["usbtemp.temp1", "usbtemp1.temp1"]
+        assert changes.removed == []
+
+        unplug(hwmon, mock_sensors, "hwmon7", usb_chips[0])
+        changes = watcher.poll()
+        assert changes.added == [] and names(changes.removed) == ["usbtemp.temp1"]
+        assert "usbtemp1.temp1" in names(watcher.sensors)
+
+    def test_suffixes_are_stable(self, mock_sensors, hwmon, usb_chips):
+        plug_in(hwmon, mock_sensors, "hwmon7", usb_chips[0])
+        plug_in(hwmon, mock_sensors, "hwmon8", usb_chips[1])
+        watcher = hotplug.HotplugWatcher(root=str(hwmon))
+        unplug(hwmon, mock_sensors, "hwmon7", usb_chips[0])
+        watcher.poll()
+
+        newcomer = MockChip("usbtemp", 3, [MockFeature("temp1", 32.0)])
+        plug_in(hwmon, mock_sensors, "hwmon9", newcomer)
+        (added,) = watcher.poll().added
+        # doesn't steal the unplugged chip's suffix
+        expected = (3, 2)
+        assert (added.addr, added.num) == expected
+
+        plug_in(hwmon, mock_sensors, "hwmon7", usb_chips[0])
+        (added,) = watcher.poll().added
+        assert (added.addr, added.num) == (1, 0)
+
+    def test_open_readers_pick_up_changes(self, mock_sensors, hwmon, usb_chips):
+        plug_in(hwmon, mock_sensors, "hwmon7", usb_chips[0])
+        watcher = hotplug.HotplugWatcher(root=str(hwmon))
+        with read_sensors.BatchReader(["usbtemp.temp1", "coretemp.temp1"]) as reader:
+            assert list(reader.read().values()) == [30.0, pytest.approx(62.3)]
+            unplug(hwmon, mock_sensors, "hwmon7", usb_chips[0])
+            watcher.poll()
+            assert list(reader.read().values()) == [None, pytest.approx(62.3)]
@@ -0,0 +1,99 @@
+"""Tests for reading sensors from a supervised worker process"""
+import threading
+import time
+from typing import NamedTuple
+
+import pytest
+
+from measure_temp import isolation, read_sensors, sampler
+from measure_temp.health import HealthTracker
+from measure_temp.tests.conftest import MockChip
+
+
+class HangingFeature(NamedTuple):
+    name: str
+    value: float
+
+    def get_value(self):
+        time.sleep(60)
+        return self.value
+
+
+@pytest.fixture
+def hanging_chip(mock_sensors):
+    mock_sensors.append(MockChip("flaky", 99, [HangingFeature("temp1", 40.0)]))
+    return mock_sensors
+
+
+SENSORS = ["coretemp.temp1", "flaky.temp1", "nct6775.fan1", "nvme.temp1"]
+
+
+class TestIsolatedReader:
+    def test_reads_like_a_batch_reader(self, mock_sensors):
+        with isolation.IsolatedReader(["coretemp.temp1", "nvme.temp1"]) as reader:
+            readings = reader.read()
+        assert readings["coretemp.temp1"] == pytest.approx(62.3)
+        assert readings["nvme.temp1"] is None
+
+    def test_worker_is_not_forked_mid_read(self, mock_sensors):
+        # a worker forked while another thread holds the session lock would hang as soon as it opened a session
+        with isolation.IsolatedReader(["coretemp.temp1"], deadline=2) as reader:
+            reader._stop_worker()
+            locked = threading.Event()
+
+            def hold_the_lock():
+                with read_sensors._session_lock:
+                    locked.set()
+                    time.sleep(0.3)
+
+            holder = threading.Thread(target=hold_the_lock)
+            holder.start()
+            locked.wait()
+            try:
+                assert reader.read()["coretemp.temp1"] == pytest.approx(62.3)
+            finally:
+                holder.join()
+
+    def test_unknown_sensor_raises_value_error(self, mock_sensors):
+        with pytest.raises(ValueError):
+            isolation.IsolatedReader(["coretemp.temp9"]).open()
+
+    def test_hanging_sensor_is_skipped(self, hanging_chip):
+        with isolation.IsolatedReader(SENSORS, deadline=0.2) as reader:
+            start = time.monotonic()
+            readings = reader.read()
+            assert time.monotonic() - start < 5
+            assert readings.by_name() == {
+                "coretemp.temp1": pytest.approx(62.3),
+                "flaky.temp1": None,
+                "nct6775.fan1": 1200,
+                "nvme.temp1": None,
+            }
+            assert list(reader.tracker.unhealthy()) == [
+                reader.sensors[1],
+                reader.sensors[3],
+            ]
+
+            # doesn't wait on the quarantined sensor again
+            start = time.monotonic()
+            assert reader.read()["nct6775.fan1"] == 1200
+            assert time.monotonic() - start < 0.2
+
+    def test_requarantined_after_backoff(self, hanging_chip):
+        tracker = HealthTracker(backoff=0.05)
+        with isolation.IsolatedReader(SENSORS, deadline=0.1, tracker=tracker) as reader:
+            reader.read()
+            time.sleep(0.1)
+            reader.read()
+            assert tracker.health(reader.sensors[1]).failures == 2
+            assert "No reading within" in tracker.health(reader.sensors[1]).error
+
+
+def test_sample_with_deadline(hanging_chip):
+    ((_, readings),) = sampler.sample(SENSORS, count=1, deadline=0.2)
+    assert readings["flaky.temp1"] is None and readings["nct6775.fan1"] == 1200
+
+
+def test_report_all_readings_with_deadline(hanging_chip, capsys):
+    read_sensors.report_all_readings(deadline=0.2)
+    assert "- flaky:temp1 : None" in capsys.readouterr().out
@@ -0,0 +1,94 @@
+"""Tests for capturing sensor limits and checking readings against them"""
+import math
+from array import array
+
+import pytest
+
+from measure_temp import limits, read_sensors, thermal_zones
+from measure_temp.readings import Readings
+
+
+@pytest.fixture
+def table(mock_sensors):
+    with read_sensors.BatchReader(
+        ["coretemp.temp1", "coretemp.temp2", "nct6775.fan1"]
+    ) as reader:
+        yield reader.read().table
+
+
+@pytest.fixture(params=(True, False), ids=("numpy", "pure-python"))
+def numpy_or_not(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        import builtins
+
+        real_import = builtins.__import__
+
+        def no_numpy(name, *args, **kwargs):
+            if name == "numpy":
+                raise ImportError("no numpy for you")
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", no_numpy)
+
+
+class TestCaptureLimits:
+    def test_limits_are_read_at_enumeration(self, mock_sensors):
+        (sensor,) = read_sensors.find_sensors("coretemp.temp1")
+        low, high, critical = read_sensors.sensor_limits(sensor)
+        assert math.isnan(low) and (high, critical) == (80.0, 100.0)
+
+    def test_missing_limits_are_nan(self, mock_sensors):
+        (sensor,) = read_sensors.find_sensors("nct6775.fan1")
+        low, high, critical = read_sensors.sensor_limits(sensor)
+        assert low == 300.0 and math.isnan(high) and math.isnan(critical)
+
+    def test_limits_are_on_the_table(self, table):
+        assert list(table.critical[:1]) == [100.0]
+
+    def test_thermal_zone_trip_points(self, mock_sensors, tmp_path, monkeypatch):
+        zone = tmp_path / "thermal_zone0"
+        zone.mkdir()
+        (zone / "type").write_text("soc-thermal\n")
+        (zone / "temp").write_text("50000\n")
+        for trip, (trip_type, temp) in enumerate(
+            (("passive", "85000"), ("critical", "110000"), ("passive", "80000"))
+        ):
+            (zone / f"trip_point_{trip}_type").write_text(trip_type + "\n")
+            (zone / f"trip_point_{trip}_temp").write_text(temp + "\n")
+        monkeypatch.setattr(thermal_zones, "THERMAL_ROOT", str(tmp_path))
+        try:
+            (sensor,) = read_sensors.find_sensors("soc-thermal.temp")
+            assert read_sensors.sensor_limits(sensor)[1:] == (80.0, 110.0)
+        finally:
+            thermal_zones.close_thermal_zones()
+
+
+class TestCheckLimits:
+    @pytest.mark.parametrize(
+        "values, expected",
+        (
+            ((62.3, 58.0, 1200.0), {}),
+            ((85.0, 58.0, 1200.0), {"coretemp.temp1": limits.LimitStatus.HIGH}),
+            (
+                (101.0, 58.0, 0.0),
+                {
+                    "coretemp.temp1": limits.LimitStatus.CRITICAL,
+                    "nct6775.fan1": limits.LimitStatus.LOW,
+                },
+            ),
+            ((math.nan, 999.0, math.nan), {}),
+        ),
+    )
+    def test_check(self, table, numpy_or_not, values, expected):
+        flagged = limits.check_limits(Readings(table, array("d", values)))
+        assert {str(sensor): status for sensor, status in flagged.items()} == expected
+
+    def test_margin(self, table, numpy_or_not):
+        flagged = limits.check_limits(
+            Readings(table, array("d", (96.0, 58.0, 1200.0))), margin=5
+        )
+        assert {str(sensor): status for sensor, status in flagged.items()} == {
+            "coretemp.temp1": limits.LimitStatus.CRITICAL
+        }
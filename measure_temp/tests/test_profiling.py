@@ -0,0 +1,136 @@
+"""Tests for profiling how hot a block of code makes the machine"""
+import math
+import sys
+import time
+
+import pytest
+from click.testing import CliRunner
+
+import measure_temp
+from measure_temp import cli, profiling
+
+SENSORS = ["coretemp.temp1", "nct6775.fan1", "nvme.temp1"]
+
+
+def summary_of(thermal_profile, name):
+    (summary,) = [
+        summary
+        for sensor, summary in thermal_profile.summary.items()
+        if str(sensor) == name
+    ]
+    return summary
+
+
+class TestProfile:
+    def test_context_manager(self, mock_sensors):
+        with measure_temp.profile(SENSORS, interval=0.01) as p:
+            time.sleep(0.05)
+        assert len(p.timestamps) >= 2
+        assert p.duration >= 0.05
+        assert p.series("coretemp.temp1")[-1] == pytest.approx(62.3)
+        summary = summary_of(p, "coretemp.temp1")
+        assert summary.peak == pytest.approx(62.3) == summary.mean
+        assert summary.threshold == 80.0 and summary.time_above == 0.0
+        span = p.timestamps[-1] - p.timestamps[0]
+        assert summary.area == pytest.approx(62.3 * span)
+
+    def test_to_frame(self, mock_sensors):
+        pytest.importorskip("pandas")
+        with measure_temp.profile(SENSORS, interval=0.01) as p:
+            time.sleep(0.03)
+        frame = p.to_frame()
+        assert frame.shape == (len(p.timestamps), 3)
+        assert frame[("coretemp", 0, "temp1", 0)].iloc[-1] == pytest.approx(62.3)
+
+    def test_missing_threshold_and_unreadable(self, mock_sensors):
+        with measure_temp.profile(SENSORS, interval=0.01) as p:
+            pass
+        assert math.isnan(summary_of(p, "nct6775.fan1").time_above)
+        assert all(math.isnan(value) for value in summary_of(p, "nvme.temp1")[:4])
+
+    def test_decorator(self, mock_sensors):
+        profiler = measure_temp.profile(["coretemp.temp1"], interval=0.01, threshold=60)
+
+        @profiler
+        def job():
+            return "done"
+
+        assert job() == "done"
+        summary = summary_of(profiler.last, "coretemp.temp1")
+        assert summary.time_above > 0 and summary.threshold == 60
+
+    def test_recursive_decorator(self, mock_sensors):
+        profiler = measure_temp.profile(["coretemp.temp1"], interval=0.01)
+        profiles = []
+
+        @profiler
+        def countdown(n):
+            profiles.append(profiler.last)
+            if n:
+                countdown(n - 1)
+
+        countdown(2)
+        assert len(set(map(id, profiles))) == 3
+        assert profiler.last is profiles[0]
+        assert all(p.summary and p.end >= p.start for p in profiles)
+        assert (
+            profiles[0].start <= profiles[1].start <= profiles[1].end <= profiles[0].end
+        )
+
+    def test_report(self, mock_sensors):
+        with measure_temp.profile(SENSORS, interval=0.01) as p:
+            pass
+        report = p.report().splitlines()
+        assert report[0].split() == ["sensor", "peak", "mean", "above", "area"]
+        assert report[1].split()[:3] == ["coretemp.temp1", "62.3°C", "62.3°C"]
+        # the fan has no high limit to compare against, and the NVMe drive was never readable
+        assert report[2].split()[0] == "nct6775.fan1" and report[2].split()[3] == "n/a"
+        assert report[3].split() == ["nvme.temp1"] + ["n/a"] * 4
+        assert "nan" not in p.report()
+
+
+class TestSummarize:
+    def test_statistics(self):
+        points = [(0.0, 50.0), (1.0, 90.0), (3.0, 70.0), (4.0, 60.0)]
+        assert profiling._summarize(points, 65.0) == (
+            90.0,
+            67.5,
+            3.0,  # from 1 to 3 and from 3 to 4
+            70.0 + 160.0 + 65.0,
+            65.0,
+        )
+
+    def test_no_points(self):
+        assert all(math.isnan(value) for value in profiling._summarize([], 1.0)[:4])
+
+
+class TestRunCommand:
+    def test_reports_on_the_command(self, mock_sensors):
+        result = CliRunner().invoke(
+            cli.main,
+            [
+                "run",
+                "-s",
+                "coretemp.*",
+                "-i",
+                "0.01",
+                "--",
+                sys.executable,
+                "-c",
+                "pass",
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        assert "exited with 0 after" in result.output
+        assert "coretemp.temp2" in result.output and "nct6775" not in result.output
+
+    def test_passes_on_the_exit_code(self, mock_sensors):
+        result = CliRunner().invoke(
+            cli.main,
+            ["run", "--", sys.executable, "-c", "import sys; sys.exit(3)"],
+        )
+        assert result.exit_code == 3
+
+    def test_missing_command(self, mock_sensors):
+        result = CliRunner().invoke(cli.main, ["run", "--", "no-such-command-i-hope"])
+        assert result.exit_code == 2 and "Command not found" in result.output
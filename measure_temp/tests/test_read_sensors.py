@@ -5,6 +5,7 @@ import pytest
 import sensors
 
 from measure_temp import read_sensors
+from measure_temp.tests.conftest import MockChip
 
 
 class TestReportAllReadings:
@@ -12,6 +13,20 @@ class TestReportAllReadings:
         print("\n---")
         read_sensors.report_all_readings()
 
+    @pytest.mark.parametrize("deadline", (None, 1.0))
+    def test_chips_sharing_an_address(self, mock_sensors, capsys, deadline):
+        from measure_temp.tests.conftest import MockFeature
+
+        mock_sensors[:] = [
+            MockChip("coretemp", 0, [MockFeature("temp1", 62.3)]),
+            MockChip("acpitz", 0, [MockFeature("temp1", 27.8)]),
+        ]
+        read_sensors.report_all_readings(deadline=deadline)
+        assert capsys.readouterr().out.splitlines() == [
+            "- coretemp:temp1 : 62.3",
+            "- acpitz:temp1 : 27.8",
+        ]
+
 
 class TestSensorRepresentation:
     def test_addr_isnt_used_for_stringification(self):
@@ -41,6 +56,11 @@ class TestEnumerateAllSensors:
 
     @pytest.mark.parametrize("sensor", all_readable_sensors, ids=str)
     def test_all_readable_sensors_are_readable(self, sensor):
+        # thermal zones and CPU pseudo-sensors are read straight from sysfs
+        direct_reader = read_sensors._direct_reader(sensor)
+        if direct_reader is not None:
+            _ = direct_reader()
+            return
         with read_sensors.sensors_session():
             for chip in sensors.iter_detected_chips():
                 if chip.prefix.decode() != sensor.chip or chip.addr != sensor.addr:
@@ -133,7 +153,10 @@ class TestReadSensor:
         ) == pytest.approx(expected)
 
     def test_get_ambiguous_by_suffix(self):
-        assert read_sensors.read_sensor("fluxcapacitor1.year") == pytest.approx(2035)
+        assert read_sensors.read_sensor("fluxcapacitor1.speed") == pytest.approx(88)
+
+    def test_suffixes_go_by_address_not_detection_order(self):
+        assert read_sensors.read_sensor("fluxcapacitor.year") == pytest.approx(2035)
 
     def test_chip_not_found_raises_value_error(self):
         with pytest.raises(ValueError, match="Chip zpm not found at address 1997"):
@@ -151,10 +174,138 @@ class TestReadSensor:
     def test_string_not_recognized_raises_value_error(self):
         with pytest.raises(
             ValueError,
-            match="Could not find a sensor matching descriptor fluxcapacitor.year",
+            match="Could not find a sensor matching descriptor fluxcapacitor1.year",
         ):
-            read_sensors.read_sensor("fluxcapacitor.year")
+            read_sensors.read_sensor("fluxcapacitor1.year")
 
     def test_unreadable_sensor_raises_sensor_error(self):
         with pytest.raises(sensors.SensorsError):
             read_sensors.read_sensor("heisenbergcompensator.momentum")
+
+
+class TestBatchReads:
+    def test_read_many(self, mock_sensors):
+        readings = read_sensors.read_many(["coretemp.temp1", "nct6775.fan1"])
+        assert {str(sensor): value for sensor, value in readings.items()} == {
+            "coretemp.temp1": pytest.approx(62.3),
+            "nct6775.fan1": pytest.approx(1200),
+        }
+
+    def test_unreadable_sensors_are_none(self, mock_sensors):
+        assert list(read_sensors.read_many(["nvme.temp1"]).values()) == [None]
+
+    def test_unknown_sensor_raises_value_error(self, mock_sensors):
+        with pytest.raises(ValueError, match="Chip nvme not found at address 1"):
+            read_sensors.read_many([read_sensors.Sensor("nvme", 1, "temp1")])
+
+    @pytest.fixture
+    def chips_at_address_zero(self, monkeypatch, mock_sensors):
+        from measure_temp.tests.conftest import MockFeature
+
+        chips = [
+            mock_sensors[0],
+            MockChip("acpitz", 0, [MockFeature("temp1", 27.8)]),
+            MockChip("pch_cannonlake", 0, [MockFeature("temp1", 45.0)]),
+        ]
+        monkeypatch.setattr(sensors, "iter_detected_chips", lambda: iter(chips))
+
+    def test_chips_sharing_an_address(self, chips_at_address_zero):
+        readings = read_sensors.read_many(
+            ["acpitz.temp1", "pch_cannonlake.temp1", "coretemp.temp1"]
+        )
+        assert list(readings.values()) == [27.8, 45.0, pytest.approx(62.3)]
+        assert read_sensors.read_sensor("pch_cannonlake.temp1") == 45.0
+        assert (
+            read_sensors.read_sensor(read_sensors.Sensor("acpitz", 0, "temp1")) == 27.8
+        )
+
+    def test_sessions_are_reentrant(self, monkeypatch, mock_sensors):
+        calls = []
+        monkeypatch.setattr(sensors, "init", lambda: calls.append("init"))
+        monkeypatch.setattr(sensors, "cleanup", lambda: calls.append("cleanup"))
+        with read_sensors.sensors_session():
+            _ = read_sensors.read_many(["coretemp.temp1"])
+            _ = read_sensors.enumerate_all_sensors()
+        assert calls == ["init", "cleanup"]
+
+
+class TestFindSensors:
+    def test_glob(self, mock_sensors):
+        assert [str(sensor) for sensor in read_sensors.find_sensors("coretemp.*")] == [
+            "coretemp.temp1",
+            "coretemp.temp2",
+        ]
+
+    def test_no_patterns_means_all_readable(self, mock_sensors):
+        assert len(read_sensors.find_sensors()) == 4
+
+
+class TestInterning:
+    def test_enumeration_returns_the_same_objects(self, mock_sensors):
+        first, second = (read_sensors.enumerate_all_sensors() for _ in range(2))
+        assert all(a is b for a, b in zip(first, second))
+
+    def test_string_form_is_cached(self, mock_sensors):
+        sensor = read_sensors.enumerate_all_sensors()[0]
+        assert str(sensor) is str(sensor)
+
+    def test_equal_sensors_intern_to_the_same_object(self, mock_sensors):
+        sensor = read_sensors.enumerate_all_sensors()[0]
+        assert read_sensors.intern_sensor(read_sensors.Sensor(*sensor)) is sensor
+
+    def test_ids_are_stable_and_reversible(self, mock_sensors):
+        sensors_list = read_sensors.enumerate_all_sensors()
+        ids = [read_sensors.sensor_id(sensor) for sensor in sensors_list]
+        _ = read_sensors.enumerate_all_sensors()
+        assert [read_sensors.sensor_id(sensor) for sensor in sensors_list] == ids
+        assert [read_sensors.sensor_from_id(i) for i in ids] == sensors_list
+
+    def test_uninterned_sensors_still_stringify(self):
+        assert str(read_sensors.Sensor("zpm", 2004, "power", num=3)) == "zpm3.power"
+
+
+class TestFeatureTypes:
+    class TypedFeature(NamedTuple):
+        # libsensors features carry a type code, so the name doesn't matter
+        name: str
+        type: int
+
+        def get_value(self):
+            return 0.0
+
+    @pytest.fixture
+    def typed_chip(self, monkeypatch, mock_sensors):
+        TF = TestFeatureTypes.TypedFeature
+        chips = mock_sensors + [
+            MockChip("it8688", 2592, [TF("exhaust", 0x01), TF("vcore", 0x00)])
+        ]
+        monkeypatch.setattr(sensors, "iter_detected_chips", lambda: iter(chips))
+
+    @pytest.mark.parametrize(
+        "name, expected",
+        (
+            ("coretemp.temp1", read_sensors.FeatureType.TEMPERATURE),
+            ("nct6775.fan1", read_sensors.FeatureType.FAN),
+            ("nct6775.in0", read_sensors.FeatureType.VOLTAGE),
+            ("it8688.exhaust", read_sensors.FeatureType.FAN),
+            ("it8688.vcore", read_sensors.FeatureType.VOLTAGE),
+        ),
+    )
+    def test_types_are_captured_at_enumeration(self, typed_chip, name, expected):
+        (sensor,) = [
+            sensor
+            for sensor in read_sensors.enumerate_all_sensors()
+            if str(sensor) == name
+        ]
+        assert read_sensors.sensor_type(sensor) is expected
+
+    def test_units(self):
+        assert read_sensors.FeatureType.FAN.unit == "RPM"
+
+    def test_filter_by_type(self, typed_chip):
+        assert [
+            str(sensor)
+            for sensor in read_sensors.find_sensors(
+                types=[read_sensors.FeatureType.VOLTAGE]
+            )
+        ] == ["nct6775.in0", "it8688.vcore"]
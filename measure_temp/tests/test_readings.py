@@ -0,0 +1,168 @@
+"""Tests for the compact readings container"""
+import math
+import sys
+from array import array
+
+import pytest
+
+from measure_temp import read_sensors
+from measure_temp.read_sensors import FeatureType, Sensor
+from measure_temp.readings import Readings, stack_readings
+from measure_temp.sensor_table import SensorTable
+
+SENSORS = [
+    Sensor("coretemp", 0, "temp1"),
+    Sensor("nvme", 256, "temp1"),
+    Sensor("fluxcapacitor", 1809, "year", num=1),
+]
+
+
+@pytest.fixture
+def readings():
+    yield Readings(SensorTable.of(SENSORS), array("d", [62.3, math.nan, 2035.0]))
+
+
+class TestSensorTable:
+    def test_tables_are_shared(self):
+        assert SensorTable.of(SENSORS) is SensorTable.of(list(SENSORS))
+
+    def test_lookup_by_sensor_or_name(self):
+        table = SensorTable.of(SENSORS)
+        assert table.index(SENSORS[2]) == table.index("fluxcapacitor1.year") == 2
+
+    def test_unknown_sensor_raises_key_error(self):
+        with pytest.raises(KeyError):
+            SensorTable.of(SENSORS).index("zpm.power")
+
+    def test_to_numpy(self):
+        pytest.importorskip("numpy")
+        table = SensorTable.of(SENSORS)
+        records = table.to_numpy()
+        assert list(records["chip"]) == ["coretemp", "nvme", "fluxcapacitor"]
+        assert list(records["addr"]) == [0, 256, 1809]
+        assert list(records["num"]) == [0, 0, 1]
+        assert records["name"][2] == "fluxcapacitor1.year"
+        assert records["type"][0] == "temperature" and records["unit"][0] == "°C"
+        assert math.isnan(records["critical"][1])
+        assert records is table.to_numpy()
+        assert not records.flags.writeable
+
+    def test_to_index(self):
+        pytest.importorskip("pandas")
+        index = SensorTable.of(SENSORS).to_index()
+        assert list(index.names) == ["chip", "addr", "feature", "num"]
+        assert list(index) == [tuple(sensor) for sensor in SENSORS]
+
+    def test_enumeration_to_numpy(self, mock_sensors):
+        pytest.importorskip("numpy")
+        sensors = read_sensors.enumerate_all_sensors()
+        records = SensorTable.of(sensors).to_numpy()
+        assert list(records["name"]) == [str(sensor) for sensor in sensors]
+        assert records["high"][0] == 80.0
+
+
+class TestReadings:
+    def test_lookup_by_sensor(self, readings):
+        assert readings[SENSORS[0]] == 62.3
+
+    def test_lookup_by_name(self, readings):
+        assert readings["fluxcapacitor1.year"] == 2035.0
+
+    def test_unreadable_is_none(self, readings):
+        assert readings["nvme.temp1"] is None
+
+    def test_behaves_like_a_dict(self, readings):
+        assert readings == {SENSORS[0]: 62.3, SENSORS[1]: None, SENSORS[2]: 2035.0}
+
+    def test_iteration_is_in_table_order(self, readings):
+        assert list(readings) == SENSORS
+
+    def test_no_per_instance_dict(self, readings):
+        assert not hasattr(readings, "__dict__")
+
+    def test_smaller_than_a_dict(self, readings):
+        as_dict = dict(readings)
+        assert sys.getsizeof(readings) + sys.getsizeof(readings.data) < sys.getsizeof(
+            as_dict
+        ) + sum(sys.getsizeof(value) for value in as_dict.values())
+
+    def test_from_mapping(self):
+        packed = Readings.from_mapping(SensorTable.of(SENSORS), {SENSORS[2]: 1955.0})
+        assert list(packed.values()) == [None, None, 1955.0]
+
+    def test_wrong_length_raises_value_error(self):
+        with pytest.raises(ValueError):
+            Readings(SensorTable.of(SENSORS), array("d", [1.0]))
+
+    def test_to_numpy_doesnt_copy(self, readings):
+        pytest.importorskip("numpy")
+        as_numpy = readings.to_numpy()
+        readings.data[0] = 70.0
+        assert as_numpy[0] == 70.0
+        assert math.isnan(as_numpy[1])
+
+    def test_to_records(self, readings):
+        pytest.importorskip("numpy")
+        records = readings.to_records()
+        assert records.dtype.names == ("chip", "addr", "feature", "num", "value")
+        assert tuple(records[2]) == ("fluxcapacitor", 1809, "year", 1, 2035.0)
+        assert math.isnan(records["value"][1])
+
+    def test_to_series(self, readings):
+        pytest.importorskip("pandas")
+        series = readings.to_series()
+        assert series[("coretemp", 0, "temp1", 0)] == 62.3
+        assert series.xs("fluxcapacitor", level="chip").iloc[0] == 2035.0
+        assert series.isna().sum() == 1
+
+    def test_batch_reads_share_a_table(self, mock_sensors):
+        with read_sensors.BatchReader(["coretemp.temp1", "nvme.temp1"]) as reader:
+            first, second = reader.read(), reader.read()
+        assert first.table is second.table
+        assert first == {first.table[0]: 62.3, first.table[1]: None}
+
+
+class TestStackReadings:
+    def test_stack(self, readings):
+        pytest.importorskip("pandas")
+        later = Readings(readings.table, array("d", [64.0, 40.0, 2035.0]))
+        frame = stack_readings([readings, later], timestamps=[0.0, 1.5])
+        assert frame.shape == (2, 3)
+        assert list(frame[("nvme", 256, "temp1", 0)].isna()) == [True, False]
+        assert frame.index[1].timestamp() == 1.5
+        assert frame.xs("coretemp", axis=1).iloc[:, 0].tolist() == [62.3, 64.0]
+
+    def test_without_timestamps(self, readings):
+        pytest.importorskip("pandas")
+        assert list(stack_readings([readings] * 3).index) == [0, 1, 2]
+
+    def test_mixed_tables(self, readings):
+        pytest.importorskip("pandas")
+        other = Readings(SensorTable.of(SENSORS[:1]), array("d", [1.0]))
+        with pytest.raises(ValueError):
+            stack_readings([readings, other])
+
+    def test_wrong_number_of_timestamps(self, readings):
+        pytest.importorskip("pandas")
+        with pytest.raises(ValueError):
+            stack_readings([readings], timestamps=[0.0, 1.0])
+
+
+class TestFeatureTypes:
+    def test_table_types_and_units(self, readings):
+        assert readings.table.units[:2] == ("°C", "°C")
+
+    def test_filter_readings_by_type(self, mock_sensors):
+        readings = read_sensors.read_many(
+            ["coretemp.temp1", "nct6775.fan1", "nct6775.in0"]
+        )
+        fans = readings.of_type(FeatureType.FAN)
+        assert fans.by_name() == {"nct6775.fan1": 1200.0}
+        assert fans.table is readings.table.of_type(FeatureType.FAN)
+
+    def test_labels_with_units(self, mock_sensors):
+        readings = read_sensors.read_many(["coretemp.temp1", "nvme.temp1"])
+        assert readings.with_units() == {
+            "coretemp.temp1": "62.3°C",
+            "nvme.temp1": "None",
+        }
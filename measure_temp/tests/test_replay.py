@@ -0,0 +1,193 @@
+"""Tests for playing recorded history back through the normal API"""
+import sqlite3
+from array import array
+
+import pytest
+
+from measure_temp import backends, history, read_sensors, replay, rules
+from measure_temp.read_sensors import FeatureType
+from measure_temp.readings import Readings
+from measure_temp.sampler import sample
+from measure_temp.sensor_table import SensorTable
+from measure_temp.tests.conftest import MockChip, MockFeature
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Two minutes of a warming CPU and a fan that only started being readable halfway through"""
+    table = SensorTable.of(
+        [
+            read_sensors.Sensor("coretemp", 0, "temp1"),
+            read_sensors.Sensor("nct6775", 656, "fan1"),
+            read_sensors.Sensor("cpu3", 3, "freq"),
+        ]
+    )
+    path = str(tmp_path / "history.db")
+    with history.HistoryWriter(path) as writer:
+        for second in range(120):
+            writer.record(
+                1e9 + second,
+                Readings(
+                    table,
+                    array(
+                        "d",
+                        [
+                            40.0 + second / 4,
+                            1000.0 + second if second >= 60 else float("nan"),
+                            2400.0,
+                        ],
+                    ),
+                ),
+            )
+    return path
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def replaying(recording, clock, tmp_path, monkeypatch):
+    backend = replay.ReplayBackend(recording, speed=10, clock=clock)
+    monkeypatch.setattr(read_sensors.thermal_zones, "THERMAL_ROOT", str(tmp_path))
+    backends.set_backend(backend)
+    yield backend
+
+
+class TestReplayBackend:
+    def test_enumerates_recorded_sensors(self, replaying):
+        assert [str(sensor) for sensor in read_sensors.enumerate_all_sensors()] == [
+            "coretemp.temp1",
+            "nct6775.fan1",
+        ]
+        assert "cpu3.freq" in [
+            str(sensor)
+            for sensor in read_sensors.enumerate_all_sensors(include_cpu=True)
+        ]
+
+    def test_recorded_types(self, recording, clock):
+        with sqlite3.connect(recording) as connection:
+            connection.execute(
+                "UPDATE sensors SET type = 'frequency' WHERE feature = 'freq'"
+            )
+        backends.set_backend(replay.ReplayBackend(recording, clock=clock))
+        (cpu,) = read_sensors.find_sensors("cpu3.*")
+        assert read_sensors.sensor_type(cpu) == FeatureType.FREQUENCY
+
+    def test_plays_back_at_speed(self, replaying, clock):
+        assert read_sensors.read_sensor("coretemp.temp1") == 40.0
+        clock.now += 2
+        assert read_sensors.read_sensor("coretemp.temp1") == 45.0
+        assert replaying.time() == 1e9 + 20
+
+    def test_not_yet_recorded(self, replaying, clock):
+        read_sensors.read_sensor("coretemp.temp1")
+        assert read_sensors.read_many(["nct6775.fan1"])["nct6775.fan1"] is None
+        clock.now += 6.5
+        assert read_sensors.read_sensor("nct6775.fan1") == 1065.0
+
+    def test_holds_last_reading_at_end(self, replaying, clock):
+        read_sensors.read_sensor("coretemp.temp1")
+        clock.now += 100
+        assert replaying.finished
+        assert read_sensors.read_sensor("coretemp.temp1") == 40.0 + 119 / 4
+
+    def test_loop(self, recording, clock):
+        backend = replay.ReplayBackend(recording, speed=10, loop=True, clock=clock)
+        backend.init()
+        clock.now += 11.9 + 1
+        assert backend.position() == pytest.approx(1e9 + 10)
+        assert backend.time() == pytest.approx(1e9 + 129)
+        assert not backend.finished
+
+    def test_samples_are_timestamped_with_playback_time(self, replaying):
+        timestamps = [timestamp for timestamp, _ in sample(["coretemp.temp1"], 0, 3)]
+        assert timestamps == [1e9] * 3
+
+    def test_drives_alert_rules_faster_than_real_time(self, recording):
+        ticks = iter(range(1000000))
+        backend = replay.ReplayBackend(
+            recording, speed=1000, clock=lambda: next(ticks) * 0.001
+        )
+        backends.set_backend(backend)
+        alerts = []
+        engine = rules.RuleEngine(
+            [rules.compile_rule("coretemp.temp1 > 60 for 10s")], alerts.append
+        )
+        for timestamp, readings in sample(["coretemp.temp1"], 0, 200):
+            engine.update(timestamp, readings)
+        (alert,) = alerts
+        assert alert.firing
+        assert 1e9 + 90 <= alert.timestamp < 1e9 + 100
+
+    def test_round_trip_keeps_suffixes(self, mock_sensors, tmp_path, clock):
+        # ACPI thermal zones show up both through libsensors and as a thermal zone, at "address" 0 either way
+        mock_sensors[:] = [
+            MockChip("acpitz", 0, [MockFeature("temp1", 27.8)]),
+            MockChip("coretemp", 0, [MockFeature("temp1", 62.3)]),
+        ]
+        zone = tmp_path / "thermal" / "thermal_zone0"
+        zone.mkdir(parents=True)
+        (zone / "type").write_text("acpitz\n")
+        (zone / "temp").write_text("28800\n")
+        live = read_sensors.find_sensors()
+        names = [str(sensor) for sensor in live]
+        assert names == ["acpitz.temp1", "coretemp.temp1", "acpitz1.temp"]
+        path = str(tmp_path / "history.db")
+        with history.HistoryWriter(path) as writer:
+            writer.record(1e9, read_sensors.read_many(live))
+        read_sensors.thermal_zones.close_thermal_zones()
+
+        backends.set_backend(replay.ReplayBackend(path, clock=clock))
+        assert [str(sensor) for sensor in read_sensors.find_sensors()] == names
+        assert read_sensors.read_many(names).by_name() == {
+            "acpitz.temp1": 27.8,
+            "coretemp.temp1": 62.3,
+            "acpitz1.temp": 28.8,
+        }
+
+    def test_chip_map_is_left_alone(self, replaying, tmp_path, monkeypatch):
+        path = tmp_path / "chips.json"
+        monkeypatch.setenv(read_sensors.chip_map.CHIP_MAP_ENV_VAR, str(path))
+        read_sensors.enumerate_all_sensors()
+        assert not path.exists()
+
+    def test_empty_database(self, tmp_path):
+        path = str(tmp_path / "empty.db")
+        history.HistoryWriter(path).close()
+        with pytest.raises(ValueError):
+            replay.ReplayBackend(path)
+
+    def test_missing_database(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            replay.ReplayBackend(str(tmp_path / "missing.db"))
+        assert not (tmp_path / "missing.db").exists()
+
+
+class TestLoadBackend:
+    def test_default_is_libsensors(self):
+        assert backends.load_backend() is read_sensors.sensors
+        assert backends.load_backend("libsensors") is read_sensors.sensors
+
+    def test_replay_spec(self, recording):
+        backend = backends.load_backend(f"replay:{recording},speed=100,loop=1")
+        assert isinstance(backend, replay.ReplayBackend)
+        assert backend.speed == 100 and backend.loop
+
+    def test_from_environment(self, recording, monkeypatch):
+        monkeypatch.setenv(backends.BACKEND_ENV_VAR, f"replay:{recording}")
+        assert isinstance(backends.get_backend(), replay.ReplayBackend)
+        assert backends.is_virtual()
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            backends.load_backend("quantum:foam")
@@ -0,0 +1,122 @@
+"""Tests for the alert rule engine"""
+import math
+import threading
+
+import pytest
+
+from measure_temp import read_sensors
+from measure_temp.rules import Alert, Condition, RuleEngine, compile_rule
+
+
+class TestCompile:
+    def test_comparison(self):
+        rule = compile_rule("coretemp.temp1 > 85")
+        assert rule.conditions == (Condition("coretemp.temp1", ">", 85.0),)
+        assert rule.duration == 0.0 and rule.name == "coretemp.temp1 > 85"
+
+    def test_conjunction_and_duration(self):
+        rule = compile_rule("nct6775.fan1 == 0 while coretemp.temp1 rising for 2m")
+        assert [condition.op for condition in rule.conditions] == ["==", "rising"]
+        assert rule.duration == 120.0
+
+    @pytest.mark.parametrize(
+        "expression, duration",
+        (
+            ("a.b < 1 for 30", 30.0),
+            ("a.b < 1 for 500ms", 0.5),
+            ("a.b < 1 for 1h", 3600.0),
+        ),
+    )
+    def test_duration_units(self, expression, duration):
+        assert compile_rule(expression).duration == duration
+
+    def test_names_can_have_dashes(self):
+        (condition,) = compile_rule("cpu-thermal.temp>=-5.5").conditions
+        assert condition == Condition("cpu-thermal.temp", ">=", -5.5)
+
+    @pytest.mark.parametrize("expression", ("coretemp.temp1", "a.b > x", "a.b > 1 and"))
+    def test_bad_expressions(self, expression):
+        with pytest.raises(ValueError):
+            compile_rule(expression)
+
+
+class TestEvaluate:
+    def test_fires_and_clears(self):
+        rule = compile_rule("a.b > 85")
+        assert rule.update(0, {"a.b": 80.0}) is None
+        assert rule.update(1, {"a.b": 90.0}) is True
+        assert rule.update(2, {"a.b": 91.0}) is None
+        assert rule.update(3, {"a.b": 80.0}) is False
+
+    def test_debounce(self):
+        rule = compile_rule("a.b > 85 for 30s")
+        assert rule.update(0, {"a.b": 90.0}) is None
+        assert rule.update(20, {"a.b": 90.0}) is None
+        assert rule.update(25, {"a.b": 80.0}) is None  # dipped, so the clock restarts
+        assert rule.update(30, {"a.b": 90.0}) is None
+        assert rule.update(60, {"a.b": 90.0}) is True
+
+    def test_hysteresis(self):
+        rule = compile_rule("a.b > 85", hysteresis=5)
+        assert rule.update(0, {"a.b": 86.0}) is True
+        assert rule.update(1, {"a.b": 82.0}) is None
+        assert rule.update(2, {"a.b": 80.0}) is False
+        assert rule.update(3, {"a.b": 84.0}) is None
+
+    def test_trends(self):
+        rule = compile_rule("a.b rising")
+        assert rule.update(0, {"a.b": 50.0}) is None  # nothing to compare against yet
+        assert rule.update(1, {"a.b": 51.0}) is True
+        assert rule.update(2, {"a.b": 51.0}) is False
+
+    def test_trend_sees_every_sample(self):
+        rule = compile_rule("a.b == 0 and c.d falling")
+        rule.update(0, {"a.b": 1.0, "c.d": 60.0})
+        rule.update(1, {"a.b": 1.0, "c.d": 70.0})
+        assert rule.update(2, {"a.b": 0.0, "c.d": 65.0}) is True
+
+    @pytest.mark.parametrize("readings", ({}, {"a.b": None}, {"a.b": math.nan}))
+    def test_missing_or_unreadable_never_matches(self, readings):
+        assert compile_rule("a.b != 1").update(0, readings) is None
+
+    def test_readings(self, mock_sensors):
+        rule = compile_rule("coretemp.temp1 > 60 and nvme.temp1 < 1000")
+        with read_sensors.BatchReader(["coretemp.temp1", "nvme.temp1"]) as reader:
+            # the nvme sensor is unreadable
+            assert rule.update(0, reader.read()) is None
+        rule = compile_rule("coretemp.temp1 > 60 and nct6775.fan1 >= 1200")
+        with read_sensors.BatchReader(["coretemp.temp1", "nct6775.fan1"]) as reader:
+            assert rule.update(0, reader.read()) is True
+
+    def test_keyed_by_sensor(self, mock_sensors):
+        rule = compile_rule("coretemp.temp1 > 60 and nct6775.fan1 >= 1200")
+        readings = read_sensors.read_many(["coretemp.temp1", "nct6775.fan1"])
+        assert rule.update(0, dict(readings.items())) is True
+        assert (
+            rule.update(1, {read_sensors.Sensor("coretemp", 0, "temp1"): 50.0}) is False
+        )
+
+
+class TestRuleEngine:
+    def test_update_reports_and_calls_back(self):
+        alerts = []
+        engine = RuleEngine(
+            ["a.b > 1", compile_rule("a.b > 5")], callback=alerts.append
+        )
+        assert engine.update(0, {"a.b": 2.0}) == [Alert(engine.rules[0], 0, True)]
+        engine.update(1, {"a.b": 0.0})
+        assert alerts == [
+            Alert(engine.rules[0], 0, True),
+            Alert(engine.rules[0], 1, False),
+        ]
+        assert engine.firing == []
+
+    def test_sampler_subscription(self, mock_sensors):
+        from measure_temp.sampler import Sampler
+
+        fired = threading.Event()
+        engine = RuleEngine(["coretemp.temp1 > 60"], callback=lambda alert: fired.set())
+        with Sampler(["coretemp.temp1"], interval=0.01) as sampler:
+            sampler.subscribe(engine.update)
+            assert fired.wait(5)
+        assert engine.firing == engine.rules
@@ -0,0 +1,63 @@
+"""Tests for periodic sampling"""
+import time
+
+import pytest
+
+from measure_temp import sampler
+
+
+class TestSample:
+    def test_count_is_respected(self, mock_sensors):
+        assert len(list(sampler.sample(["coretemp.temp1"], interval=0, count=3))) == 3
+
+    def test_samples_are_timestamped_in_order(self, mock_sensors):
+        times = [
+            timestamp
+            for timestamp, _ in sampler.sample(
+                ["coretemp.temp1"], interval=0.01, count=3
+            )
+        ]
+        assert times == sorted(times)
+
+    def test_samples_contain_readings(self, mock_sensors):
+        ((_, readings),) = sampler.sample(["coretemp.temp1", "nvme.temp1"], count=1)
+        assert [(str(sensor), value) for sensor, value in readings.items()] == [
+            ("coretemp.temp1", pytest.approx(62.3)),
+            ("nvme.temp1", None),
+        ]
+
+
+class TestSampler:
+    def test_latest_is_available_once_started(self, mock_sensors):
+        with sampler.Sampler(["coretemp.temp1"], interval=60) as background:
+            _, readings = background.latest
+        assert [str(sensor) for sensor in readings] == ["coretemp.temp1"]
+
+    def test_subscribers_get_every_sample(self, mock_sensors):
+        seen = []
+        background = sampler.Sampler(["nct6775.fan1"], interval=0.001)
+        background.subscribe(lambda timestamp, readings: seen.append(timestamp))
+        with background:
+            while len(seen) < 5:
+                time.sleep(0.001)
+        assert seen == sorted(seen)
+
+    def test_misbehaving_subscribers_dont_stop_sampling(self, mock_sensors):
+        seen = []
+        background = sampler.Sampler(["nct6775.fan1"], interval=0.001)
+        background.subscribe(lambda timestamp, readings: 1 / 0)
+        background.subscribe(lambda timestamp, readings: seen.append(timestamp))
+        with background:
+            while len(seen) < 2:
+                time.sleep(0.001)
+            assert background.running
+
+    def test_stopping_doesnt_wait_out_the_interval(self, mock_sensors):
+        start = time.monotonic()
+        with sampler.Sampler(["coretemp.temp1"], interval=60):
+            pass
+        assert time.monotonic() - start < 5
+
+    def test_missing_sensor_raises_on_start(self, mock_sensors):
+        with pytest.raises(ValueError):
+            sampler.Sampler(["zpm.power"]).start()
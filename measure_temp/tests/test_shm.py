@@ -0,0 +1,69 @@
+"""Tests for publishing readings to shared memory"""
+import time
+import uuid
+
+import pytest
+
+from measure_temp import sampler, shm
+from measure_temp.read_sensors import Sensor
+
+SENSORS = [Sensor("coretemp", 0, "temp1"), Sensor("nvme", 256, "temp1")]
+
+
+@pytest.fixture
+def writer():
+    with shm.SharedReadingsWriter(
+        SENSORS, f"measure_temp_test_{uuid.uuid4().hex[:8]}"
+    ) as writer:
+        yield writer
+
+
+class TestSharedReadings:
+    def test_nothing_published_yet(self, writer):
+        with shm.SharedReadingsReader(SENSORS, writer.name) as reader:
+            assert reader.snapshot() == (0.0, {SENSORS[0]: None, SENSORS[1]: None})
+
+    def test_round_trip(self, writer):
+        writer.publish(1234.5, {SENSORS[0]: 62.25, SENSORS[1]: None})
+        with shm.SharedReadingsReader(SENSORS, writer.name) as reader:
+            assert reader.snapshot() == (1234.5, {SENSORS[0]: 62.25, SENSORS[1]: None})
+
+    def test_reader_sees_updates(self, writer):
+        with shm.SharedReadingsReader(SENSORS, writer.name) as reader:
+            for i in range(3):
+                writer.publish(i, {SENSORS[0]: 40.0 + i})
+                assert reader.read()[1][0] == 40.0 + i
+
+    def test_reader_gets_the_table_from_the_writer(self, writer):
+        writer.publish(1234.5, {SENSORS[1]: 40.5})
+        with shm.SharedReadingsReader(name=writer.name) as reader:
+            assert reader.sensors == SENSORS
+            assert reader.snapshot() == (1234.5, {SENSORS[0]: None, SENSORS[1]: 40.5})
+
+    def test_different_table_raises_value_error(self, writer):
+        with pytest.raises(ValueError, match="different sensor table"):
+            shm.SharedReadingsReader(SENSORS[::-1], writer.name)
+
+    def test_missing_segment_raises_file_not_found(self):
+        with pytest.raises(FileNotFoundError):
+            shm.SharedReadingsReader(
+                SENSORS, f"measure_temp_test_{uuid.uuid4().hex[:8]}"
+            )
+
+    def test_torn_write_times_out(self, writer):
+        with shm.SharedReadingsReader(SENSORS, writer.name, max_retries=10) as reader:
+            shm._SEQ.pack_into(writer._memory.buf, 0, 1)
+            with pytest.raises(TimeoutError):
+                reader.read()
+
+    def test_sampler_publishes(self, mock_sensors):
+        with sampler.Sampler(
+            ["coretemp.temp1", "nct6775.fan1"], interval=0.001
+        ) as background:
+            name = f"measure_temp_test_{uuid.uuid4().hex[:8]}"
+            with shm.SharedReadingsWriter(background.sensors, name) as writer:
+                background.subscribe(writer.publish)
+                with shm.SharedReadingsReader(background.sensors, name) as reader:
+                    while reader.read()[0] == 0:
+                        time.sleep(0.001)
+                    assert reader.read()[1] == (62.3, 1200)
@@ -0,0 +1,92 @@
+"""Tests for frontend detection and output sinks"""
+import socket
+
+import pytest
+
+from measure_temp import detect_notebook, read_sensors, sinks
+
+
+@pytest.fixture
+def fresh_detection():
+    detect_notebook.in_ipython_frontend.cache_clear()
+    sinks.default_sink.cache_clear()
+    yield
+    detect_notebook.in_ipython_frontend.cache_clear()
+    sinks.default_sink.cache_clear()
+
+
+class TestFrontendDetection:
+    @pytest.mark.parametrize(
+        "override, expected", (("notebook", True), ("Terminal", False))
+    )
+    def test_override(self, fresh_detection, monkeypatch, override, expected):
+        monkeypatch.setenv(detect_notebook.FRONTEND_ENV_VAR, override)
+        assert detect_notebook.in_ipython_frontend() is expected
+
+    def test_detected_once(self, fresh_detection, monkeypatch):
+        monkeypatch.setenv(detect_notebook.FRONTEND_ENV_VAR, "terminal")
+        assert not detect_notebook.in_ipython_frontend()
+        monkeypatch.setenv(detect_notebook.FRONTEND_ENV_VAR, "notebook")
+        assert not detect_notebook.in_ipython_frontend()
+
+    def test_default_sink_is_reused(self, fresh_detection, monkeypatch):
+        monkeypatch.setenv(detect_notebook.FRONTEND_ENV_VAR, "terminal")
+        assert isinstance(sinks.default_sink(), sinks.StdoutSink)
+        assert sinks.default_sink() is sinks.default_sink()
+
+
+class TestSinks:
+    def test_write_must_be_implemented(self):
+        class Incomplete(sinks.OutputSink):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_stdout(self, capsys):
+        sinks.open_sink("stdout").write("hello")
+        assert capsys.readouterr().out == "hello\n"
+
+    def test_notebook(self, monkeypatch):
+        display = pytest.importorskip("IPython.display")
+        shown = []
+        monkeypatch.setattr(display, "display", shown.append)
+        sinks.open_sink("notebook").write("**hot**")
+        assert [markdown.data for markdown in shown] == ["**hot**"]
+
+    def test_file(self, tmp_path):
+        path = tmp_path / "report.md"
+        path.write_text("before\n")
+        with sinks.open_sink(str(path)) as sink:
+            sink.write("after")
+        assert path.read_text() == "before\nafter\n"
+
+    def test_unix_socket(self, tmp_path):
+        path = str(tmp_path / "report.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(path)
+            server.listen(1)
+            with sinks.open_sink(f"unix:{path}") as sink:
+                sink.write("line one")
+                sink.write("line two")
+            connection, _ = server.accept()
+            with connection:
+                assert connection.makefile().read() == "line one\nline two\n"
+
+    def test_tcp_socket(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen(1)
+            port = server.getsockname()[1]
+            with sinks.open_sink(f"tcp:127.0.0.1:{port}") as sink:
+                sink.write("hi")
+            connection, _ = server.accept()
+            with connection:
+                assert connection.makefile().read() == "hi\n"
+
+
+def test_report_to_sink(mock_sensors, tmp_path):
+    path = tmp_path / "report.md"
+    with sinks.FileSink(str(path)) as sink:
+        read_sensors.report_all_readings(sink=sink)
+    assert "- coretemp:temp1 : 62.3" in path.read_text().splitlines()
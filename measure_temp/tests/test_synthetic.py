@@ -0,0 +1,123 @@
+"""Tests for the generated-sensor backend"""
+import time
+
+import pytest
+
+from measure_temp import backends, daemon, health, read_sensors, synthetic
+from measure_temp.read_sensors import FeatureType
+from measure_temp.sensor_table import SensorTable
+
+
+class TestSyntheticBackend:
+    def test_scale(self, synthetic_sensors):
+        synthetic_sensors(chips=100, features=5)
+        found = read_sensors.find_sensors()
+        assert len(found) == 500
+        assert len({str(sensor) for sensor in found}) == 500
+        readings = read_sensors.read_many(found)
+        assert all(value is not None for value in readings.values())
+
+    def test_chips_sharing_a_label_are_numbered(self, synthetic_sensors):
+        synthetic_sensors(chips=len(synthetic.CHIP_LABELS) + 1, features=1)
+        names = [str(sensor) for sensor in read_sensors.enumerate_all_sensors()]
+        assert names[0] == "coretemp.temp1"
+        assert names[-1] == "coretemp1.temp1"
+
+    def test_types_and_limits(self, synthetic_sensors):
+        synthetic_sensors(chips=1, features=3)
+        table = SensorTable.of(read_sensors.enumerate_all_sensors())
+        assert table.types == (
+            FeatureType.TEMPERATURE,
+            FeatureType.FAN,
+            FeatureType.VOLTAGE,
+        )
+        assert table.high[0] == 80.0 and table.critical[0] == 100.0
+        assert table.low[1] == 300.0
+
+    @pytest.mark.parametrize(
+        "waveform, phase, expected",
+        [
+            ("sine", 0.25, 65.0),
+            ("square", 0.75, 35.0),
+            ("sawtooth", 0.5, 50.0),
+            ("constant", 0.3, 50.0),
+        ],
+    )
+    def test_waveforms(self, waveform, phase, expected):
+        now = [0.0]
+        backend = synthetic.SyntheticBackend(
+            chips=1, features=1, waveform=waveform, period=10, clock=lambda: now[0]
+        )
+        (feature,) = backend.chips[0]
+        now[0] = (phase - feature._phase) * 10
+        assert feature.get_value() == pytest.approx(expected)
+
+    def test_noise_stays_in_range(self):
+        backend = synthetic.SyntheticBackend(chips=1, features=1, waveform="noise")
+        (feature,) = backend.chips[0]
+        assert all(35.0 <= feature.get_value() <= 65.0 for _ in range(100))
+
+    def test_unknown_waveform(self):
+        with pytest.raises(ValueError):
+            synthetic.SyntheticBackend(waveform="triangle")
+
+    def test_injected_errors(self, synthetic_sensors):
+        synthetic_sensors(chips=1, features=2, error_rate=1.0)
+        readings = read_sensors.read_many(["coretemp.temp1", "coretemp.fan1"])
+        assert list(readings.values()) == [None, None]
+        assert (
+            health.DEFAULT_TRACKER.health(readings.table[0]).state
+            is health.SensorState.QUARANTINED
+        )
+
+    def test_error_rate_is_repeatable(self):
+        def failures(seed):
+            backend = synthetic.SyntheticBackend(
+                chips=1, features=1, error_rate=0.5, seed=seed
+            )
+            (feature,) = backend.chips[0]
+            outcomes = []
+            for _ in range(50):
+                try:
+                    feature.get_value()
+                    outcomes.append(False)
+                except read_sensors.sensors.SensorsError:
+                    outcomes.append(True)
+            return outcomes
+
+        assert failures(1) == failures(1)
+        assert 0 < sum(failures(1)) < 50
+
+    def test_latency(self, synthetic_sensors):
+        synthetic_sensors(chips=1, features=2, latency=0.01)
+        started = time.monotonic()
+        read_sensors.read_many(["coretemp.temp1", "coretemp.fan1"])
+        assert time.monotonic() - started >= 0.02
+
+
+class TestSpec:
+    def test_synthetic(self):
+        backend = backends.load_backend(
+            "synthetic:chips=3,features=2,waveform=square,latency=0.5,errors=0.25,seed=7"
+        )
+        assert isinstance(backend, synthetic.SyntheticBackend)
+        assert len(backend.chips) == 3 and len(backend.chips[0].features) == 2
+        assert backend.latency == 0.5 and backend.error_rate == 0.25
+
+    def test_defaults(self):
+        assert len(backends.load_backend("synthetic").chips) == 4
+
+    def test_unknown_setting(self):
+        with pytest.raises(ValueError):
+            backends.load_backend("synthetic:cores=8")
+
+    def test_cli(self, monkeypatch):
+        from click.testing import CliRunner
+
+        from measure_temp import cli
+
+        monkeypatch.setenv(backends.BACKEND_ENV_VAR, "synthetic:chips=2,features=2")
+        monkeypatch.setenv(daemon.SOCKET_PATH_ENV_VAR, "/nonexistent/no-daemon.sock")
+        result = CliRunner().invoke(cli.main, ["read"])
+        assert result.exit_code == 0, result.output
+        assert "nct6775.fan1" in result.output
@@ -0,0 +1,117 @@
+"""Tests for reading thermal zones, run against a fake sysfs directory"""
+import pytest
+import sensors
+
+from measure_temp import read_sensors, thermal_zones
+
+
+@pytest.fixture
+def fake_sysfs(tmp_path, monkeypatch):
+    for index, (zone_type, temp) in enumerate(
+        (("cpu-thermal", "48312"), ("gpu-thermal", "45000"), ("cpu-thermal", "oops"))
+    ):
+        zone = tmp_path / f"thermal_zone{index}"
+        zone.mkdir()
+        (zone / "type").write_text(zone_type + "\n")
+        (zone / "temp").write_text(temp + "\n")
+    (tmp_path / "cooling_device0").mkdir()
+
+    monkeypatch.setattr(thermal_zones, "THERMAL_ROOT", str(tmp_path))
+    monkeypatch.setattr(thermal_zones, "HWMON_ROOT", str(tmp_path / "hwmon"))
+    yield tmp_path
+    thermal_zones.close_thermal_zones()
+
+
+@pytest.fixture
+def no_chips(monkeypatch):
+    monkeypatch.setattr(sensors, "init", lambda: None)
+    monkeypatch.setattr(sensors, "cleanup", lambda: None)
+    monkeypatch.setattr(sensors, "iter_detected_chips", lambda: iter(()))
+
+
+class TestListThermalZones:
+    def test_only_zones_are_listed(self, fake_sysfs):
+        assert [zone.number for zone in thermal_zones.list_thermal_zones()] == [0, 1, 2]
+
+    def test_zone_types_are_read(self, fake_sysfs):
+        assert [zone.type for zone in thermal_zones.list_thermal_zones()] == [
+            "cpu-thermal",
+            "gpu-thermal",
+            "cpu-thermal",
+        ]
+
+    def test_zones_are_identified_by_their_device(self, fake_sysfs, tmp_path):
+        device = tmp_path / "LNXTHERM:00"
+        device.mkdir()
+        (fake_sysfs / "thermal_zone1" / "device").symlink_to(device)
+        assert [
+            thermal_zones.zone_device(zone)
+            for zone in thermal_zones.list_thermal_zones()
+        ] == [
+            str(fake_sysfs / "thermal_zone0"),
+            str(device),
+            str(fake_sysfs / "thermal_zone2"),
+        ]
+
+    def test_missing_root_means_no_zones(self, tmp_path):
+        assert thermal_zones.list_thermal_zones(str(tmp_path / "nope")) == []
+
+
+class TestReadThermalZone:
+    def test_reading_is_in_degrees_c(self, fake_sysfs):
+        assert thermal_zones.read_thermal_zone(0) == pytest.approx(48.312)
+
+    def test_repeated_reads_pick_up_new_values(self, fake_sysfs):
+        _ = thermal_zones.read_thermal_zone(1)
+        (fake_sysfs / "thermal_zone1" / "temp").write_text("51500\n")
+        assert thermal_zones.read_thermal_zone(1) == pytest.approx(51.5)
+
+    def test_garbage_raises_sensors_error(self, fake_sysfs):
+        with pytest.raises(sensors.SensorsError):
+            thermal_zones.read_thermal_zone(2)
+
+    def test_missing_zone_raises_sensors_error(self, fake_sysfs):
+        with pytest.raises(sensors.SensorsError):
+            thermal_zones.read_thermal_zone(3)
+
+
+class TestIntegrationWithReadSensors:
+    def test_zones_are_enumerated(self, fake_sysfs, no_chips):
+        assert [str(sensor) for sensor in read_sensors.enumerate_all_sensors()] == [
+            "cpu-thermal.temp",
+            "gpu-thermal.temp",
+            "cpu-thermal1.temp",
+        ]
+
+    def test_unreadable_zones_are_skipped_if_requested(self, fake_sysfs, no_chips):
+        assert "cpu-thermal1.temp" not in {
+            str(sensor)
+            for sensor in read_sensors.enumerate_all_sensors(readable_only=True)
+        }
+
+    def test_read_zone_by_string(self, fake_sysfs, no_chips):
+        assert read_sensors.read_sensor("gpu-thermal.temp") == pytest.approx(45.0)
+
+    def test_read_zone_by_sensor(self, fake_sysfs, no_chips):
+        assert read_sensors.read_sensor(
+            read_sensors.Sensor("cpu-thermal", 0, "temp")
+        ) == pytest.approx(48.312)
+
+    def test_zones_with_their_own_hwmon_device_are_skipped(self, fake_sysfs, no_chips):
+        # e.g. ACPI zones, which libsensors reports as the acpitz chip
+        (fake_sysfs / "thermal_zone1" / "hwmon3").mkdir()
+        assert "gpu-thermal.temp" not in {
+            str(sensor) for sensor in read_sensors.enumerate_all_sensors()
+        }
+
+    def test_zones_sharing_a_device_with_hwmon_are_skipped(self, fake_sysfs, no_chips):
+        # e.g. the Raspberry Pi's cpu-thermal zone, which libsensors reports as the cpu_thermal chip
+        device = fake_sysfs / "soc:thermal"
+        device.mkdir()
+        (fake_sysfs / "thermal_zone0" / "device").symlink_to(device)
+        (fake_sysfs / "hwmon" / "hwmon0").mkdir(parents=True)
+        (fake_sysfs / "hwmon" / "hwmon0" / "device").symlink_to(device)
+        assert [str(sensor) for sensor in read_sensors.enumerate_all_sensors()] == [
+            "gpu-thermal.temp",
+            "cpu-thermal.temp",
+        ]
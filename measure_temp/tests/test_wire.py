@@ -0,0 +1,138 @@
+"""Tests for the binary wire protocol"""
+import asyncio
+import io
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+from measure_temp import agent, collector, wire
+from measure_temp.read_sensors import Sensor
+
+SENSORS = [
+    Sensor("coretemp", 0, "temp1"),
+    Sensor("fluxcapacitor", 1809, "year", num=1),
+]
+
+
+def read_stream(stream):
+    messages = []
+    while True:
+        message = wire.read_message(stream)
+        if message is None:
+            return messages
+        messages.append(message)
+
+
+class TestEncoding:
+    def test_handshake_round_trip(self):
+        kind, body = read_stream(io.BytesIO(wire.pack_handshake(SENSORS)))[0]
+        assert kind == wire.HANDSHAKE
+        assert wire.unpack_handshake(body) == SENSORS
+
+    def test_frame_round_trip(self):
+        frame = wire.FramePacker(2).pack(1234.5, [62.25, None])
+        kind, body = read_stream(io.BytesIO(frame))[0]
+        assert kind == wire.READINGS
+        assert wire.FrameUnpacker(SENSORS).unpack(body) == (
+            1234.5,
+            {SENSORS[0]: 62.25, SENSORS[1]: None},
+        )
+
+    def test_frames_are_fixed_width(self):
+        packer = wire.FramePacker(100)
+        assert {len(packer.pack(0.0, [value] * 100)) for value in (0, 1e6, None)} == {
+            wire.HEADER.size + 8 + 4 * 100
+        }
+
+    def test_truncated_stream_raises_eof_error(self):
+        frame = wire.FramePacker(2).pack(0.0, [1.0, 2.0])
+        with pytest.raises(EOFError):
+            wire.read_message(io.BytesIO(frame[:-1]))
+
+
+class TestBinaryAgent:
+    def test_stdio_stream(self, mock_sensors):
+        stream = io.BytesIO()
+        agent.run_agent(
+            ["coretemp.temp1", "nvme.temp1"],
+            interval=0,
+            count=3,
+            stream=stream,
+            binary=True,
+        )
+        stream.seek(0)
+        (_, handshake), *frames = read_stream(stream)
+        unpacker = wire.FrameUnpacker(wire.unpack_handshake(handshake))
+        assert [str(sensor) for sensor in unpacker.sensors] == [
+            "coretemp.temp1",
+            "nvme.temp1",
+        ]
+        values = [list(unpacker.unpack(body)[1].values()) for _, body in frames]
+        assert values == [[pytest.approx(62.3), None]] * 3
+
+    def test_unix_socket(self, mock_sensors, tmp_path):
+        path = str(tmp_path / "agent.sock")
+        server = threading.Thread(
+            target=agent.serve_agent,
+            args=(path, ["nct6775.fan1"]),
+            kwargs={"interval": 0.01, "max_clients": 1},
+        )
+        server.start()
+        while not os.path.exists(path):
+            time.sleep(0.01)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            with client.makefile("rb") as stream:
+                kind, _ = wire.read_message(stream)
+                frame = wire.read_message(stream)
+        server.join(timeout=5)
+        assert kind == wire.HANDSHAKE
+        assert wire.FrameUnpacker(SENSORS[:1]).unpack(frame[1])[1] == {SENSORS[0]: 1200}
+
+    def test_unix_socket_replaces_stale_socket(self, mock_sensors, tmp_path):
+        path = str(tmp_path / "agent.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as left_behind:
+            left_behind.bind(path)
+        agent.serve_agent(path, ["nct6775.fan1"], max_clients=0)
+        assert not os.path.exists(path)
+
+    def test_unix_socket_leaves_other_files_alone(self, mock_sensors, tmp_path):
+        path = tmp_path / "agent.sock"
+        path.write_text("not a socket")
+        with pytest.raises(OSError):
+            agent.serve_agent(str(path), ["nct6775.fan1"], max_clients=0)
+        assert path.read_text() == "not a socket"
+
+
+class TestBinaryCollector:
+    def test_frames_are_decoded_into_records(self):
+        script = (
+            "import sys\n"
+            "from measure_temp import wire\n"
+            "from measure_temp.read_sensors import Sensor\n"
+            "out = sys.stdout.buffer\n"
+            "out.write(wire.pack_handshake([Sensor('coretemp', 0, 'temp1')]))\n"
+            "packer = wire.FramePacker(1)\n"
+            "for i in range(3):\n"
+            "    out.write(packer.pack(i, [40 + i]))\n"
+        )
+
+        async def gather():
+            async with collector.Collector(
+                {"pi": [sys.executable, "-c", script]},
+                reconnect_delay=None,
+                binary=True,
+            ) as fan_in:
+                return [record async for record in fan_in.records()]
+
+        assert asyncio.run(gather()) == [
+            {"time": i, "readings": {"coretemp.temp1": 40 + i}, "host": "pi"}
+            for i in range(3)
+        ]
+
+    def test_binary_agent_arguments(self):
+        assert collector.agent_arguments(binary=True)[-2:] == ["--format", "binary"]
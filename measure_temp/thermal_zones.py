@@ -0,0 +1,231 @@
+"""Get readings from the kernel's thermal zones (the only sensors on a lot of ARM boards)"""
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import sensors
+
+THERMAL_ROOT = "/sys/class/thermal"
+HWMON_ROOT = "/sys/class/hwmon"
+FEATURE_NAME = "temp"
+
+_ZONE_PREFIX = "thermal_zone"
+
+# open file descriptors for each zone's temp file, keyed by path, so that repeated reads only cost a single pread
+_fds: Dict[str, int] = {}
+_zone_types: Dict[Tuple[str, int], Optional[str]] = {}
+
+
+class ThermalZone(NamedTuple):
+    """A thermal zone exposed via sysfs
+
+    Attributes
+    ----------
+    number : int
+        The zone number, i.e. the N in thermal_zoneN
+    type : str
+        The zone's type (e.g. "cpu-thermal"), which is what gets used as the chip label
+    path : str
+        The path to the zone's directory
+    """
+
+    number: int
+    type: str
+    path: str
+
+
+def list_thermal_zones(root: Optional[str] = None) -> List[ThermalZone]:
+    """List all thermal zones
+
+    Parameters
+    ----------
+    root : str, optional
+        The directory to look for thermal zones in. Default is THERMAL_ROOT
+
+    Returns
+    -------
+    list of ThermalZone
+        The available zones, sorted by number. If the directory doesn't exist, the list will be empty.
+    """
+    root = root or THERMAL_ROOT
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return []
+
+    zones: List[ThermalZone] = []
+    for entry in entries:
+        if not entry.startswith(_ZONE_PREFIX):
+            continue
+        try:
+            index = int(entry[len(_ZONE_PREFIX) :])
+        except ValueError:
+            continue
+        zone_type = zone_type_of(index, root)
+        if zone_type is None:
+            continue
+        zones.append(ThermalZone(index, zone_type, os.path.join(root, entry)))
+    return sorted(zones)
+
+
+def zone_device(zone: ThermalZone) -> str:
+    """Identify the device behind a thermal zone
+
+    Parameters
+    ----------
+    zone : ThermalZone
+        The zone
+
+    Returns
+    -------
+    str
+        The resolved path of the zone's device in sysfs (e.g. an ACPI thermal zone's LNXTHERM node), which stays the
+        same whatever order the zones were probed in. Zones without a device (e.g. ones defined in a device tree)
+        fall back on the resolved path of the zone itself.
+    """
+    device = os.path.join(zone.path, "device")
+    return os.path.realpath(device if os.path.exists(device) else zone.path)
+
+
+def has_hwmon(zone: ThermalZone, hwmon_root: Optional[str] = None) -> bool:
+    """Check whether a thermal zone is also exposed as an hwmon device (and so already shows up as a libsensors chip)
+
+    Parameters
+    ----------
+    zone : ThermalZone
+        The zone
+    hwmon_root : str, optional
+        The directory to look for hwmon devices in. Default is HWMON_ROOT
+
+    Returns
+    -------
+    bool
+        True if the zone has an hwmon device of its own (an "hwmonN" entry in its directory, as for ACPI and PCH
+        zones) or if its device also backs an hwmon device
+    """
+    try:
+        entries = os.listdir(zone.path)
+    except OSError:
+        return False
+    if any(entry.startswith("hwmon") for entry in entries):
+        return True
+    if "device" not in entries:
+        return False
+    device = os.path.realpath(os.path.join(zone.path, "device"))
+    root = hwmon_root or HWMON_ROOT
+    try:
+        hwmon_entries = os.listdir(root)
+    except OSError:
+        return False
+    return any(
+        os.path.realpath(os.path.join(root, entry, "device")) == device
+        for entry in hwmon_entries
+    )
+
+
+def zone_type_of(index: int, root: Optional[str] = None) -> Optional[str]:
+    """Look up the type of a thermal zone (cached after the first lookup)
+
+    Parameters
+    ----------
+    index : int
+        The zone number
+    root : str, optional
+        The directory to look for thermal zones in. Default is THERMAL_ROOT
+
+    Returns
+    -------
+    str or None
+        The zone's type, or None if there is no such zone
+    """
+    root = root or THERMAL_ROOT
+    key = (root, index)
+    if key not in _zone_types:
+        try:
+            with open(
+                os.path.join(root, f"{_ZONE_PREFIX}{index}", "type")
+            ) as type_file:
+                _zone_types[key] = type_file.read().strip()
+        except OSError:
+            return None
+    return _zone_types[key]
+
+
+def read_thermal_zone(index: int, root: Optional[str] = None) -> float:
+    """Read the temperature of a thermal zone
+
+    Parameters
+    ----------
+    index : int
+        The zone number
+    root : str, optional
+        The directory to look for thermal zones in. Default is THERMAL_ROOT
+
+    Returns
+    -------
+    float
+        The zone's temperature in degrees C
+
+    Raises
+    ------
+    SensorsError
+        If the zone cannot be read
+
+    Notes
+    -----
+    The file descriptor is kept open after the first read, and every subsequent read is a single pread from the start
+    of the file (which makes sysfs regenerate the value).
+    """
+    path = os.path.join(root or THERMAL_ROOT, f"{_ZONE_PREFIX}{index}", FEATURE_NAME)
+    try:
+        fd = _fds.get(path)
+        if fd is None:
+            fd = _fds[path] = os.open(path, os.O_RDONLY)
+        return int(os.pread(fd, 32, 0)) / 1000
+    except (OSError, ValueError) as oops:
+        fd = _fds.pop(path, None)
+        if fd is not None:
+            os.close(fd)
+        raise sensors.SensorsError(f"Could not read {path}: {oops}")
+
+
+def read_trip_points(index: int, root: Optional[str] = None) -> Dict[str, float]:
+    """Read the trip points of a thermal zone
+
+    Parameters
+    ----------
+    index : int
+        The zone number
+    root : str, optional
+        The directory to look for thermal zones in. Default is THERMAL_ROOT
+
+    Returns
+    -------
+    dict of str to float
+        The lowest temperature (in degrees C) of each type of trip point (e.g. "passive", "hot", "critical"). Trip
+        points that can't be read are skipped.
+    """
+    zone_path = os.path.join(root or THERMAL_ROOT, f"{_ZONE_PREFIX}{index}")
+    trip_points: Dict[str, float] = {}
+    trip = 0
+    while True:
+        prefix = os.path.join(zone_path, f"trip_point_{trip}_")
+        try:
+            with open(prefix + "type") as type_file:
+                trip_type = type_file.read().strip()
+            with open(prefix + "temp") as temp_file:
+                temp = int(temp_file.read()) / 1000
+        except FileNotFoundError:
+            return trip_points
+        except (OSError, ValueError):
+            pass
+        else:
+            trip_points[trip_type] = min(temp, trip_points.get(trip_type, temp))
+        trip += 1
+
+
+def close_thermal_zones() -> None:
+    """Close all cached file descriptors and forget all cached zone types"""
+    while _fds:
+        _, fd = _fds.popitem()
+        os.close(fd)
+    _zone_types.clear()
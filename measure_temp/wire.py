@@ -0,0 +1,190 @@
+"""Compact binary protocol for streaming readings
+
+Every message is a 5-byte header (the body length as a big-endian uint32, followed by a single byte giving the kind of
+message) and then the body. A stream starts with a single HANDSHAKE message whose body is the JSON-encoded sensor
+table (a list of [chip, addr, feature, num] entries), after which every message is a READINGS frame: the Unix time as a
+float64 followed by one float32 per sensor, in table order, with NaN standing in for unreadable sensors.
+"""
+import asyncio
+import json
+import math
+import struct
+from array import array
+from typing import BinaryIO, List, Optional, Sequence, Tuple
+
+from .read_sensors import Sensor, intern_sensor
+from .readings import Readings
+from .sensor_table import SensorTable
+
+HANDSHAKE = ord("H")
+READINGS = ord("R")
+
+HEADER = struct.Struct("!IB")
+
+Message = Tuple[int, bytes]
+
+
+def pack_handshake(sensors: Sequence[Sensor]) -> bytes:
+    """Encode the sensor table
+
+    Parameters
+    ----------
+    sensors : list of Sensor
+        The sensors that will be sent in each frame, in order
+
+    Returns
+    -------
+    bytes
+        The complete handshake message
+    """
+    body = json.dumps([list(sensor) for sensor in sensors]).encode()
+    return HEADER.pack(len(body), HANDSHAKE) + body
+
+
+def unpack_handshake(body: bytes) -> List[Sensor]:
+    """Decode the sensor table from the body of a handshake message
+
+    Parameters
+    ----------
+    body : bytes
+        The message body
+
+    Returns
+    -------
+    list of Sensor
+        The sensors that will be sent in each frame, in order
+    """
+    return [intern_sensor(Sensor(*entry)) for entry in json.loads(body)]
+
+
+class FramePacker:
+    """Encoder for the readings frames of a fixed sensor table
+
+    Parameters
+    ----------
+    num_sensors : int
+        The number of sensors in the table
+    """
+
+    def __init__(self, num_sensors: int):
+        self._body = struct.Struct(f"!d{num_sensors}f")
+        self._header = HEADER.pack(self._body.size, READINGS)
+
+    def pack(self, timestamp: float, values: Sequence[Optional[float]]) -> bytes:
+        """Encode a frame
+
+        Parameters
+        ----------
+        timestamp : float
+            The (Unix) time of the sample
+        values : list of float
+            The readings, in table order. Unreadable sensors can be given as None (or NaN).
+
+        Returns
+        -------
+        bytes
+            The complete frame
+        """
+        return self._header + self._body.pack(
+            timestamp, *(math.nan if value is None else value for value in values)
+        )
+
+
+class FrameUnpacker:
+    """Decoder for the readings frames of a fixed sensor table
+
+    Parameters
+    ----------
+    sensors : list of Sensor
+        The sensor table, as sent in the handshake
+    """
+
+    def __init__(self, sensors: Sequence[Sensor]):
+        self.table = SensorTable.of(sensors)
+        self.sensors = list(self.table)
+        self._body = struct.Struct(f"!d{len(self.sensors)}f")
+
+    def unpack(self, body: bytes) -> Tuple[float, Readings]:
+        """Decode a frame
+
+        Parameters
+        ----------
+        body : bytes
+            The message body
+
+        Returns
+        -------
+        tuple of (float, Readings)
+            The time of the sample and the readings (unreadable sensors will have a value of None)
+        """
+        timestamp, *values = self._body.unpack(body)
+        return timestamp, Readings(self.table, array("d", values))
+
+
+def read_message(stream: BinaryIO) -> Optional[Message]:
+    """Read the next message from a blocking binary stream
+
+    Parameters
+    ----------
+    stream : binary file-like
+        The stream to read from
+
+    Returns
+    -------
+    tuple of (int, bytes) or None
+        The kind of message and its body, or None if the stream is exhausted
+
+    Raises
+    ------
+    EOFError
+        If the stream ends partway through a message
+    """
+    header = _read_exactly(stream, HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise EOFError("Stream ended partway through a message")
+    length, kind = HEADER.unpack(header)
+    body = _read_exactly(stream, length)
+    if len(body) < length:
+        raise EOFError("Stream ended partway through a message")
+    return kind, body
+
+
+async def read_message_async(reader: asyncio.StreamReader) -> Optional[Message]:
+    """Read the next message from an asyncio stream
+
+    Parameters
+    ----------
+    reader : StreamReader
+        The stream to read from
+
+    Returns
+    -------
+    tuple of (int, bytes) or None
+        The kind of message and its body, or None if the stream is exhausted
+
+    Raises
+    ------
+    IncompleteReadError
+        If the stream ends partway through a message
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as oops:
+        if oops.partial:
+            raise
+        return None
+    length, kind = HEADER.unpack(header)
+    return kind, await reader.readexactly(length)
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
@@ -10,7 +10,14 @@ setup(
     packages=["measure_temp"],
     license="GPL v3",
     install_requires=["pysensors==0.0.4", "Click>=8"],
+    extras_require={
+        "numpy": ["numpy"],
+        "pandas": ["numpy", "pandas"],
+        "notebook": ["ipython"],
+        "parquet": ["numpy", "pyarrow"],
+    },
     include_package_data=True,
+    entry_points={"console_scripts": ["measure_temp=measure_temp.cli:main"]},
     version=versioneer.get_version(),
     cmdclass=versioneer.get_cmdclass(),
 )